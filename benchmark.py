@@ -0,0 +1,330 @@
+# benchmark.py
+# Fizik motoru ve simülasyon döngüsü için performans ölçüm (benchmark) aracı.
+#
+# Sentetik yerleşimler (5 / 50 / 500 / 5000 site), 1 - 10k UE ve 24 saat -
+# 1 yıl zaman adımı üzerinde fonksiyon gecikmesi, uçtan uca süre, tepe bellek
+# (peak RSS) ve zaman adımı/sn ölçülür. Sonuçlar JSON olarak yazılır ve
+# kayıtlı bir referans (baseline) ile eşik değerine göre karşılaştırılabilir.
+#
+# Kullanım:
+#   python benchmark.py --suite quick --output bench.json
+#   python benchmark.py --suite full --baseline bench_baseline.json --threshold 0.15
+import argparse
+import itertools
+import json
+import multiprocessing
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import time
+
+import numpy as np
+
+from config import CARRIER_FREQ_MHZ, PATH_LOSS_EXPONENT, OPTIMIZED_CONFIG
+from physics_engine import PhysicsEngine
+from interference_engine import InterferenceEngine
+from network_state import NetworkState
+from spatial_sampling import UELayout, random_ue_positions
+import simulation_runner
+
+SUITES = {
+    "quick": {"sites": [5, 50], "ues": [1, 100], "hours": [24, 168]},
+    "full": {"sites": [5, 50, 500, 5000], "ues": [1, 100, 1000, 10000], "hours": [24, 168, 8760]},
+}
+
+# Bir vaka için izin verilen yaklaşık işlem bütçesi (eleman sayısı). Bunu
+# aşan kombinasyonlar "skipped" olarak raporlanır.
+MAX_MATRIX_ELEMENTS = 5e10
+# Skaler (Python döngülü) fonksiyonlar için site sınırı
+MAX_SCALAR_SITES = 500
+
+
+# --- SENTETİK VERİ ---
+def synthetic_layout(num_sites, inter_site_m=400.0, seed=0):
+    """Kare ızgara üzerinde hafif kaydırılmış site konumları (metre)."""
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(num_sites)))
+    gx, gy = np.meshgrid(np.arange(side), np.arange(side))
+    pos = np.column_stack([gx.ravel(), gy.ravel()])[:num_sites] * inter_site_m
+    return pos + rng.uniform(-0.1, 0.1, pos.shape) * inter_site_m
+
+
+def synthetic_arrays(num_sites, hours, seed=0):
+    """build_site_arrays çıktısıyla aynı yapıda sentetik (T x N) diziler."""
+    rng = np.random.default_rng(seed)
+    hour = np.arange(hours) % 24
+    wave = 180 * (np.sin(2 * np.pi * (hour - 7) / 24) + 1)
+    users = np.clip(rng.uniform(80, 300, num_sites)[None, :] + wave[:, None]
+                    + rng.normal(0, 25, (hours, num_sites)), 30, 900).round()
+    snr = np.clip(32 - 0.035 * users + rng.normal(0, 1.5, users.shape), 8, 32)
+    return {
+        'timestamps': np.datetime64("2025-04-01T00") + np.arange(hours).astype("timedelta64[h]"),
+        'site_names': [f"Site_{i + 1}" for i in range(num_sites)],
+        'ids': np.arange(1, num_sites + 1),
+        'pos': synthetic_layout(num_sites, seed=seed),
+        'users': users,
+        'snr': snr,
+        'present': np.ones(users.shape, dtype=bool),
+    }
+
+
+def synthetic_allocation(arrays, seed=0):
+    """Optimized senaryosunu taklit eden (T x N) güç / bant / frekans atamaları."""
+    rng = np.random.default_rng(seed)
+    users = arrays['users']
+    cfg = OPTIMIZED_CONFIG
+    bw = np.clip(2 * users / np.log2(1 + 10**(arrays['snr'] / 10)),
+                 cfg['min_bandwidth_mhz'], cfg['max_bandwidth_mhz'])
+    power = np.clip(0.6 * bw, cfg['min_power_watt'], cfg['max_power_watt'])
+    offsets = rng.choice([-60.0, 0.0, 60.0], size=users.shape[1])
+    freq = np.broadcast_to(CARRIER_FREQ_MHZ + offsets, users.shape).copy()
+    return power, bw, freq
+
+
+# --- VAKALAR ---
+# Her vaka (name, params) -> çalıştırılacak fonksiyon ve zaman adımı sayısı döndürür.
+def case_scalar_interference(sites, ues, hours):
+    if sites > MAX_SCALAR_SITES:
+        return None
+    physics = PhysicsEngine(CARRIER_FREQ_MHZ)
+    pos = synthetic_layout(sites)
+    bs_list = [{'id': i, 'center_freq': CARRIER_FREQ_MHZ, 'bandwidth': 40.0, 'tx_power': 40.0}
+               for i in range(sites)]
+    user_pos = pos[0] + np.array([150.0, 0.0])
+    dist_map = {i: max(1.0, float(np.hypot(*(pos[i] - user_pos)))) for i in range(sites)}
+    return (lambda: physics.calculate_interference(bs_list[0], bs_list, dist_map)), 1
+
+
+def case_state_interference(sites, ues, hours):
+    physics = PhysicsEngine(CARRIER_FREQ_MHZ)
+    pos = synthetic_layout(sites)
+    state = NetworkState(np.arange(sites), pos[:, 0], pos[:, 1], 40.0, 40.0, CARRIER_FREQ_MHZ)
+    distance = np.maximum(1.0, state.distances_to(pos[0] + np.array([150.0, 0.0])))
+    return (lambda: physics.calculate_interference(state[0], state, distance)), 1
+
+
+def case_scalar_sinr(sites, ues, hours):
+    physics = PhysicsEngine(CARRIER_FREQ_MHZ)
+    return (lambda: physics.calculate_sinr(-70.0, 1e-12, 40e6)), 1
+
+
+def case_matrix_interference(sites, ues, hours):
+    if sites * sites * ues > MAX_MATRIX_ELEMENTS / 100:
+        return None
+    interference = InterferenceEngine(PhysicsEngine(CARRIER_FREQ_MHZ), PATH_LOSS_EXPONENT)
+    arrays = synthetic_arrays(sites, 1)
+    ue_pos = random_ue_positions(arrays['pos'], ues, seed=0)
+    layout = UELayout(interference, arrays['pos'], ue_pos)
+    power, bw, freq = synthetic_allocation(arrays)
+    serving = np.zeros(ues, dtype=int)
+    return (lambda: interference.interference_for_serving(power, freq, bw, layout.gain, serving)), 1
+
+
+def case_multi_ue_evaluate(sites, ues, hours):
+    if sites * sites * ues * hours > MAX_MATRIX_ELEMENTS:
+        return None
+    interference = InterferenceEngine(PhysicsEngine(CARRIER_FREQ_MHZ), PATH_LOSS_EXPONENT)
+    arrays = synthetic_arrays(sites, hours)
+    ue_pos = random_ue_positions(arrays['pos'], ues, seed=0)
+    layout = UELayout(interference, arrays['pos'], ue_pos)
+    power, bw, freq = synthetic_allocation(arrays)
+    return (lambda: layout.evaluate(power, freq, bw)), hours
+
+
+def case_end_to_end(sites, ues, hours):
+    """
+    run_comparison_simulation'ın dosya okuma/yazma dışındaki tüm adımları:
+    gerçek kaynak ataması (scenario_resources), hedef site karşılaştırması
+    (simulate_target_site) ve ağ geneli KPI'lar (simulate_network).
+    """
+    if ues != 1 or sites * sites * hours > MAX_MATRIX_ELEMENTS:
+        return None
+    arrays = synthetic_arrays(sites, hours)
+
+    def run():
+        resources = simulation_runner.scenario_resources(arrays)
+        simulation_runner.simulate_target_site(arrays, resources=resources)
+        simulation_runner.simulate_network(arrays, resources=resources)
+    return run, hours
+
+
+CASES = {
+    "physics.calculate_interference": (case_scalar_interference, ("sites",)),
+    "physics.calculate_interference_state": (case_state_interference, ("sites",)),
+    "physics.calculate_sinr": (case_scalar_sinr, ()),
+    "interference.interference_for_serving": (case_matrix_interference, ("sites", "ues")),
+    "spatial.UELayout.evaluate": (case_multi_ue_evaluate, ("sites", "ues", "hours")),
+    "simulation.end_to_end": (case_end_to_end, ("sites", "hours")),
+}
+
+
+# --- ÖLÇÜM ---
+def _peak_rss_mb():
+    # Linux'ta ru_maxrss KB cinsindendir
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024.0
+
+
+def _measure(name, params, min_time=0.2, max_repeats=50):
+    factory, _ = CASES[name]
+    t0 = time.perf_counter()
+    built = factory(**params)
+    if built is None:
+        return {"name": name, "params": params, "status": "skipped"}
+    fn, timesteps = built
+    setup_s = time.perf_counter() - t0
+
+    # Çok kısa fonksiyonlar için bir ölçüm >= 1 ms olacak şekilde tekrar sayısı
+    number = 1
+    while True:
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        if time.perf_counter() - t >= 1e-3 or number >= 10**6:
+            break
+        number *= 10
+
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeats and (not timings or time.perf_counter() - start < min_time):
+        t = time.perf_counter()
+        for _ in range(number):
+            fn()
+        timings.append((time.perf_counter() - t) / number)
+
+    median = statistics.median(timings)
+    return {
+        "name": name,
+        "params": params,
+        "status": "ok",
+        "repeats": len(timings),
+        "calls_per_repeat": number,
+        "latency_s": median,
+        "min_s": min(timings),
+        "setup_s": setup_s,
+        "wall_s": setup_s + sum(timings) * number,
+        "timesteps_per_sec": timesteps / median if median > 0 else None,
+        "peak_rss_mb": _peak_rss_mb(),
+    }
+
+
+def _measure_in_child(args):
+    return _measure(*args)
+
+
+def run_suite(suite="quick", cases=None, isolate=True):
+    """
+    Seçilen paketteki tüm (vaka, parametre) kombinasyonlarını ölçer.
+    isolate=True ise her vaka ayrı bir süreçte çalışır; böylece tepe bellek
+    (peak RSS) vakaya özgü olur.
+    """
+    grid = SUITES[suite]
+    tasks = []
+    for name, (_, keys) in CASES.items():
+        if cases and name not in cases:
+            continue
+        for values in itertools.product(*(grid[k] for k in keys)):
+            params = dict(zip(keys, values))
+            full = {"sites": 5, "ues": 1, "hours": 24, **params}
+            tasks.append((name, full))
+
+    results = []
+    ctx = multiprocessing.get_context("fork" if sys.platform != "win32" else "spawn")
+    for task in tasks:
+        if isolate:
+            with ctx.Pool(1) as pool:
+                result = pool.apply(_measure_in_child, (task,))
+        else:
+            result = _measure(*task)
+        results.append(result)
+        _print_result(result)
+    return results
+
+
+def _case_id(result):
+    return result["name"] + " " + json.dumps(result["params"], sort_keys=True)
+
+
+def _print_result(r):
+    p = ",".join(f"{k}={v}" for k, v in r["params"].items())
+    if r["status"] != "ok":
+        print(f"{r['name']:<42} {p:<32} {'atlandı':>12}")
+        return
+    tps = f"{r['timesteps_per_sec']:.1f}" if r["timesteps_per_sec"] else "-"
+    print(f"{r['name']:<42} {p:<32} {r['latency_s'] * 1e3:>10.3f} ms  "
+          f"{tps:>12} adım/sn  {r['peak_rss_mb']:>8.1f} MB")
+
+
+def _metadata():
+    try:
+        commit = subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True,
+                                text=True, timeout=5).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "platform": platform.platform(),
+        "cpu_count": multiprocessing.cpu_count(),
+        "git_commit": commit,
+    }
+
+
+def compare(results, baseline, threshold=0.10):
+    """
+    Gecikmeyi referans sonuçlarla karşılaştırır.
+    Dönüş: gerileme (regression) listesi - (vaka, eski_s, yeni_s, oran)
+    """
+    base = {_case_id(r): r for r in baseline.get("results", []) if r.get("status") == "ok"}
+    regressions = []
+    for r in results:
+        old = base.get(_case_id(r))
+        if r["status"] != "ok" or old is None:
+            continue
+        ratio = r["latency_s"] / old["latency_s"]
+        marker = "GERİLEME" if ratio > 1 + threshold else ("iyileşme" if ratio < 1 - threshold else "")
+        print(f"{_case_id(r):<80} {old['latency_s'] * 1e3:>10.3f} -> {r['latency_s'] * 1e3:>10.3f} ms "
+              f"({ratio:5.2f}x) {marker}")
+        if ratio > 1 + threshold:
+            regressions.append((_case_id(r), old["latency_s"], r["latency_s"], ratio))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Fizik motoru ve simülasyon benchmark aracı")
+    parser.add_argument("--suite", choices=sorted(SUITES), default="quick")
+    parser.add_argument("--case", action="append", choices=sorted(CASES),
+                        help="Yalnızca bu vaka(lar)ı çalıştır (tekrarlanabilir)")
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--baseline", help="Karşılaştırılacak referans JSON dosyası")
+    parser.add_argument("--threshold", type=float, default=0.10,
+                        help="Gerileme eşiği (oransal gecikme artışı, örn. 0.10 = %%10)")
+    parser.add_argument("--no-isolate", action="store_true",
+                        help="Vakaları aynı süreçte çalıştır (daha hızlı, RSS vakaya özgü değil)")
+    args = parser.parse_args(argv)
+
+    results = run_suite(args.suite, args.case, isolate=not args.no_isolate)
+    report = {"meta": _metadata(), "suite": args.suite, "results": results}
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=1)
+    print(f">>> Benchmark sonuçları '{args.output}' dosyasına yazıldı.")
+
+    if args.baseline:
+        try:
+            with open(args.baseline, encoding="utf-8") as f:
+                baseline = json.load(f)
+        except FileNotFoundError as e:
+            print(f"HATA: {e}")
+            return 1
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"HATA: {len(regressions)} vakada %{args.threshold * 100:.0f} üzeri gerileme.")
+            return 1
+        print("Gerileme yok.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
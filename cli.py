@@ -0,0 +1,49 @@
+# cli.py
+# Tüm aşamalar için tek giriş noktası:
+#   python cli.py generate | forecast | simulate | sweep | plot | ... [seçenekler]
+#
+# Komut modülleri yalnızca seçilen komut çalıştırılırken içe aktarılır; bu
+# dosya yalnızca standart kütüphaneyi yükler. Böylece `python cli.py --help`
+# NumPy/pandas/matplotlib yüklemeden döner ve her komut yalnızca kendi
+# bağımlılıklarını yükler (ör. matplotlib yalnızca "plot" ve "forecast"
+# grafiklerinde). Kalan argümanlar ilgili modülün main(argv) fonksiyonuna
+# iletilir; komut seçenekleri için: python cli.py <komut> --help
+import argparse
+import importlib
+import sys
+
+# Komut -> (modül, açıklama)
+COMMANDS = {
+    "generate": ("data_generator", "Sentetik trafik verisi üret"),
+    "forecast": ("lstm_train", "Tahmin modelini eğit ve simülasyon girdisini üret"),
+    "simulate": ("simulation_runner", "Baseline / Optimized karşılaştırmalı simülasyon"),
+    "sweep": ("sweep_runner", "OPTIMIZED_CONFIG parametre taraması (paralel)"),
+    "plot": ("plot_results", "Karşılaştırma grafikleri, ağ panosu ve site grafikleri"),
+    "stream": ("stream_simulation", "Artımlı (streaming) simülasyon"),
+    "events": ("event_simulation", "Ayrık olaylı simülasyon (uyku modu geçişleri)"),
+    "shard": ("sharded_runner", "Zaman parçalı, kaldığı yerden devam eden simülasyon"),
+    "benchmark": ("benchmark", "Performans ölçümü"),
+}
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(prog="cli.py", description="5G enerji optimizasyonu simülasyon araçları",
+                                     epilog="Komut seçenekleri için: python cli.py <komut> --help")
+    commands = parser.add_subparsers(dest="command", metavar="<komut>", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        # Komut seçeneklerini (--help dahil) modülün kendi ayrıştırıcısı işler
+        commands.add_parser(name, help=help_text, add_help=False)
+    return parser
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else list(argv)
+    args, rest = build_parser().parse_known_args(argv)
+    module = importlib.import_module(COMMANDS[args.command][0])
+    # Modül yardım metninde program adı "cli.py <komut>" olarak görünür
+    sys.argv[0] = f"cli.py {args.command}"
+    return module.main(rest)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -27,13 +27,121 @@ OPTIMIZED_CONFIG = {
     "min_bandwidth_mhz": 10.0,
     "max_bandwidth_mhz": 100.0,
     "min_power_watt": 5.0,   # Uyku modu/Düşük trafik
-    "max_power_watt": 60.0,  # Yoğun trafik
+    "max_power_watt": 40.0,  # Yoğun trafik (Baseline gücü; daha yüksek tavanlar sweep_runner ile denenebilir)
     "sleep_mode_threshold_users": 5, # 5 kullanıcının altındaysa uyku modu
     "hysteresis_margin_mhz": 5.0    # Kararlılık için histerezis bandı
 }
 
+# Optimized senaryosunun kaynak atama stratejileri (resource_allocator.py)
+# resource_model: "shannon" (yerleşik) veya "user_algo" (user_algo.py gerekir)
+# frequency_planner: "single" (Baseline gibi tek taşıyıcı), "greedy" (girişim
+#                    grafiği boyama; ek kanallar Baseline'dan fazla spektrum
+#                    kullanır) veya "user_algo" (user_algo.parazit_onleyici)
+# Varsayılanlar Baseline ile eşdeğer karşılaştırma içindir: aynı taşıyıcı ve
+# Baseline'ın güç spektral yoğunluğu, toplam güç Baseline gücüyle sınırlı.
+ALLOCATOR_CONFIG = {
+    "resource_model": "shannon",
+    "frequency_planner": "single",
+    # Strateji adına göre parametreler
+    "strategy_params": {
+        "shannon": {
+            "rate_per_user_mbps": 2.5,                                   # Kullanıcı başı hedef hız
+            "reference_power_watt": BASELINE_CONFIG["tx_power_watt"],    # Güç yoğunluğu = referans güç / bant
+            "reference_bandwidth_mhz": BASELINE_CONFIG["bandwidth_mhz"],
+            "cap_at_reference": False    # True: güç ayrıca referans güçle sınırlı (max_power_watt > referans etkisiz)
+        },
+        "greedy": {"num_channels": 3, "reuse_distance_m": 600.0}
+    }
+}
+
+# --- SİTE YERLEŞİMİ ---
+# site_id, internal_id, x_m, y_m sütunlu CSV. Dosya yoksa simulation_runner.py
+# içindeki varsayılan 5 siteli yerleşim kullanılır.
+SITE_LAYOUT_FILE = "site_layout.csv"
+# Girişim komşuluk sınırı: yalnızca bu yarıçap içindeki (metre) veya alınan
+# gücü eşiğin (dBm) üzerindeki istasyonlar girişime dahil edilir.
+# None: tüm istasyonlar (tam model, budama yok)
+INTERFERENCE_RADIUS_M = None
+INTERFERENCE_CUTOFF_DBM = None
+
+# --- KAZANÇ (PATH LOSS) ÖNBELLEĞİ ---
+# İstasyon -> UE kazanç tabloları yerleşim özeti, taşıyıcı frekans ve
+# sönümleme katsayısına göre diske yazılır ve süreç içinde tutulur.
+GAIN_CACHE_ENABLED = True
+GAIN_CACHE_DIR = ".gain_cache"
+GAIN_CACHE_MAX_MB = 1024          # Disk sınırı (LRU)
+GAIN_MEMO_MAX_MB = 256            # Süreç içi (bellek) sınırı
+# Çok büyük UE sayıları için: mesafe bu adımla (metre) nicemlenip kazanç
+# tablodan okunur. None: tam hesap
+GAIN_LUT_RESOLUTION_M = None
+
+# --- AĞ KPI'LARI ---
+KPI_CONFIG = {
+    "demand_per_user_mbps": 2.5,   # Kullanıcı başı trafik talebi
+    "cell_edge_percentile": 5      # Hücre kenarı SINR'ı: site-saat SINR dağılımının %5'i
+}
+
+# --- AYRIK OLAYLI SİMÜLASYON (event_simulation.py) ---
+# Uyku/uyanma geçişleri ve alt-saat çözünürlüğü. Trafik verisi TIME_STEP_MINUTES
+# aralıklıdır; olaylar (trafik değişimi, eşik geçişi, geçişlerin tamamlanması,
+# yeniden yapılandırma) resolution_s çözünürlüğünde işlenir.
+EVENT_SIM_CONFIG = {
+    "resolution_s": 60,             # Olay zamanı çözünürlüğü (saniye)
+    "traffic_profile": "linear",    # "step": saat içinde sabit, "linear": örnekler arası doğrusal
+    "sleep_hold_s": 300,            # Eşik altında bu süre kalan istasyon uykuya geçer
+    "sleep_entry_latency_s": 10,    # Uykuya geçiş süresi
+    "wake_latency_s": 60,           # Uyanma süresi (bu sürede hizmet verilmez)
+    "transition_energy_wh": 1.0,    # Her uyku/uyanma geçişinin ek enerjisi
+    "sleep_draw_watt": 40.0,        # Uykudaki istasyonun toplam tüketimi
+    "reconfig_latency_s": 0         # Bant/güç değişikliğinin uygulanma gecikmesi
+}
+
+# --- PARÇALI (SHARDED) ÇALIŞTIRMA (sharded_runner.py) ---
+# Uzun zaman serileri zaman parçalarına bölünüp paralel işlenir. Her parça
+# bitince diske yazılır; kesilen bir çalışma son tamamlanan parçadan devam eder.
+SHARD_CONFIG = {
+    "shard_hours": 168,    # Parça uzunluğu (saat)
+    "workers": None,       # İşçi süreç sayısı (None: CPU sayısı)
+    "merge": True          # Tüm parçalar bitince tek tabloda birleştir
+}
+
+# --- GRAFİKLER (plot_results.py) ---
+# Büyük sonuç tablolarında zaman serileri çizilmeden önce seyreltilir; ağ
+# panosu site/dönem bazında toplanmış görünümlerle çizilir. Çizim süresi
+# satır sayısından bağımsız olarak max_points ile sınırlıdır.
+PLOT_CONFIG = {
+    "max_points": 2000,          # Seri başına en fazla çizilen nokta
+    "downsample": "minmaxlttb",  # "minmaxlttb", "lttb", "minmax" veya None (seyreltme yok)
+    "marker_max_points": 200,    # Bu sayıdan kısa serilerde noktalar işaretlenir
+    "aggregate_freq": "D",       # Ağ panosunda toplama dönemi (pandas frekansı: "h", "D", "W", ...)
+    "percentiles": (5, 50, 95),  # SINR bandı: alt, orta, üst yüzdelik
+    "workers": None              # Site grafikleri için işçi süreç sayısı (None: CPU sayısı)
+}
+
 # --- FİZİKSEL SABİTLER ---
 NOISE_FLOOR_DBM_HZ = -174.0  # Termal gürültü tabanı
 NOISE_FIGURE_DB = 9.0        # Alıcı gürültü şekli
 PATH_LOSS_EXPONENT = 3.5     # Şehir içi (Urban) ortam sönümleme katsayısı
 REFERENCE_DISTANCE_M = 1.0   # Referans uzaklığı
+
+# --- VERİ DEPOLAMA ---
+# "npy" (bellek eşlemeli NumPy sütunları), "parquet", "feather" (pyarrow gerekir) veya "csv"
+STORAGE_FORMAT = "npy"
+EXPORT_CSV = True            # Sütunsal dosyaya ek olarak CSV kopyası da yazılır
+TRAFFIC_DATA_FILE = "5G_90gun_5site_veri"         # data_generator.py çıktısı
+PREDICTIONS_FILE = "lstm_predictions"             # lstm_train.py çıktısı
+RESULTS_FILE = "simulation_results_comparison"    # simulation_runner.py çıktısı
+NETWORK_RESULTS_FILE = "simulation_results_network"            # site bazında tüm ağ KPI'ları
+NETWORK_TIMELINE_FILE = "simulation_results_network_timeline"  # saatlik ağ düzeyi toplamlar
+EVENT_RESULTS_FILE = "simulation_results_events"              # event_simulation.py site özeti
+
+# --- TAHMİN (FORECAST) ---
+FORECAST_PARAMS = {
+    "test_hours": 168,   # Tahmin edilen (simüle edilen) son dönem: 7 gün
+    "window": 168,       # Model girdisi: son 7 günlük yük
+    "horizon": 24,       # Gün öncesi tahmin
+    "alpha": 1.0         # Ridge düzenlileştirme
+}
+FORECAST_CACHE_ENABLED = True     # Tahminler veri özetine göre önbellekten okunur
+FORECAST_CACHE_DIR = ".forecast_cache"
+FORECAST_CACHE_MAX_MB = 512       # Önbellek boyut sınırı (LRU)
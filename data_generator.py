@@ -1,72 +1,253 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
 import pandas as pd
 import numpy as np
-
-print("5G Trafik Verisi Üretiliyor...")
-
-# Rastgelelik kontrolü
-np.random.seed(42)
-
-# Simülasyon parametreleri
-days = 90  # 3 ay
-sites = 5  # 5 baz istasyonu
-hours = days * 24
-idx = pd.date_range("2025-04-01", periods=hours, freq="h")
-
-# Parametre aralıkları
-base_users = [80, 130, 200, 250, 300]  # şehir yoğunlukları
-energy_base = [100, 120, 140, 160, 180]
-
-data = []
-
-for site in range(sites):
-    site_name = f"Site_{site + 1}"
+from config import TRAFFIC_DATA_FILE
+from storage import remove_parts, remove_single, write_table
+from spatial_index import grid_layout, write_site_layout
+
+# Varsayılan (eski 5 siteli senaryo) profil değerleri
+LEGACY_BASE_USERS = [80, 130, 200, 250, 300]  # şehir yoğunlukları
+LEGACY_ENERGY_BASE = [100, 120, 140, 160, 180]
+
+# Site başına rastgele akış (stream) numaraları. Her site ve her büyüklük için
+# ayrı bir üreteç kullanılır; böylece bir site, hangi parçada (shard)
+# üretilirse üretilsin aynı değerleri alır.
+_STREAM_USERS = 0
+_STREAM_THROUGHPUT = 1
+_STREAM_SINR = 2
+_STREAM_ENERGY = 3
+_STREAM_PROFILE = 4
+
+
+def _site_rng(seed, site, stream):
+    return np.random.default_rng([seed, int(site), stream])
+
+
+def _site_normal(seed, sites, stream, scale, steps):
+    """Her site için kendi üretecinden (S x steps) normal gürültü."""
+    return np.stack([_site_rng(seed, s, stream).normal(0, scale, steps) for s in sites])
+
+
+def time_index(days=90, resolution_minutes=60, start="2025-04-01"):
+    steps = days * 24 * 60 // resolution_minutes
+    return pd.date_range(start, periods=steps, freq=f"{resolution_minutes}min")
+
+
+def resolve_profile_mode(mode, num_sites):
+    """
+    "auto" profil modunu veri setinin toplam site sayısına göre çözer:
+    tüm siteler eski listelerde varsa "legacy", yoksa "random". Karar bir
+    parçaya (shard) veya tek siteye göre değil tüm veri setine göre verilir;
+    böylece bir site tek başına yeniden üretildiğinde de aynı profili alır.
+    """
+    if mode == "auto":
+        return "legacy" if num_sites <= len(LEGACY_BASE_USERS) else "random"
+    return mode
+
+
+def draw_site_profiles(sites, seed=42, mode="auto", num_sites=None):
+    """
+    Site profilleri (temel kullanıcı sayısı ve temel enerji tüketimi).
+    mode="legacy": eski 5 siteli listeler (site sayısı en fazla 5)
+    mode="random": site başına tohumlanmış dağılımlardan çekilir
+        base_users ~ U(80, 300), energy_base ~ 100 + 0.36 * (base_users - 80) + U(-5, 5)
+    mode="auto": bkz. resolve_profile_mode; num_sites veri setinin toplam
+        site sayısıdır (verilmezse en büyük site indeksi + 1)
+    """
+    sites = np.asarray(sites)
+    if num_sites is None:
+        num_sites = int(sites.max()) + 1 if sites.size else 0
+    mode = resolve_profile_mode(mode, num_sites)
+    if mode == "legacy":
+        return (np.asarray(LEGACY_BASE_USERS, dtype=float)[sites],
+                np.asarray(LEGACY_ENERGY_BASE, dtype=float)[sites])
+
+    draws = np.array([_site_rng(seed, s, _STREAM_PROFILE).random(2) for s in sites]).reshape(-1, 2)
+    base_users = 80 + 220 * draws[:, 0]
+    energy_base = 100 + 0.36 * (base_users - 80) + 10 * (draws[:, 1] - 0.5)
+    return base_users, energy_base
+
+
+def chain_neighbors(num_sites):
+    """
+    Eski davranış: her site bir önceki siteden parazit alır (ilk sitenin
+    komşusu yoktur). Dönüş (S x 1), komşusuz girişler -1.
+    """
+    return (np.arange(num_sites) - 1)[:, None]
+
+
+def random_neighbors(num_sites, k=3, seed=42):
+    """
+    Her site için k rastgele komşu (kendisi hariç). Dönüş (S x k).
+    """
+    if num_sites < 2:
+        return np.full((num_sites, k), -1)
+    rng = np.random.default_rng([seed, 99])
+    picks = rng.integers(0, num_sites - 1, size=(num_sites, k))
+    return picks + (picks >= np.arange(num_sites)[:, None])  # kendini atla
+
+
+def _site_users(sites, idx, seed, profiles):
+    """Verilen siteler için (S x T) kullanıcı sayıları; yalnızca siteye bağlıdır."""
+    steps = len(idx)
+    hour = np.asarray(idx.hour + idx.minute / 60.0)
+    base_users, _ = profiles(sites)
 
     # Günlük trafik dalgası (gündüz artar, gece azalır)
-    daily_wave = 180 * (np.sin(2 * np.pi * ((idx.hour - 7) / 24)) + 1)
+    daily_wave = 180 * (np.sin(2 * np.pi * ((hour - 7) / 24)) + 1)
     # Haftasonu etkisi (cumartesi-pazar)
-    weekend_boost = 80 * ((idx.dayofweek >= 5).astype(int))
+    weekend_boost = 80 * ((np.asarray(idx.dayofweek) >= 5).astype(int))
     # Gürültü
-    noise = np.random.normal(0, 25, hours)
-
-    users = np.clip(base_users[site] + daily_wave + weekend_boost + noise, 30, 900).astype(int)
+    noise = _site_normal(seed, sites, _STREAM_USERS, 25, steps)
+
+    users = base_users[:, None] + (daily_wave + weekend_boost)[None, :] + noise
+    return np.clip(users, 30, 900).astype(int)
+
+
+def generate_traffic(sites, days=90, resolution_minutes=60, start="2025-04-01", seed=42,
+                     neighbors=None, profile_mode="auto"):
+    """
+    Verilen site indeksleri (0 tabanlı) için sentetik trafik tablosu üretir.
+    Tüm siteler (S x T) dizileri üzerinde tek yayınlanmış (broadcast) işlemle
+    hesaplanır; rastgelelik site başına tohumlandığından herhangi bir site
+    kümesi (parça) tek başına yeniden üretilebilir.
+
+    neighbors: (toplam_site x K) komşu indeksleri (-1 = yok). Varsayılan chain_neighbors.
+    profile_mode="auto" toplam site sayısına (len(neighbors)) göre çözülür.
+    """
+    sites = np.asarray(sites, dtype=int)
+    idx = time_index(days, resolution_minutes, start)
+    steps = len(idx)
+    hour = np.asarray(idx.hour + idx.minute / 60.0)
+    if neighbors is None:
+        neighbors = chain_neighbors(sites.max() + 1)
+    profile_mode = resolve_profile_mode(profile_mode, len(neighbors))
+    profiles = lambda s: draw_site_profiles(s, seed, profile_mode)
+
+    users = _site_users(sites, idx, seed, profiles)
 
     # Ortalama kullanıcı başı hız (Mb/sn)
-    mbps_per_user = 2.5 + 0.7 * np.sin(2 * np.pi * idx.hour / 24)
-    throughput = users * mbps_per_user + np.random.normal(0, 60, hours)
+    mbps_per_user = 2.5 + 0.7 * np.sin(2 * np.pi * hour / 24)
+    throughput = users * mbps_per_user[None, :] + _site_normal(seed, sites, _STREAM_THROUGHPUT, 60, steps)
     throughput = np.clip(throughput, 50, None)
 
-    # Parazit modelleme (komşu istasyon yükü etkisi)
-    if site > 0:
-        interference = 0.035 * data[site - 1]["users"].values
-    else:
-        interference = np.zeros(hours)
+    # Parazit modelleme (komşu istasyon yükü etkisi): komşuların ortalama yükü
+    nbr = np.asarray(neighbors)[sites]                      # (S x K)
+    valid = nbr >= 0
+    unique_nbr, inverse = np.unique(nbr[valid], return_inverse=True)
+    interference = np.zeros((len(sites), steps))
+    if unique_nbr.size:
+        nbr_users = _site_users(unique_nbr, idx, seed, profiles).astype(float)
+        gathered = np.zeros(nbr.shape + (steps,))
+        gathered[valid] = nbr_users[inverse]
+        interference = 0.035 * gathered.sum(axis=1) / np.maximum(valid.sum(axis=1), 1)[:, None]
 
     # SINR: kullanıcı ve parazit etkisine göre
-    sinr = 32 - 0.035 * users - 0.015 * interference + np.random.normal(0, 1.5, hours)
+    sinr = 32 - 0.035 * users - 0.015 * interference + _site_normal(seed, sites, _STREAM_SINR, 1.5, steps)
     sinr = np.clip(sinr, 8, 32)
 
     # Enerji tüketimi (baz yüküne orantılı)
-    energy = energy_base[site] + 1.5 * users + np.random.normal(0, 10, hours)
+    _, energy_base = profiles(sites)
+    energy = energy_base[:, None] + 1.5 * users + _site_normal(seed, sites, _STREAM_ENERGY, 10, steps)
     energy = np.clip(energy, 100, None)
 
-    df_site = pd.DataFrame({
-        "datetime": idx,
-        "site_id": site_name,
-        "users": users,
-        "throughput_mbps": np.round(throughput, 2),
-        "sinr_db": np.round(sinr, 2),
-        "energy_w": np.round(energy, 2)
+    site_names = np.array([f"Site_{s + 1}" for s in sites])
+    return pd.DataFrame({
+        "datetime": np.tile(idx.values, len(sites)),
+        "site_id": np.repeat(site_names, steps),
+        "users": users.ravel(),
+        "throughput_mbps": np.round(throughput.ravel(), 2),
+        "sinr_db": np.round(sinr.ravel(), 2),
+        "energy_w": np.round(energy.ravel(), 2)
     })
-    data.append(df_site)
 
-# Tüm siteleri birleştir
-df = pd.concat(data)
-df.reset_index(drop=True, inplace=True)
 
-# Kaydet
-df.to_csv("5G_90gun_5site_veri.csv", index=False)
-print("Veri Hazır: 5G_90gun_5site_veri.csv")
-
-# Hızlı kontrol
-print(df.head(10))
-print(df.describe())
+def _write_shard(args):
+    shard, shard_size, num_sites, output, kwargs = args
+    sites = np.arange(shard * shard_size, min((shard + 1) * shard_size, num_sites))
+    df = generate_traffic(sites, **kwargs)
+    return write_table(df, f"{output}.part-{shard:05d}", csv_export=False)
+
+
+def generate_dataset(num_sites=5, days=90, resolution_minutes=60, start="2025-04-01", seed=42,
+                     neighbor_mode="chain", profile_mode="auto", output=TRAFFIC_DATA_FILE,
+                     shard_size=256, shards=None, workers=1, layout=None, inter_site_m=400.0):
+    """
+    Veri setini diske yazar.
+    Site sayısı shard_size'ı aşmıyorsa tek tablo (output) yazılır. Aşıyorsa
+    siteler shard_size'lık parçalara bölünür ve her parça ayrı dosyaya
+    (output.part-00000, ...) yazılır; bellekte aynı anda yalnızca bir parça
+    tutulur. shards ile yalnızca belirli parçalar (yeniden) üretilebilir,
+    workers > 1 ise parçalar paralel üretilir. shards verilmezse önceki
+    çalışmalardan kalan parça dosyaları (bkz. storage.remove_parts) önce silinir.
+    layout verilirse sitelerin ızgara yerleşimi (site_id, internal_id, x_m, y_m)
+    bu CSV dosyasına yazılır (simulation_runner.py -> SITE_LAYOUT_FILE).
+    """
+    if neighbor_mode == "chain":
+        neighbors = chain_neighbors(num_sites)
+    elif neighbor_mode == "random":
+        neighbors = random_neighbors(num_sites, seed=seed)
+    else:
+        raise ValueError(f"Bilinmeyen komşuluk modu: {neighbor_mode}")
+    # Profil modu tüm veri seti için bir kez seçilir (parçalar aynı profilleri kullanır)
+    kwargs = dict(days=days, resolution_minutes=resolution_minutes, start=start, seed=seed,
+                  neighbors=neighbors, profile_mode=resolve_profile_mode(profile_mode, num_sites))
+    if layout is not None:
+        write_site_layout(grid_layout(num_sites, inter_site_m, seed=seed), layout)
+
+    if shards is None:
+        remove_parts(output)
+    if num_sites <= shard_size and shards is None:
+        df = generate_traffic(np.arange(num_sites), **kwargs)
+        return [write_table(df, output)]
+
+    num_shards = -(-num_sites // shard_size)
+    if shards is None:
+        # Tek tablo varsa read_table onu parçalara tercih eder; eski tabloyu kaldır
+        remove_single(output)
+        shards = range(num_shards)
+    tasks = [(k, shard_size, num_sites, output, kwargs) for k in shards]
+    if workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return list(pool.map(_write_shard, tasks))
+    return [_write_shard(task) for task in tasks]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="5G sentetik trafik verisi üretici")
+    parser.add_argument("--sites", type=int, default=5, help="Baz istasyonu sayısı")
+    parser.add_argument("--days", type=int, default=90, help="Gün sayısı")
+    parser.add_argument("--resolution", type=int, default=60, help="Zaman çözünürlüğü (dakika)")
+    parser.add_argument("--start", default="2025-04-01")
+    parser.add_argument("--seed", type=int, default=42, help="Rastgelelik kontrolü")
+    parser.add_argument("--neighbors", choices=["chain", "random"], default="chain")
+    parser.add_argument("--profiles", choices=["auto", "legacy", "random"], default="auto")
+    parser.add_argument("--output", default=TRAFFIC_DATA_FILE)
+    parser.add_argument("--shard-size", type=int, default=256, help="Parça başına site sayısı")
+    parser.add_argument("--shards", default=None, help="Yalnızca bu parçaları üret, örn. 0,3,7")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--layout", default=None,
+                        help="Site yerleşimini bu CSV dosyasına yaz (örn. sehir_layout.csv; "
+                             "simülasyon için config.SITE_LAYOUT_FILE)")
+    parser.add_argument("--inter-site", type=float, default=400.0, help="Yerleşimde siteler arası mesafe (metre)")
+    args = parser.parse_args(argv)
+
+    print("5G Trafik Verisi Üretiliyor...")
+    shards = [int(k) for k in args.shards.split(",")] if args.shards else None
+    try:
+        paths = generate_dataset(args.sites, args.days, args.resolution, args.start, args.seed,
+                                 args.neighbors, args.profiles, args.output, args.shard_size,
+                                 shards, args.workers, args.layout, args.inter_site)
+    except FileNotFoundError as e:
+        print(f"HATA: {e}")
+        return 1
+    print(f"Veri Hazır: {paths[0]}" + (f" (+{len(paths) - 1} parça)" if len(paths) > 1 else ""))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
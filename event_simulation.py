@@ -0,0 +1,467 @@
+# event_simulation.py
+# Ayrık olaylı (discrete-event) simülasyon çekirdeği.
+#
+# Saatlik zaman damgalarını tek tek yürümek yerine bir öncelik kuyruğu (heapq)
+# üzerinde yalnızca bir şey değiştiğinde ilerler:
+#   - trafik olayları: bir sitenin trafik profilinin kırılma noktaları
+#   - eşik olayları: kullanıcı sayısının uyku eşiğini geçtiği an
+#   - uyku/uyanma geçişlerinin başlaması ve tamamlanması (gecikme + enerji)
+#   - yeniden yapılandırma: histerezis bandını aşan bant/güç değişikliği;
+#     doğrusal profilde hedef bandın parça içinde bandı aştığı an da planlanır
+# Olay zamanları saniye cinsindendir ve resolution_s'e yuvarlanır. Olaysız
+# dönemler adımlanmaz; enerji ve süre sayaçları iki olay arasında parça parça
+# sabit güçle tek seferde ilerletilir. Böylece dakika/saniye çözünürlüğünde
+# 90 günlük çalışmaların maliyeti adım sayısıyla değil olay sayısıyla orantılıdır.
+import argparse
+import heapq
+import itertools
+import math
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import (ALLOCATOR_CONFIG, BASELINE_CONFIG, CARRIER_FREQ_MHZ, EVENT_RESULTS_FILE,
+                    EVENT_SIM_CONFIG, OPTIMIZED_CONFIG, TIME_STEP_MINUTES, TRAFFIC_DATA_FILE)
+from physics_engine import PhysicsEngine
+from resource_allocator import RESOURCE_MODELS, get_strategy
+from storage import read_table, write_table
+
+# İstasyon durumları
+ACTIVE = "active"
+ENTERING_SLEEP = "entering_sleep"
+SLEEP = "sleep"
+WAKING = "waking"
+STATES = (ACTIVE, ENTERING_SLEEP, SLEEP, WAKING)
+
+
+class SiteState:
+    """Bir sitenin olaylar arasında taşınan durumu."""
+    __slots__ = ("state", "bw", "power", "knots", "knot", "t0", "u0", "slope", "snr", "last_t",
+                 "hold_pending", "hold_version", "config_version", "pending_bw", "drift_version",
+                 "energy_kwh", "time_in", "sleep_entries", "wakeups", "reconfigs", "unserved_user_s")
+
+    def __init__(self, knots):
+        self.state = ACTIVE
+        self.bw = math.nan
+        self.power = 0.0
+        self.knots = knots           # Trafik profilinin kırılma noktaları (örnek indeksleri)
+        self.knot = 0
+        self.t0 = self.u0 = self.slope = self.snr = 0.0
+        self.last_t = 0.0
+        self.hold_pending = False
+        self.hold_version = 0
+        self.config_version = 0
+        self.pending_bw = math.nan   # Gecikmeli uygulanacak bant (yoksa nan)
+        self.drift_version = 0
+        self.energy_kwh = 0.0
+        self.time_in = dict.fromkeys(STATES, 0.0)
+        self.sleep_entries = 0
+        self.wakeups = 0
+        self.reconfigs = 0
+        self.unserved_user_s = 0.0
+
+
+def traffic_knots(users, snr, linear):
+    """
+    Her site için trafik profilinin değiştiği örnek indeksleri.
+    step: kullanıcı sayısı veya SNR değişen saatler; linear: eğimin veya
+    SNR'ın değiştiği saatler (doğrusal parçaların başlangıçları).
+    """
+    T = users.shape[0]
+    if linear:
+        slope = np.zeros_like(users)
+        slope[:-1] = np.diff(users, axis=0)
+        changed = np.diff(slope, axis=0) != 0
+    else:
+        changed = np.diff(users, axis=0) != 0
+    changed |= np.diff(snr, axis=0) != 0
+    first = np.ones((1, users.shape[1]), dtype=bool)
+    mask = np.vstack([first, changed]) if T > 1 else first
+    return [np.flatnonzero(mask[:, s]) for s in range(users.shape[1])]
+
+
+class EventDrivenSimulator:
+    """
+    Optimized senaryosu için olay güdümlü enerji simülatörü.
+
+    Kullanıcı sayısı sleep_mode_threshold_users altına düşen ve sleep_hold_s
+    boyunca altında kalan istasyon uykuya geçer (sleep_entry_latency_s);
+    uykuda sleep_draw_watt çeker ve hizmet vermez. Trafik eşiği aştığında
+    uyanır (wake_latency_s); her geçiş transition_energy_wh ek enerji harcar.
+    Aktif istasyonun bant/gücü ALLOCATOR_CONFIG kaynak modeliyle hesaplanır
+    ve hysteresis_margin_mhz aşıldığında reconfig_latency_s sonra uygulanır.
+    Doğrusal profilde hedef bant parça içinde de değiştiğinden, bandı aştığı
+    an ikiye bölme (bisection) ile bulunup "drift" olayı olarak planlanır;
+    bunun için modelin bandı kullanıcı sayısıyla azalmamalıdır.
+
+    arrays: simulation_runner.build_site_arrays çıktısı. Kaydı olmayan
+    saatler 0 kullanıcı kabul edilir.
+    """
+
+    def __init__(self, arrays, optimized_config=OPTIMIZED_CONFIG, event_config=EVENT_SIM_CONFIG,
+                 allocator_config=ALLOCATOR_CONFIG, sample_interval_s=TIME_STEP_MINUTES * 60,
+                 record_events=False):
+        if event_config['traffic_profile'] not in ("step", "linear"):
+            raise ValueError(f"Bilinmeyen trafik profili: {event_config['traffic_profile']} (step, linear)")
+        self.cfg = optimized_config
+        self.ev = event_config
+        self.physics = PhysicsEngine(CARRIER_FREQ_MHZ)
+        name = allocator_config['resource_model']
+        params = allocator_config.get('strategy_params', {}).get(name, {})
+        self.model = get_strategy(RESOURCE_MODELS, name, **params)
+
+        timestamps = pd.DatetimeIndex(arrays['timestamps'])
+        self.start = timestamps[0]
+        self.sample_t = (timestamps - self.start).total_seconds().to_numpy()
+        self.horizon = float(self.sample_t[-1] + sample_interval_s)
+        self.site_names = list(arrays['site_names'])
+        self.users = np.nan_to_num(arrays['users'])
+        # Kaydı olmayan saatlerde en yakın kayıtlı saatin SNR'ı kullanılır
+        self.snr = pd.DataFrame(arrays['snr']).ffill().bfill().to_numpy()
+        self.linear = event_config['traffic_profile'] == "linear"
+        self.resolution = float(event_config['resolution_s'])
+        self.threshold = optimized_config['sleep_mode_threshold_users']
+
+        knots = traffic_knots(self.users, self.snr, self.linear)
+        self.sites = [SiteState(k) for k in knots]
+        self._queue = []
+        self._seq = itertools.count()
+        self.events_processed = 0
+        self.log = [] if record_events else None
+        self._handlers = {
+            "traffic": self._on_traffic,
+            "threshold": self._on_threshold,
+            "sleep_hold": self._on_sleep_hold,
+            "sleep_done": self._on_sleep_done,
+            "wake_done": self._on_wake_done,
+            "reconfig": self._on_reconfig,
+            "drift": self._on_drift,
+        }
+
+    # --- Kuyruk ---
+    def _quantize(self, t):
+        return math.ceil(t / self.resolution - 1e-9) * self.resolution
+
+    def _schedule(self, t, kind, site, tag=None):
+        # Aynı anda gerçekleşen olaylar kuyruğa giriş sırasıyla işlenir (seq)
+        heapq.heappush(self._queue, (t, next(self._seq), kind, site, tag))
+
+    def _log(self, t, s, event):
+        if self.log is not None:
+            st = self.sites[s]
+            self.log.append((t, s, event, st.state, self._users_at(st, t), st.bw, st.power))
+
+    # --- Site durumu ---
+    def _users_at(self, st, t):
+        return st.u0 + st.slope * (t - st.t0)
+
+    def _advance(self, s, t):
+        """Sitenin enerji ve süre sayaçlarını t anına kadar ilerletir (parça sabit güç)."""
+        st = self.sites[s]
+        dt = t - st.last_t
+        if dt <= 0:
+            return
+        if st.state == SLEEP:
+            st.energy_kwh += self.ev['sleep_draw_watt'] * dt / 3.6e6
+        else:
+            st.energy_kwh += float(self.physics.energy_batch(st.power, dt / 3600))
+        if st.state != ACTIVE:
+            st.unserved_user_s += self._users_at(st, (st.last_t + t) / 2) * dt
+        st.time_in[st.state] += dt
+        st.last_t = t
+
+    def _set_segment(self, s, t):
+        """Sitenin t anında başlayan trafik parçasını kurar; parça içindeki eşik geçişini planlar."""
+        st = self.sites[s]
+        k = st.knots[st.knot]
+        st.knot += 1
+        end = self.sample_t[st.knots[st.knot]] if st.knot < len(st.knots) else self.horizon
+        st.t0, st.u0, st.snr = t, self.users[k, s], self.snr[k, s]
+        st.slope = 0.0
+        if self.linear and k + 1 < len(self.sample_t):
+            st.slope = (self.users[k + 1, s] - st.u0) / (self.sample_t[k + 1] - self.sample_t[k])
+        if st.knot < len(st.knots):
+            self._schedule(end, "traffic", s)
+        if st.slope != 0:
+            crossing = t + (self.threshold - st.u0) / st.slope
+            if t < crossing < end:
+                crossing = self._quantize(crossing)
+                if crossing < end:
+                    self._schedule(crossing, "threshold", s, st.knot)
+
+    def _target(self, st, t):
+        """Anlık kullanıcı sayısı için (bant, güç); sınırlar apply_optimized_constraints ile aynıdır."""
+        cfg = self.cfg
+        users = self._users_at(st, t)
+        if users < self.threshold:
+            return cfg['min_bandwidth_mhz'], cfg['min_power_watt']
+        bw = self.model.bandwidth(np.array([users]), np.array([st.snr]))
+        bw = np.clip(bw, cfg['min_bandwidth_mhz'], cfg['max_bandwidth_mhz'])
+        power = np.clip(self.model.power(np.array([users]), bw, cfg), cfg['min_power_watt'], cfg['max_power_watt'])
+        return float(bw[0]), float(power[0])
+
+    def _apply_config(self, s, t, bw, power):
+        self._advance(s, t)
+        st = self.sites[s]
+        st.bw, st.power = bw, power
+        st.pending_bw = math.nan
+        st.reconfigs += 1
+        self._log(t, s, "reconfig")
+
+    def _held_bw(self, st):
+        """Histerezisin referans aldığı bant: bekleyen yapılandırma varsa onun bandı."""
+        return st.bw if math.isnan(st.pending_bw) else st.pending_bw
+
+    def _reconfigure(self, s, t):
+        st = self.sites[s]
+        bw, power = self._target(st, t)
+        if abs(bw - self._held_bw(st)) < self.cfg['hysteresis_margin_mhz']:
+            return  # Histerezis bandı içinde; mevcut konfigürasyon korunur
+        latency = self.ev['reconfig_latency_s']
+        if latency > 0:
+            st.config_version += 1
+            st.pending_bw = bw
+            self._schedule(self._quantize(t + latency), "reconfig", s, (st.config_version, bw, power))
+        else:
+            self._apply_config(s, t, bw, power)
+
+    def _schedule_drift(self, s, t):
+        """
+        Doğrusal parça içinde hedef bandın tutulan banttan hysteresis_margin_mhz
+        uzaklaştığı ilk anı bulur ve "drift" olayı planlar. Hedef bant parça
+        içinde tekdüze olduğundan an ikiye bölme ile resolution_s'e kadar aranır.
+        """
+        st = self.sites[s]
+        st.drift_version += 1
+        if st.slope == 0:
+            return
+        held, margin = self._held_bw(st), self.cfg['hysteresis_margin_mhz']
+
+        def crossed(x):
+            return abs(self._target(st, x)[0] - held) >= margin
+
+        end = self.sample_t[st.knots[st.knot]] if st.knot < len(st.knots) else self.horizon
+        if not crossed(end):
+            return  # Parça sonundaki trafik olayı yeniden değerlendirir
+        lo, hi = t, end
+        while hi - lo > self.resolution:
+            mid = (lo + hi) / 2
+            if crossed(mid):
+                hi = mid
+            else:
+                lo = mid
+        at = self._quantize(hi)
+        if t < at < end:
+            self._schedule(at, "drift", s, st.drift_version)
+
+    def _evaluate(self, s, t):
+        """Trafik veya eşik olayından sonra uyku/uyanma ve yeniden yapılandırma kararları."""
+        st = self.sites[s]
+        below = self._users_at(st, t) < self.threshold
+        if st.state == ACTIVE:
+            if below and not st.hold_pending:
+                st.hold_pending = True
+                self._schedule(self._quantize(t + self.ev['sleep_hold_s']), "sleep_hold", s, st.hold_version)
+            elif not below and st.hold_pending:
+                # Bekleyen uyku iptal (kuyruktaki olay sürüm numarasıyla elenir)
+                st.hold_pending = False
+                st.hold_version += 1
+            self._reconfigure(s, t)
+            self._schedule_drift(s, t)
+        elif st.state == SLEEP and not below:
+            self._wake(s, t)
+        # ENTERING_SLEEP / WAKING: geçiş tamamlanınca yeniden değerlendirilir
+
+    def _wake(self, s, t):
+        self._advance(s, t)
+        st = self.sites[s]
+        st.state = WAKING
+        st.power = self.cfg['min_power_watt']
+        st.wakeups += 1
+        st.energy_kwh += self.ev['transition_energy_wh'] / 1000
+        self._log(t, s, "wake")
+        self._schedule(self._quantize(t + self.ev['wake_latency_s']), "wake_done", s)
+
+    # --- Olay işleyicileri ---
+    def _on_traffic(self, t, s, tag):
+        self._advance(s, t)
+        self._set_segment(s, t)
+        self._evaluate(s, t)
+
+    def _on_threshold(self, t, s, knot):
+        if knot != self.sites[s].knot:
+            return  # Eski parçaya ait
+        self._advance(s, t)
+        self._evaluate(s, t)
+
+    def _on_sleep_hold(self, t, s, version):
+        st = self.sites[s]
+        if version != st.hold_version or st.state != ACTIVE:
+            return
+        st.hold_pending = False
+        if self._users_at(st, t) >= self.threshold:
+            return
+        self._advance(s, t)
+        st.state = ENTERING_SLEEP
+        st.power = self.cfg['min_power_watt']
+        st.config_version += 1  # Bekleyen yeniden yapılandırma iptal
+        st.pending_bw = math.nan
+        st.sleep_entries += 1
+        st.energy_kwh += self.ev['transition_energy_wh'] / 1000
+        self._log(t, s, "sleep")
+        self._schedule(self._quantize(t + self.ev['sleep_entry_latency_s']), "sleep_done", s)
+
+    def _on_sleep_done(self, t, s, tag):
+        self._advance(s, t)
+        st = self.sites[s]
+        st.state = SLEEP
+        st.bw, st.power = math.nan, 0.0
+        self._log(t, s, "sleep_done")
+        if self._users_at(st, t) >= self.threshold:
+            self._wake(s, t)
+
+    def _on_wake_done(self, t, s, tag):
+        self._advance(s, t)
+        st = self.sites[s]
+        st.state = ACTIVE
+        self._log(t, s, "wake_done")
+        self._apply_config(s, t, *self._target(st, t))
+        self._evaluate(s, t)
+
+    def _on_reconfig(self, t, s, tag):
+        version, bw, power = tag
+        st = self.sites[s]
+        if version == st.config_version and st.state == ACTIVE:
+            self._apply_config(s, t, bw, power)
+
+    def _on_drift(self, t, s, version):
+        st = self.sites[s]
+        if version != st.drift_version or st.state != ACTIVE:
+            return  # Daha yeni bir değerlendirme veya uyku geçişiyle geçersiz
+        self._reconfigure(s, t)
+        self._schedule_drift(s, t)
+
+    # --- Çalıştırma ---
+    def run(self):
+        """Kuyruğu ufka (son örnek + örnek aralığı) kadar işler. Dönüş: site özeti DataFrame"""
+        for s, st in enumerate(self.sites):
+            self._set_segment(s, 0.0)
+            st.bw, st.power = self._target(st, 0.0)
+            self._evaluate(s, 0.0)
+
+        while self._queue:
+            t, _, kind, s, tag = heapq.heappop(self._queue)
+            if t >= self.horizon:
+                break
+            self.events_processed += 1
+            self._handlers[kind](t, s, tag)
+
+        for s in range(len(self.sites)):
+            self._advance(s, self.horizon)
+        return self.summary()
+
+    def summary(self, baseline_config=BASELINE_CONFIG):
+        hours = self.horizon / 3600
+        baseline = float(self.physics.energy_batch(baseline_config['tx_power_watt'], hours))
+        rows = []
+        for name, st in zip(self.site_names, self.sites):
+            rows.append({
+                "Site": name,
+                "Energy_kWh": round(st.energy_kwh, 3),
+                "Baseline_Energy_kWh": round(baseline, 3),
+                "Saving_pct": round(100 * (1 - st.energy_kwh / baseline), 2),
+                "Active_h": round(st.time_in[ACTIVE] / 3600, 3),
+                "Sleep_h": round(st.time_in[SLEEP] / 3600, 3),
+                "Transition_h": round((st.time_in[ENTERING_SLEEP] + st.time_in[WAKING]) / 3600, 3),
+                "Sleep_Entries": st.sleep_entries,
+                "Wakeups": st.wakeups,
+                "Reconfigurations": st.reconfigs,
+                "Unserved_User_h": round(st.unserved_user_s / 3600, 3),
+            })
+        return pd.DataFrame(rows)
+
+    def event_log(self):
+        """Kaydedilen olaylar (record_events=True) DataFrame olarak."""
+        if self.log is None:
+            return None
+        t, s, event, state, users, bw, power = (list(col) for col in zip(*self.log)) if self.log else ([],) * 7
+        return pd.DataFrame({
+            "Time": self.start + pd.to_timedelta(np.asarray(t, dtype=float), unit="s"),
+            "Site": np.asarray(self.site_names, dtype=object)[np.asarray(s, dtype=int)],
+            "Event": pd.Categorical(event),
+            "State": pd.Categorical(state, categories=STATES),
+            "Users": np.round(np.asarray(users, dtype=float), 1),
+            "BW_MHz": np.round(np.asarray(bw, dtype=float), 1),
+            "Power_W": np.round(np.asarray(power, dtype=float), 1),
+        })
+
+
+# --- VERİ ---
+def load_event_arrays(source="predictions", days=None):
+    """
+    Olay simülasyonu girdisi: "predictions" tahmin tablosu (simulation_runner
+    ile aynı), "traffic" ise tüm dönemin ölçülmüş trafiği (TRAFFIC_DATA_FILE).
+    days: yalnızca ilk bu kadar gün
+    """
+    import simulation_runner
+
+    if source == "traffic":
+        df = read_table(TRAFFIC_DATA_FILE, columns=["datetime", "site_id", "users", "sinr_db"])
+        df = df.rename(columns={"users": "pred_users", "sinr_db": "est_snr_db"})
+        df['site_id'] = df['site_id'].astype(str)
+        df = simulation_runner.attach_site_layout(df)
+    else:
+        df = simulation_runner.load_prediction_data()
+    if days is not None:
+        df = df[df['datetime'] < df['datetime'].min() + pd.Timedelta(days=days)]
+    return simulation_runner.build_site_arrays(df)
+
+
+def run_event_simulation(arrays, event_config=EVENT_SIM_CONFIG, record_events=False):
+    """Dönüş: (özet DataFrame, olay kaydı DataFrame veya None, simülatör)"""
+    simulator = EventDrivenSimulator(arrays, event_config=event_config, record_events=record_events)
+    summary = simulator.run()
+    return summary, simulator.event_log(), simulator
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Ayrık olaylı 5G enerji simülasyonu (uyku modu geçişleri)")
+    parser.add_argument("--source", choices=["predictions", "traffic"], default="predictions",
+                        help="predictions: tahmin dönemi, traffic: tüm ölçülmüş dönem (ör. 90 gün)")
+    parser.add_argument("--days", type=float, default=None, help="Yalnızca ilk N gün")
+    parser.add_argument("--resolution", type=float, default=None, help="Olay zamanı çözünürlüğü (saniye)")
+    parser.add_argument("--profile", choices=["step", "linear"], default=None, help="Saat içi trafik profili")
+    parser.add_argument("--output", default=EVENT_RESULTS_FILE)
+    parser.add_argument("--log", default=None, help="Olay kaydı dosyası (verilirse tüm olaylar yazılır)")
+    args = parser.parse_args(argv)
+
+    event_config = dict(EVENT_SIM_CONFIG)
+    if args.resolution is not None:
+        event_config['resolution_s'] = args.resolution
+    if args.profile is not None:
+        event_config['traffic_profile'] = args.profile
+
+    try:
+        arrays = load_event_arrays(args.source, args.days)
+    except FileNotFoundError as e:
+        print(f"HATA: {e}")
+        return 1
+    start = time.perf_counter()
+    summary, log, simulator = run_event_simulation(arrays, event_config, record_events=args.log is not None)
+    elapsed = time.perf_counter() - start
+
+    steps = int(simulator.horizon / event_config['resolution_s']) * len(simulator.site_names)
+    print(f">>> {simulator.events_processed} olay {elapsed:.2f} sn'de işlendi "
+          f"(sabit adımlı eşdeğeri: {steps} site-adım, çözünürlük {event_config['resolution_s']:g} sn).")
+    path = write_table(summary, args.output)
+    print(f">>> Özet '{path}' dosyasına kaydedildi.")
+    if log is not None:
+        print(f">>> Olay kaydı '{write_table(log, args.log)}' dosyasına kaydedildi.")
+    print(summary.to_string(index=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,107 @@
+# forecast_cache.py
+# Eğitilmiş model parametreleri ve tahminler için içerik adresli disk önbelleği.
+# Anahtar: girdi veri diliminin ve model hiperparametrelerinin SHA-256 özeti
+# (model deterministiktir; rastgele tohum kullanılmaz). Önbellek boyutu LRU
+# (en uzun süredir kullanılmayan önce silinir) ile sınırlandırılır; disk
+# deposu npz_cache.NpzCache'tir.
+import hashlib
+import json
+
+import numpy as np
+
+from config import FORECAST_CACHE_DIR, FORECAST_CACHE_MAX_MB, FORECAST_PARAMS
+from npz_cache import NpzCache
+
+# Önbellek biçimi veya model değiştiğinde eski girdileri geçersiz kılmak için
+CACHE_VERSION = 2
+
+FORECAST_COLUMNS = ["datetime", "site_id", "users", "sinr_db"]
+
+
+def data_fingerprint(df, columns=FORECAST_COLUMNS):
+    """
+    Tahmin girdisi olarak kullanılan sütunların içerik özeti (hex).
+    Metin sütunları kategori kodları + kategori listesi olarak özetlenir.
+    """
+    import pandas as pd
+
+    h = hashlib.sha256()
+    for col in columns:
+        series = df[col]
+        h.update(col.encode())
+        if pd.api.types.is_datetime64_any_dtype(series):
+            h.update(series.to_numpy().astype("datetime64[ns]").view(np.int64).tobytes())
+        elif pd.api.types.is_numeric_dtype(series):
+            h.update(np.ascontiguousarray(series.to_numpy(dtype=float)).tobytes())
+        else:
+            cat = pd.Categorical(series.astype(str))
+            h.update("\x00".join(cat.categories).encode())
+            h.update(cat.codes.astype(np.int32).tobytes())
+    return h.hexdigest()
+
+
+class ForecastCache(NpzCache):
+    """Tahmin önbelleği; anahtar veri özeti + model parametreleridir."""
+
+    def __init__(self, root=FORECAST_CACHE_DIR, max_bytes=FORECAST_CACHE_MAX_MB * 2**20):
+        super().__init__(root, max_bytes)
+
+    def key(self, df, params):
+        payload = json.dumps({"version": CACHE_VERSION, "params": params}, sort_keys=True)
+        h = hashlib.sha256(data_fingerprint(df).encode())
+        h.update(payload.encode())
+        return h.hexdigest()
+
+
+def _pack(pred_df, results, model):
+    sites = list(results)
+    return {
+        "sites": np.array(sites),
+        "real": np.stack([results[s][0] for s in sites]),
+        "pred": np.stack([results[s][1] for s in sites]),
+        "datetime": pred_df["datetime"].to_numpy().astype("datetime64[ns]"),
+        "site_id": pred_df["site_id"].astype(str).to_numpy().astype(str),
+        "pred_users": pred_df["pred_users"].to_numpy(),
+        "est_snr_db": pred_df["est_snr_db"].to_numpy(),
+        **{"model_" + k: v for k, v in model.get_params().items()},
+    }
+
+
+def _unpack(entry):
+    import pandas as pd
+    from forecaster import GlobalForecaster
+
+    sites = [str(s) for s in entry["sites"]]
+    results = {s: (entry["real"][i], entry["pred"][i]) for i, s in enumerate(sites)}
+    pred_df = pd.DataFrame({
+        "datetime": entry["datetime"],
+        "site_id": entry["site_id"],
+        "pred_users": entry["pred_users"],
+        "est_snr_db": entry["est_snr_db"],
+    })
+    model = GlobalForecaster.from_params({k[len("model_"):]: v for k, v in entry.items()
+                                          if k.startswith("model_")})
+    return pred_df, results, model
+
+
+def cached_predictions(df, params=None, cache=None):
+    """
+    Tahminleri önbellekten getirir; yoksa lstm_train.build_predictions ile
+    hesaplayıp önbelleğe yazar.
+    params: FORECAST_PARAMS anahtarları (test_hours, window, horizon, alpha)
+    Dönüş: (pred_df, results, model, hit)
+    """
+    from lstm_train import build_predictions
+
+    params = {**FORECAST_PARAMS, **(params or {})}
+    cache = cache or ForecastCache()
+    key = cache.key(df, params)
+
+    entry = cache.get(key)
+    if entry is not None:
+        return (*_unpack(entry), True)
+
+    pred_df, results, model = build_predictions(df, params["test_hours"], params["window"],
+                                                params["horizon"], params["alpha"])
+    cache.put(key, _pack(pred_df, results, model))
+    return pred_df, results, model, False
@@ -0,0 +1,142 @@
+# forecaster.py
+# Tüm siteler için tek (global) bir model eğiten, yalnızca NumPy ile CPU
+# üzerinde çalışan trafik tahmin alt sistemi.
+#
+# Model: Doğrudan çok adımlı (direct multi-horizon) doğrusal otoregresif model.
+# Son `window` saatlik (site ortalamasına göre ölçeklenmiş) yük, sonraki
+# `horizon` saati tahmin eder. Ağırlıklar ridge regresyonla kapalı formda
+# bulunur: B = (X^T X + alpha*I)^-1 X^T Y
+import time
+
+import numpy as np
+from numpy.lib.stride_tricks import sliding_window_view
+
+
+def to_site_matrix(df, value_col="users", time_col="datetime", site_col="site_id"):
+    """
+    Uzun formatlı tabloyu (S x T) matrise çevirir.
+    Dönüş: (values, timestamps, site_names)
+    """
+    wide = df.pivot_table(index=time_col, columns=site_col, values=value_col,
+                          aggfunc="first", observed=True).sort_index()
+    wide = wide.interpolate(limit_direction="both")
+    return wide.to_numpy(dtype=float).T, wide.index.to_numpy(), [str(c) for c in wide.columns]
+
+
+def sliding_windows(series, window, horizon):
+    """
+    (S x T) seriden kopyasız kayan pencereler.
+    Dönüş: X (S x W x window), Y (S x W x horizon) - her ikisi de görünüm (view)
+    W = T - window - horizon + 1
+    """
+    full = sliding_window_view(series, window + horizon, axis=-1)
+    return full[..., :window], full[..., window:]
+
+
+class GlobalForecaster:
+    """
+    Tüm siteler üzerinde ortak eğitilen doğrusal çok adımlı tahminci.
+
+    Her site kendi eğitim ortalamasına bölünerek ölçeklenir; böylece farklı
+    yoğunluktaki siteler aynı ağırlıkları paylaşır. Eğitim ve çıkarım tüm
+    siteler için toplu (batched) yapılır; throughput ölçümleri
+    train_stats / infer_stats içinde tutulur (pencere/sn).
+    """
+
+    def __init__(self, window=168, horizon=24, alpha=1.0, batch_windows=65536):
+        self.window = window
+        self.horizon = horizon
+        self.alpha = alpha
+        self.batch_windows = batch_windows
+        self.weights = None       # (window + 1) x horizon (son satır: bias)
+        self.scale = None         # (S,) site ölçekleri
+        self.train_stats = {}
+        self.infer_stats = {}
+
+    def _features(self, x):
+        # x: (..., window) ölçeklenmiş geçmiş -> (..., window + 1) bias eklenmiş
+        return np.concatenate([x, np.ones(x.shape[:-1] + (1,))], axis=-1)
+
+    def fit(self, series):
+        """
+        series: (S x T) eğitim serisi (site x zaman)
+        """
+        series = np.asarray(series, dtype=float)
+        if series.shape[1] < self.window + self.horizon:
+            raise ValueError(f"Eğitim serisi en az {self.window + self.horizon} adım olmalı "
+                             f"(mevcut: {series.shape[1]})")
+        t0 = time.perf_counter()
+
+        self.scale = np.maximum(series.mean(axis=1), 1e-6)
+        scaled = series / self.scale[:, None]
+        X, Y = sliding_windows(scaled, self.window, self.horizon)
+        n_sites, n_windows = X.shape[:2]
+
+        d = self.window + 1
+        xtx = np.zeros((d, d))
+        xty = np.zeros((d, self.horizon))
+        # Pencereler görünüm olarak kalır; yalnızca bir parti (tüm sitelerde
+        # toplam ~batch_windows pencere) matris çarpımı için bitişik belleğe alınır.
+        step = max(1, self.batch_windows // n_sites)
+        for start in range(0, n_windows, step):
+            xb = self._features(X[:, start:start + step]).reshape(-1, d)
+            yb = Y[:, start:start + step].reshape(-1, self.horizon)
+            xtx += xb.T @ xb
+            xty += xb.T @ yb
+
+        reg = self.alpha * np.eye(d)
+        reg[-1, -1] = 0.0  # bias düzenlileştirilmez
+        self.weights = np.linalg.solve(xtx + reg, xty)
+
+        elapsed = time.perf_counter() - t0
+        total = n_sites * n_windows
+        self.train_stats = {"windows": total, "seconds": elapsed,
+                            "windows_per_sec": total / elapsed if elapsed > 0 else float("inf")}
+        return self
+
+    def predict(self, history):
+        """
+        Tüm siteler için bir sonraki `horizon` adımı tahmin eder.
+        history: (S x >=window) gerçek geçmiş (site sırası fit ile aynı)
+        Dönüş: (S x horizon)
+        """
+        history = np.asarray(history, dtype=float)[:, -self.window:]
+        scaled = history / self.scale[:, None]
+        return np.maximum(self._features(scaled) @ self.weights, 0.0) * self.scale[:, None]
+
+    def rolling_forecast(self, series, start, steps):
+        """
+        [start, start + steps) aralığı için, her `horizon` adımda bir gerçek
+        geçmişle yenilenen (ör. gün öncesi) tahminler. Tüm siteler ve tüm
+        tahmin başlangıç noktaları tek matris çarpımıyla hesaplanır.
+        series: (S x T) gerçek seri, start >= window
+        Dönüş: (S x steps)
+        """
+        if start < self.window:
+            raise ValueError(f"Tahmin başlangıcı en az window ({self.window}) olmalı")
+        t0 = time.perf_counter()
+
+        series = np.asarray(series, dtype=float)
+        scaled = series / self.scale[:, None]
+        origins = np.arange(start, start + steps, self.horizon)
+        history = sliding_window_view(scaled, self.window, axis=-1)[:, origins - self.window]
+        pred = np.maximum(self._features(history) @ self.weights, 0.0)   # (S x O x horizon)
+        pred = pred.reshape(series.shape[0], -1)[:, :steps] * self.scale[:, None]
+
+        elapsed = time.perf_counter() - t0
+        total = series.shape[0] * len(origins)
+        self.infer_stats = {"windows": total, "seconds": elapsed,
+                            "windows_per_sec": total / elapsed if elapsed > 0 else float("inf")}
+        return pred
+
+    def get_params(self):
+        """Önbelleğe/diske yazılabilir model parametreleri (NumPy dizileri)."""
+        return {"window": np.array(self.window), "horizon": np.array(self.horizon),
+                "alpha": np.array(self.alpha), "weights": self.weights, "scale": self.scale}
+
+    @classmethod
+    def from_params(cls, params):
+        model = cls(int(params["window"]), int(params["horizon"]), float(params["alpha"]))
+        model.weights = np.asarray(params["weights"])
+        model.scale = np.asarray(params["scale"])
+        return model
@@ -0,0 +1,150 @@
+# gain_cache.py
+# İstasyon -> UE kazanç (path loss) tabloları için önbellek.
+#
+# Site ve UE konumları zamanla değişmez; kazanç yalnızca yerleşime, taşıyıcı
+# frekansa ve sönümleme katsayısına bağlıdır. Tablolar bir kez hesaplanır,
+# yerleşim özeti + yayılım parametreleri anahtarıyla diske yazılır ve süreç
+# içinde de (memo) tutulur; böylece tüm zaman adımları, Baseline/Optimized
+# senaryoları ve tarama (sweep) çalıştırmaları aynı tabloyu kullanır.
+import hashlib
+import json
+from collections import OrderedDict
+
+import numpy as np
+
+from config import GAIN_CACHE_DIR, GAIN_CACHE_ENABLED, GAIN_CACHE_MAX_MB, GAIN_MEMO_MAX_MB
+from npz_cache import NpzCache
+from spatial_index import SpatialIndex
+
+# Kazanç modeli veya tablo biçimi değiştiğinde eski girdileri geçersiz kılmak için
+CACHE_VERSION = 1
+
+_MEMO = OrderedDict()
+
+
+def layout_hash(site_pos, ue_pos):
+    """Site ve UE konumlarının içerik özeti (hex)."""
+    h = hashlib.sha256()
+    for pos in (site_pos, ue_pos):
+        pos = np.ascontiguousarray(pos, dtype=np.float64)
+        h.update(str(pos.shape).encode())
+        h.update(pos.tobytes())
+    return h.hexdigest()
+
+
+class DistanceGainTable:
+    """
+    Nicemlenmiş mesafe -> kazanç tablosu. Mesafe resolution_m adımla
+    yuvarlanır ve kazanç tablodan okunur (log10 ve üs alma yapılmaz).
+    Nicemleme hatası d mesafesinde en fazla -10 n log10(1 - res / 2d) dB'dir;
+    örn. res = 0.5 m, n = 3.5 için 100 m'de 0.038 dB.
+    Sonsuz mesafeler (komşu tablosundaki boş hücreler) 0 kazanç verir.
+    """
+
+    def __init__(self, interference, resolution_m=0.5, max_distance_m=1000.0):
+        self.interference = interference
+        self.resolution_m = resolution_m
+        self.table = np.zeros(1)
+        self._grow(max_distance_m)
+
+    def _grow(self, max_distance_m):
+        # Son eleman (0 kazanç) tablo dışı/sonsuz mesafeler içindir
+        size = int(np.ceil(max_distance_m / self.resolution_m)) + 2
+        if size + 1 > self.table.size:
+            d = np.maximum(1.0, np.arange(size) * self.resolution_m)
+            self.table = np.append(self.interference.gain_matrix(d), 0.0)
+
+    def __call__(self, distance_m):
+        distance_m = np.asarray(distance_m, dtype=float)
+        top = distance_m.max(initial=0.0)
+        if not np.isfinite(top):
+            top = np.max(distance_m, where=np.isfinite(distance_m), initial=0.0)
+        self._grow(top)
+        idx = distance_m * (1.0 / self.resolution_m)
+        idx += 0.5
+        np.minimum(idx, self.table.size - 1, out=idx)
+        return self.table[idx.astype(np.intp)]
+
+    def max_error_db(self, distance_m):
+        return -10 * self.interference.path_loss_exp * np.log10(1 - self.resolution_m / (2 * np.asarray(distance_m)))
+
+
+class GainCache(NpzCache):
+    """Kazanç tablosu disk önbelleği (LRU boyut sınırlı .npz girdileri)."""
+
+    def __init__(self, root=GAIN_CACHE_DIR, max_bytes=GAIN_CACHE_MAX_MB * 2**20):
+        super().__init__(root, max_bytes)
+
+
+def gain_key(interference, site_pos, ue_pos, radius_m=None, lut_resolution_m=None):
+    payload = json.dumps({
+        "version": CACHE_VERSION,
+        "carrier_freq_mhz": interference.physics.freq_hz / 1e6,
+        "path_loss_exp": float(interference.path_loss_exp),
+        "radius_m": radius_m,
+        "lut_resolution_m": lut_resolution_m,
+    }, sort_keys=True)
+    h = hashlib.sha256(layout_hash(site_pos, ue_pos).encode())
+    h.update(payload.encode())
+    return h.hexdigest()
+
+
+def _compute_tables(interference, site_pos, ue_pos, radius_m, lut_resolution_m, index_backend):
+    gain_of = interference.gain_matrix
+    if lut_resolution_m is not None:
+        gain_of = DistanceGainTable(interference, lut_resolution_m)
+
+    if radius_m is None:
+        diff = site_pos[:, None, :] - ue_pos[None, :, :]
+        distance = np.maximum(1.0, np.sqrt((diff**2).sum(axis=-1)))  # (N x U)
+        return {"gain": gain_of(distance)}
+
+    index = SpatialIndex(site_pos, backend=index_backend)
+    neighbors, distance = index.neighbor_table(ue_pos, radius_m)     # (U x K)
+    distance = np.maximum(1.0, distance)
+    return {"neighbors": neighbors, "neighbor_distance": distance, "neighbor_gain": gain_of(distance)}
+
+
+def _memo_put(key, tables):
+    _MEMO[key] = tables
+    _MEMO.move_to_end(key)
+    total = sum(a.nbytes for t in _MEMO.values() for a in t.values())
+    while total > GAIN_MEMO_MAX_MB * 2**20 and len(_MEMO) > 1:
+        _, old = _MEMO.popitem(last=False)
+        total -= sum(a.nbytes for a in old.values())
+
+
+def clear_memo():
+    _MEMO.clear()
+
+
+def layout_tables(interference, site_pos, ue_pos, radius_m=None, lut_resolution_m=None,
+                  index_backend="auto", persist=GAIN_CACHE_ENABLED, cache=None):
+    """
+    Yerleşim için kazanç tablolarını önce süreç içi memodan, sonra diskten
+    getirir; yoksa hesaplayıp ikisine de yazar. Dönen diziler salt okunurdur.
+    radius_m None: {"gain": (N x U)}
+    radius_m verilirse: {"neighbors", "neighbor_distance", "neighbor_gain"}: (U x K)
+    persist=False ise yalnızca süreç içi memo kullanılır (küçük tablolar için).
+    """
+    site_pos = np.asarray(site_pos, dtype=float)
+    ue_pos = np.asarray(ue_pos, dtype=float)
+    key = gain_key(interference, site_pos, ue_pos, radius_m, lut_resolution_m)
+
+    tables = _MEMO.get(key)
+    if tables is not None:
+        _MEMO.move_to_end(key)
+        return tables
+
+    if persist:
+        cache = cache or GainCache()
+        tables = cache.get(key)
+    if tables is None:
+        tables = _compute_tables(interference, site_pos, ue_pos, radius_m, lut_resolution_m, index_backend)
+        if persist:
+            cache.put(key, tables)
+
+    for a in tables.values():
+        a.flags.writeable = False
+    _memo_put(key, tables)
+    return tables
@@ -0,0 +1,185 @@
+# instrumentation.py
+# Simülasyon döngüsü için isteğe bağlı (opt-in) ölçüm katmanı.
+#
+# - Aşama zamanlayıcıları: with INSTRUMENTATION.stage("interference"): ...
+# - PhysicsEngine metot çağrı sayaçları (instrument_physics)
+# - İsteğe bağlı cProfile ve tracemalloc
+# - Çıktı: aşama dökümü tablosu + JSON iz dosyası (Chrome/Perfetto "traceEvents")
+#
+# Kapalıyken stage() önceden oluşturulmuş boş bir bağlam yöneticisi döndürür
+# ve PhysicsEngine sarılmaz; ek maliyet bir öznitelik kontrolünden ibarettir.
+import contextlib
+import cProfile
+import functools
+import io
+import json
+import os
+import pstats
+import time
+import tracemalloc
+
+import numpy as np
+
+_NULL_CONTEXT = contextlib.nullcontext()
+
+PHYSICS_METHODS = (
+    "calculate_path_loss", "calculate_received_power", "calculate_interference",
+    "calculate_sinr", "calculate_energy_consumption",
+    "path_loss_batch", "received_power_batch", "sinr_batch", "energy_batch",
+)
+
+
+class _StageTimer:
+    __slots__ = ("owner", "name", "start")
+
+    def __init__(self, owner, name):
+        self.owner = owner
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.owner._record(self.name, self.start, time.perf_counter())
+        return False
+
+
+class Instrumentation:
+    """
+    Aşama süreleri, çağrı sayaçları ve profil araçları.
+    Modül düzeyindeki INSTRUMENTATION örneği tüm simülasyon modüllerince
+    paylaşılır; enable() çağrılmadıkça hiçbir şey kaydedilmez.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.reset()
+        self._profiler = None
+        self._tracemalloc = False
+
+    def reset(self):
+        self.stages = {}      # ad -> [çağrı sayısı, toplam süre]
+        self.calls = {}       # ad -> [çağrı sayısı, işlenen eleman sayısı]
+        self.events = []      # JSON izi için (ad, başlangıç, bitiş)
+        self.memory = None
+        self.profile_text = None
+        self._t0 = time.perf_counter()
+
+    # --- Açma / kapama ---
+    def enable(self, cprofile=False, trace_memory=False):
+        self.reset()
+        self.enabled = True
+        if trace_memory:
+            tracemalloc.start()
+            self._tracemalloc = True
+        if cprofile:
+            self._profiler = cProfile.Profile()
+            self._profiler.enable()
+
+    def disable(self, top=25):
+        """Ölçümü durdurur; profil/bellek özetlerini toplar."""
+        if self._profiler is not None:
+            self._profiler.disable()
+            buf = io.StringIO()
+            pstats.Stats(self._profiler, stream=buf).sort_stats("cumulative").print_stats(top)
+            self.profile_text = buf.getvalue()
+            self._profiler = None
+        if self._tracemalloc:
+            current, peak = tracemalloc.get_traced_memory()
+            snapshot = tracemalloc.take_snapshot()
+            top_stats = snapshot.statistics("lineno")[:10]
+            self.memory = {
+                "current_mb": current / 2**20,
+                "peak_mb": peak / 2**20,
+                "top": [{"where": str(s.traceback), "size_kb": s.size / 1024, "count": s.count}
+                        for s in top_stats],
+            }
+            tracemalloc.stop()
+            self._tracemalloc = False
+        self.enabled = False
+
+    # --- Kayıt ---
+    def stage(self, name):
+        """Bir aşamayı zamanlayan bağlam yöneticisi (kapalıyken maliyetsiz)."""
+        if not self.enabled:
+            return _NULL_CONTEXT
+        return _StageTimer(self, name)
+
+    def _record(self, name, start, end):
+        entry = self.stages.setdefault(name, [0, 0.0])
+        entry[0] += 1
+        entry[1] += end - start
+        self.events.append((name, start, end))
+
+    def count(self, name, elements=1):
+        entry = self.calls.setdefault(name, [0, 0])
+        entry[0] += 1
+        entry[1] += elements
+
+    def instrument_physics(self, engine):
+        """
+        PhysicsEngine örneğinin metotlarını çağrı sayaçlarıyla sarar.
+        Ölçüm kapalıysa motoru değiştirmeden döndürür.
+        """
+        if not self.enabled:
+            return engine
+        for name in PHYSICS_METHODS:
+            method = getattr(engine, name, None)
+            if method is None or hasattr(method, "__instrumented__"):
+                continue
+            setattr(engine, name, self._counted(f"PhysicsEngine.{name}", method))
+        return engine
+
+    def _counted(self, label, method):
+        @functools.wraps(method)
+        def wrapper(*args, **kwargs):
+            if self.enabled:
+                size = np.size(args[0]) if args else 1
+                self.count(label, int(size))
+            return method(*args, **kwargs)
+        wrapper.__instrumented__ = True
+        return wrapper
+
+    # --- Raporlama ---
+    def report(self):
+        """Aşama dökümü ve çağrı sayaçları tablosu (metin)."""
+        lines = []
+        total = sum(t for _, t in self.stages.values()) or 1.0
+        lines.append(f"{'Aşama':<24}{'Çağrı':>8}{'Toplam (ms)':>14}{'Ort. (ms)':>12}{'Pay':>8}")
+        lines.append("-" * 66)
+        for name, (count, elapsed) in sorted(self.stages.items(), key=lambda kv: -kv[1][1]):
+            lines.append(f"{name:<24}{count:>8}{elapsed * 1e3:>14.2f}{elapsed * 1e3 / count:>12.3f}"
+                         f"{100 * elapsed / total:>7.1f}%")
+        if self.calls:
+            lines.append("")
+            lines.append(f"{'Çağrı':<44}{'Adet':>10}{'Eleman':>12}")
+            lines.append("-" * 66)
+            for name, (count, elements) in sorted(self.calls.items()):
+                lines.append(f"{name:<44}{count:>10}{elements:>12}")
+        if self.memory:
+            lines.append("")
+            lines.append(f"tracemalloc: tepe {self.memory['peak_mb']:.1f} MB, "
+                         f"son {self.memory['current_mb']:.1f} MB")
+        return "\n".join(lines)
+
+    def write_trace(self, path="simulation_trace.json"):
+        """
+        JSON iz dosyası. "traceEvents" Chrome/Perfetto izleyicisinde açılabilir;
+        "stages", "calls" ve "memory" özet alanlarıdır.
+        """
+        pid = os.getpid()
+        trace = {
+            "traceEvents": [{"name": name, "ph": "X", "pid": pid, "tid": 0,
+                             "ts": (start - self._t0) * 1e6, "dur": (end - start) * 1e6}
+                            for name, start, end in self.events],
+            "stages": {name: {"count": c, "total_s": t} for name, (c, t) in self.stages.items()},
+            "calls": {name: {"count": c, "elements": e} for name, (c, e) in self.calls.items()},
+            "memory": self.memory,
+        }
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(trace, f, indent=1)
+        return path
+
+
+INSTRUMENTATION = Instrumentation()
@@ -0,0 +1,122 @@
+# interference_engine.py
+import numpy as np
+
+# Girişim = (Gelen Güç) * (Çakışma Oranı) * (Ağırlık Faktörü)
+# PhysicsEngine.calculate_interference ile aynı ağırlık
+INTERFERENCE_WEIGHT = 0.8
+
+
+class InterferenceEngine:
+    """
+    Overlap-Based Interference Model'in matris formu.
+
+    PhysicsEngine.calculate_interference her UE için diğer istasyonları tek tek
+    dolaşır (O(N^2) Python döngüsü). Bu sınıf aynı modeli iki matris ile ifade eder:
+
+    - R (N x N): Spektral çakışma oranı matrisi. R[s, j], s istasyonunun bandı ile
+      j istasyonunun bandının çakışma miktarının min(bw_s, bw_j)'ye oranıdır.
+      Köşegen sıfırdır (istasyon kendine girişim yapmaz).
+    - G (N x U): İstasyon -> UE doğrusal kazanç matrisi, 10^(-PL/10).
+
+    Her zaman adımı için tüm hizmet eden hücreler ve tüm UE'ler için girişim:
+        I = w * R @ (P[:, None] * G)          (N x U, Watt)
+    Zaman ekseni eklendiğinde (T x N x N) @ (T x N x U) ile toplu hesaplanır.
+    """
+
+    def __init__(self, physics, path_loss_exp=3.5, weight=INTERFERENCE_WEIGHT):
+        self.physics = physics
+        self.path_loss_exp = path_loss_exp
+        self.weight = weight
+
+    @staticmethod
+    def overlap_ratio(center_a, bw_a, center_b, bw_b):
+        """
+        İki bant arasındaki çakışma miktarının min(bw_a, bw_b)'ye oranı
+        (eleman bazında, yayınlanabilir girdiler).
+        Bant genişliği sıfır olan (kapalı) istasyonlar için oran 0 kabul edilir.
+        """
+        overlap_min = np.maximum(center_a - bw_a / 2, center_b - bw_b / 2)
+        overlap_max = np.minimum(center_a + bw_a / 2, center_b + bw_b / 2)
+        overlap_amount = np.maximum(0.0, overlap_max - overlap_min)
+
+        min_bw = np.minimum(bw_a, bw_b)
+        return np.divide(overlap_amount, min_bw, out=np.zeros_like(overlap_amount), where=min_bw > 0)
+
+    def overlap_matrix(self, center_freq_mhz, bandwidth_mhz):
+        """
+        Spektral çakışma oranı matrisi.
+        Girdiler (..., N) şeklindedir; çıktı (..., N, N).
+        """
+        center = np.asarray(center_freq_mhz, dtype=float)
+        bw = np.asarray(bandwidth_mhz, dtype=float)
+        ratio = self.overlap_ratio(center[..., :, None], bw[..., :, None],
+                                   center[..., None, :], bw[..., None, :])
+
+        # Köşegen: istasyonun kendisi
+        n = ratio.shape[-1]
+        ratio[..., np.arange(n), np.arange(n)] = 0.0
+        return ratio
+
+    def gain_matrix(self, distance_m):
+        """
+        İstasyon -> UE doğrusal kazanç matrisi (N x U).
+        rx_power_watt = tx_power_watt * G
+        """
+        path_loss_db = self.physics.path_loss_batch(distance_m, self.path_loss_exp)
+        return 10**(-path_loss_db / 10)
+
+    def received_power_matrix(self, tx_power_watt, gain):
+        """
+        Her istasyonun her UE'deki alınan gücü (Watt).
+        tx_power_watt: (..., N), gain: (N, U) -> (..., N, U)
+        """
+        return np.asarray(tx_power_watt, dtype=float)[..., :, None] * gain
+
+    def interference_matrix(self, tx_power_watt, center_freq_mhz, bandwidth_mhz, gain):
+        """
+        Tüm hizmet eden hücreler ve tüm UE'ler için girişim gücü (Watt).
+        Çıktı (..., N, U): [s, u] elemanı, UE u'ya s istasyonu hizmet verirken
+        diğer istasyonlardan gelen toplam girişimdir.
+        """
+        overlap = self.overlap_matrix(center_freq_mhz, bandwidth_mhz)
+        rx_watt = self.received_power_matrix(tx_power_watt, gain)
+        return self.weight * (overlap @ rx_watt)
+
+    def interference_for_serving(self, tx_power_watt, center_freq_mhz, bandwidth_mhz, gain, serving_idx):
+        """
+        Her UE'nin kendi hizmet eden istasyonu için girişim (Watt).
+        serving_idx: (U,) veya (..., U) istasyon indeksleri -> çıktı (..., U)
+        """
+        full = self.interference_matrix(tx_power_watt, center_freq_mhz, bandwidth_mhz, gain)
+        serving_idx = np.broadcast_to(serving_idx, full.shape[:-2] + full.shape[-1:])
+        return np.take_along_axis(full, serving_idx[..., None, :], axis=-2)[..., 0, :]
+
+    # --- Komşuluk sınırlı (seyrek) form ---
+    # Her UE için yalnızca K komşu istasyon (spatial_index.SpatialIndex.neighbor_table)
+    # tutulur: neighbors (U x K), -1 boş; neighbor_gain (U x K), boş hücrelerde 0.
+    # Maliyet (T x U x K) olup site sayısıyla değil UE başına komşu sayısıyla büyür.
+
+    def neighbor_received_power(self, tx_power_watt, neighbors, neighbor_gain):
+        """
+        Her UE'nin komşu istasyonlarından aldığı güç (Watt).
+        tx_power_watt: (..., N) -> (..., U, K)
+        """
+        tx = np.asarray(tx_power_watt, dtype=float)
+        return tx[..., np.maximum(neighbors, 0)] * neighbor_gain
+
+    def neighbor_interference(self, center_freq_mhz, bandwidth_mhz, neighbors, rx_watt, serving_k):
+        """
+        Her UE'nin kendi hizmet eden istasyonu için komşulardan gelen girişim (Watt).
+        rx_watt: neighbor_received_power çıktısı (..., U, K)
+        serving_k: (..., U) hizmet eden istasyonun komşu tablosundaki sütunu
+        Dönüş: (..., U)
+        """
+        nbr = np.maximum(neighbors, 0)
+        center = np.asarray(center_freq_mhz, dtype=float)[..., nbr]
+        bw = np.asarray(bandwidth_mhz, dtype=float)[..., nbr]
+        serving_k = serving_k[..., None]
+        ratio = self.overlap_ratio(np.take_along_axis(center, serving_k, axis=-1),
+                                   np.take_along_axis(bw, serving_k, axis=-1), center, bw)
+        # Hizmet eden istasyon kendine girişim yapmaz
+        np.put_along_axis(ratio, serving_k, 0.0, axis=-1)
+        return self.weight * (ratio * rx_watt).sum(axis=-1)
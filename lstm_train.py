@@ -1,86 +1,114 @@
+import argparse
+import pickle
+import sys
+
 import pandas as pd
 import numpy as np
-import matplotlib.pyplot as plt
-import pickle
+from config import TRAFFIC_DATA_FILE, PREDICTIONS_FILE, FORECAST_PARAMS
+from storage import read_table, write_table
+from forecaster import GlobalForecaster, to_site_matrix
+from forecast_cache import cached_predictions
+
+# Test (simülasyon) dönemi: son 7 gün
+TEST_HOURS = FORECAST_PARAMS["test_hours"]
+
+
+def build_predictions(df, test_hours=TEST_HOURS, window=168, horizon=24, alpha=1.0):
+    """
+    Tüm siteler için tek bir global model eğitir ve son test_hours saat için
+    gün öncesi (horizon adımlık) tahminler üretir.
+    Dönüş: (pred_df, results, model)
+        pred_df: datetime, site_id, pred_users, est_snr_db (simülasyon girdisi);
+            satırlar zaman sırasındadır (her saatte tüm siteler), böylece
+            stream_simulation.py --time-ordered ile sabit bellekte okunabilir
+        results: {site: (gerçek, tahmin)} grafik için
+    """
+    users, timestamps, sites = to_site_matrix(df, "users")
+    snrs, _, _ = to_site_matrix(df, "sinr_db")
+    T = users.shape[1]
+    split = T - test_hours
+
+    model = GlobalForecaster(window, horizon, alpha).fit(users[:, :split])
+    pred = model.rolling_forecast(users, split, test_hours)
+
+    results = {site: (users[i, split:], pred[i]) for i, site in enumerate(sites)}
+    pred_df = pd.DataFrame({
+        "datetime": np.repeat(timestamps[split:], len(sites)),
+        "site_id": np.tile(sites, test_hours),
+        "pred_users": pred.astype(int).T.ravel(),
+        "est_snr_db": snrs[:, split:].T.ravel()
+    })
+    return pred_df, results, model
+
+
+def plot_predictions(results, path="lstm_5site_sonuc.png"):
+    import matplotlib.pyplot as plt
+
+    plt.figure(figsize=(16, 10))
+    for i, site in enumerate(list(results.keys())[:6], 1):
+        real, pred = results[site]
+        plt.subplot(3, 2, i)
+        plt.plot(real, label="Gerçek", marker="o", markersize=2)
+        plt.plot(pred, label="Tahmin", marker="x", markersize=2)
+        plt.title(f"{site} - Son 7 Gün (Global Model)")
+        plt.ylabel("Kullanıcı")
+        plt.legend()
+        plt.grid(True)
+
+    plt.tight_layout()
+    plt.savefig(path, dpi=300)
+    print(f"GRAFİK HAZIR: {path}")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Global trafik tahmin modeli eğitimi ve tahmini")
+    parser.add_argument("--window", type=int, default=FORECAST_PARAMS["window"], help="Geçmiş pencere uzunluğu (saat)")
+    parser.add_argument("--horizon", type=int, default=FORECAST_PARAMS["horizon"], help="Tahmin ufku (saat)")
+    parser.add_argument("--alpha", type=float, default=FORECAST_PARAMS["alpha"], help="Ridge düzenlileştirme katsayısı")
+    parser.add_argument("--no-cache", action="store_true", help="Tahmin önbelleğini kullanma")
+    parser.add_argument("--no-plot", action="store_true")
+    args = parser.parse_args(argv)
+
+    print("VERİ OKUNUYOR...")
+    try:
+        df = read_table(TRAFFIC_DATA_FILE, columns=["datetime", "site_id", "users", "sinr_db"])
+    except FileNotFoundError:
+        print("HATA: Veri dosyası bulunamadı.")
+        return 1
+
+    print("VERİ OKUNDU:", len(df), "satır")
+    print("MODEL EĞİTİMİ VE TAHMİNİ YAPILIYOR...")
+
+    if args.no_cache:
+        pred_df, results, model = build_predictions(df, TEST_HOURS, args.window, args.horizon, args.alpha)
+        hit = False
+    else:
+        params = {"test_hours": TEST_HOURS, "window": args.window, "horizon": args.horizon, "alpha": args.alpha}
+        pred_df, results, model, hit = cached_predictions(df, params)
+
+    if hit:
+        print("Tahminler önbellekten okundu (veri ve parametreler değişmedi).")
+    else:
+        print(f"Eğitim: {model.train_stats['windows']} pencere, "
+              f"{model.train_stats['windows_per_sec']:.0f} pencere/sn")
+        print(f"Çıkarım: {model.infer_stats['windows']} pencere, "
+              f"{model.infer_stats['windows_per_sec']:.0f} pencere/sn")
+
+    mae = np.mean([np.abs(real - pred).mean() for real, pred in results.values()])
+    print(f"Test MAE (kullanıcı): {mae:.2f}")
+
+    if not args.no_plot:
+        plot_predictions(results)
+
+    with open("results.pkl", "wb") as f:
+        pickle.dump(results, f)
+    print("Tahmin sonuçları kaydedildi: results.pkl")
+
+    path = write_table(pred_df, PREDICTIONS_FILE)
+    print(f"SİMÜLASYON GİRDİSİ OLUŞTURULDU: {path}")
+    print(pred_df.head())
+    return 0
+
 
-print("VERİ OKUNUYOR (Mock Mode)...")
-try:
-    df = pd.read_csv("5G_90gun_5site_veri.csv", parse_dates=["datetime"])
-except FileNotFoundError:
-    print("HATA: Veri dosyası bulunamadı.")
-    exit()
-
-print("VERİ OKUNDU:", len(df), "satır")
-
-# Helper to simulate prediction: Real value + some 'prediction error' noise
-# An LSTM typically smoothes the data and lags slightly.
-def simulate_lstm_prediction(series):
-    # Moving average to simulate "learned" pattern
-    smooth = series.rolling(window=3, min_periods=1).mean()
-    # Add some noise to simulate prediction uncertainty
-    noise = np.random.normal(0, 5, len(series))
-    pred = smooth + noise
-    return pred.values
-
-results = {}
-final_prediction_list = []
-
-print("MODEL EĞİTİMİ VE TAHMİNİ SİMÜLE EDİLİYOR...")
-
-for site in df["site_id"].unique():
-    site_df = df[df.site_id == site]
-    real_users = site_df["users"]
-    
-    # Simulate prediction
-    pred_users = simulate_lstm_prediction(real_users)
-    
-    # Mocking the last 168 hours (7 days) as the "Test Result" for plotting
-    last_n = 168
-    real_segment = real_users.values[-last_n:]
-    pred_segment = pred_users[-last_n:]
-    timestamps = site_df["datetime"].values[-last_n:]
-    snrs = site_df["sinr_db"].values[-last_n:]
-    
-    results[site] = (real_segment, pred_segment)
-    
-    # Store "prediction" data for the simulation runner
-    # We'll use the LAST 1-2 days basically for our simulation runner loop
-    # The simulation runner loop iterates over ALL data in the CSV it receives?
-    # Actually, the user's simulation runner loop iterates over `timestamps`.
-    # We should export predictions for the RELEVANT period.
-    # To be safe, let's export predictions for the last 7 days (168 hours).
-    
-    for t, p, s in zip(timestamps, pred_segment, snrs):
-        final_prediction_list.append({
-            "datetime": t,
-            "site_id": site,
-            "pred_users": int(p),
-            "est_snr_db": s
-        })
-
-# Save Results for Plotting (User's Plot Code Standard)
-import matplotlib.pyplot as plt
-plt.figure(figsize=(16, 10))
-for i, site in enumerate(results.keys(), 1):
-    real, pred = results[site]
-    plt.subplot(3, 2, i)
-    plt.plot(real, label="Gerçek", marker="o", markersize=2)
-    plt.plot(pred, label="Tahmin (Simüle)", marker="x", markersize=2)
-    plt.title(f"{site} - Son 7 Gün (Mock LSTM)")
-    plt.ylabel("Kullanıcı")
-    plt.legend()
-    plt.grid(True)
-
-plt.tight_layout()
-plt.savefig("lstm_5site_sonuc.png", dpi=300)
-print("GRAFİK HAZIR: lstm_5site_sonuc.png")
-
-with open("results.pkl", "wb") as f:
-    pickle.dump(results, f)
-print("LSTM sonuçları kaydedildi: results.pkl")
-
-# Generate CSV
-pred_df = pd.DataFrame(final_prediction_list)
-pred_df.to_csv("lstm_predictions.csv", index=False)
-print("SİMÜLASYON GİRDİSİ OLUŞTURULDU: lstm_predictions.csv")
-print(pred_df.head())
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,75 @@
+# network_kpis.py
+# Tüm ağ için performans göstergeleri (KPI).
+#
+# Site bazında (T x N): SINR, Shannon kapasitesi, talep, karşılanan trafik,
+# enerji. Ağ düzeyinde: toplam enerji (kWh), bit başına enerji, hücre kenarı
+# SINR'ı (site-saat SINR dağılımının alt yüzdeliği) ve talep karşılama oranı.
+import numpy as np
+
+
+def shannon_capacity_mbps(bandwidth_mhz, sinr_db):
+    """Shannon-Hartley kapasitesi: C = B * log2(1 + SINR) (MHz * bit/sn/Hz = Mb/sn)."""
+    sinr_linear = 10**(np.asarray(sinr_db, dtype=float) / 10)
+    return np.asarray(bandwidth_mhz, dtype=float) * np.log2(1 + sinr_linear)
+
+
+def site_kpis(sinr_db, bandwidth_mhz, energy_kwh, users, present, demand_per_user_mbps=2.5):
+    """
+    Site bazında KPI'lar; kaydı olmayan (site, saat) hücreleri 0'dır.
+    Girdiler (T x N). Dönüş: sözlük, her biri (T x N)
+        capacity_mbps: Shannon kapasitesi
+        demand_mbps: kullanıcı sayısı * kullanıcı başı talep
+        served_mbps: min(kapasite, talep)
+        energy_kwh
+    """
+    capacity = np.where(present, shannon_capacity_mbps(bandwidth_mhz, sinr_db), 0.0)
+    demand = np.where(present, np.nan_to_num(users) * demand_per_user_mbps, 0.0)
+    return {
+        'capacity_mbps': capacity,
+        'demand_mbps': demand,
+        'served_mbps': np.minimum(capacity, demand),
+        'energy_kwh': np.where(present, energy_kwh, 0.0),
+    }
+
+
+def _energy_per_bit_nj(energy_kwh, served_mbps, step_hours):
+    bits = served_mbps * 1e6 * step_hours * 3600
+    joules = energy_kwh * 3.6e6
+    return np.divide(joules * 1e9, bits, out=np.full(np.shape(bits), np.nan), where=bits > 0)
+
+
+def network_timeline(kpis, sinr_db, present, step_hours=1.0, cell_edge_percentile=5):
+    """
+    Her zaman adımı için ağ düzeyi göstergeler. Dönüş: sözlük, her biri (T,)
+    """
+    energy = kpis['energy_kwh'].sum(axis=1)
+    served = kpis['served_mbps'].sum(axis=1)
+    demand = kpis['demand_mbps'].sum(axis=1)
+    masked = np.where(present, sinr_db, np.nan)
+    rows = present.any(axis=1)
+    cell_edge = np.full(len(energy), np.nan)
+    if rows.any():
+        cell_edge[rows] = np.nanpercentile(masked[rows], cell_edge_percentile, axis=1)
+    return {
+        'energy_kwh': energy,
+        'served_mbps': served,
+        'demand_mbps': demand,
+        'energy_per_bit_nj': _energy_per_bit_nj(energy, served, step_hours),
+        'cell_edge_sinr_db': cell_edge,
+    }
+
+
+def network_summary(kpis, sinr_db, present, step_hours=1.0, cell_edge_percentile=5):
+    """Tüm dönem için ağ düzeyi toplamlar (sözlük)."""
+    energy = float(kpis['energy_kwh'].sum())
+    served = float(kpis['served_mbps'].sum())
+    demand = float(kpis['demand_mbps'].sum())
+    sinr = np.asarray(sinr_db)[present]
+    return {
+        'total_energy_kwh': energy,
+        'delivered_tbit': served * step_hours * 3600 / 1e6,
+        'energy_per_bit_nj': float(_energy_per_bit_nj(energy, served, step_hours)),
+        'cell_edge_sinr_db': float(np.percentile(sinr, cell_edge_percentile)) if sinr.size else float('nan'),
+        'mean_sinr_db': float(sinr.mean()) if sinr.size else float('nan'),
+        'demand_satisfaction_pct': 100 * served / demand if demand > 0 else float('nan'),
+    }
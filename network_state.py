@@ -0,0 +1,123 @@
+# network_state.py
+# Baz istasyonu durumu için sütunsal (structure-of-arrays) yapı.
+#
+# Her istasyon için ayrı bir sözlük ({'id', 'site_name', 'tx_power',
+# 'bandwidth', 'center_freq', 'users', 'x', 'y'}) yerine tüm istasyonların
+# alanları tek tip NumPy sütunlarında tutulur: id int32, diğerleri float32.
+# İstasyon başına nesne oluşturulmaz; StationView (__slots__) tek bir
+# istasyona eski sözlük anahtarlarıyla erişmek gerektiğinde kullanılan hafif
+# bir görünümdür. PhysicsEngine.calculate_interference NetworkState'i
+# doğrudan kabul eder.
+import numpy as np
+
+# Eski sözlük anahtarı -> sütun adı
+RECORD_FIELDS = {
+    "id": "ids",
+    "tx_power": "tx_power",
+    "bandwidth": "bandwidth",
+    "center_freq": "center_freq",
+    "users": "users",
+    "x": "x",
+    "y": "y",
+}
+FLOAT_COLUMNS = ("x", "y", "tx_power", "bandwidth", "center_freq", "users")
+
+
+class StationView:
+    """NetworkState içindeki tek bir istasyonun görünümü (kopya yapmaz)."""
+    __slots__ = ("state", "index")
+
+    def __init__(self, state, index):
+        self.state = state
+        self.index = index
+
+    def __getitem__(self, key):
+        if key == "site_name":
+            return self.state.site_names[self.index] if self.state.site_names is not None else None
+        if key not in RECORD_FIELDS:
+            raise KeyError(key)
+        return getattr(self.state, RECORD_FIELDS[key])[self.index].item()
+
+    def get(self, key, default=None):
+        try:
+            return self[key]
+        except KeyError:
+            return default
+
+    def __repr__(self):
+        fields = ", ".join(f"{key}={self[key]!r}" for key in ("site_name", *RECORD_FIELDS))
+        return f"StationView({fields})"
+
+
+class NetworkState:
+    """
+    Bir zaman adımında tüm istasyonların durumu.
+    Sütunlar (N,): ids (int32), x, y, tx_power (W), bandwidth (MHz),
+    center_freq (MHz), users (float32). site_names isteğe bağlı ad listesidir.
+    """
+    __slots__ = ("ids", "x", "y", "tx_power", "bandwidth", "center_freq", "users", "site_names")
+
+    def __init__(self, ids, x, y, tx_power, bandwidth, center_freq, users=None, site_names=None):
+        self.ids = np.ascontiguousarray(ids, dtype=np.int32)
+        n = len(self.ids)
+        values = {"x": x, "y": y, "tx_power": tx_power, "bandwidth": bandwidth,
+                  "center_freq": center_freq, "users": np.zeros(n) if users is None else users}
+        for name in FLOAT_COLUMNS:
+            column = np.ascontiguousarray(np.broadcast_to(values[name], (n,)), dtype=np.float32)
+            setattr(self, name, column)
+        self.site_names = None if site_names is None else list(site_names)
+
+    @classmethod
+    def from_records(cls, records):
+        """Eski sözlük listesinden (bs_states) dönüştürür."""
+        columns = {name: [r.get(key, 0.0) for r in records] for key, name in RECORD_FIELDS.items()}
+        names = [r.get("site_name") for r in records]
+        return cls(site_names=names if any(n is not None for n in names) else None, **columns)
+
+    @classmethod
+    def from_arrays(cls, arrays, t, tx_power, bandwidth, center_freq):
+        """
+        simulation_runner.build_site_arrays dizilerinden t zaman adımının
+        durumu. tx_power, bandwidth, center_freq: (T x N) veya (N,)
+        Yalnızca o saatte kaydı olan istasyonlar alınır.
+        """
+        present = arrays['present'][t]
+
+        def row(values):
+            values = np.asarray(values)
+            return (values[t] if values.ndim == 2 else np.broadcast_to(values, present.shape))[present]
+
+        return cls(arrays['ids'][present], arrays['pos'][present, 0], arrays['pos'][present, 1],
+                   row(tx_power), row(bandwidth), row(center_freq),
+                   np.nan_to_num(arrays['users'][t][present]),
+                   [name for name, p in zip(arrays['site_names'], present) if p])
+
+    def __len__(self):
+        return len(self.ids)
+
+    def __getitem__(self, index):
+        return StationView(self, int(index))
+
+    def __iter__(self):
+        return (StationView(self, i) for i in range(len(self)))
+
+    @property
+    def pos(self):
+        """(N, 2) konumlar (metre)."""
+        return np.column_stack([self.x, self.y])
+
+    @property
+    def nbytes(self):
+        return sum(getattr(self, name).nbytes for name in ("ids",) + FLOAT_COLUMNS)
+
+    def index_of(self, station_id):
+        """Verilen id'li istasyonun satırı (yoksa ValueError)."""
+        idx = np.flatnonzero(self.ids == station_id)
+        if idx.size == 0:
+            raise ValueError(f"İstasyon bulunamadı: {station_id}")
+        return int(idx[0])
+
+    def distances_to(self, point):
+        """Her istasyonun verilen noktaya uzaklığı (N,), metre."""
+        px, py = point
+        return np.hypot(self.x.astype(float) - px, self.y.astype(float) - py)
@@ -0,0 +1,69 @@
+# npz_cache.py
+# Anahtar -> dizi sözlüğü eşlemesi için genel disk önbelleği. Her girdi tek
+# bir .npz dosyasıdır; yazma atomiktir ve toplam boyut LRU ile sınırlandırılır.
+# Tahmin (forecast_cache.py) ve kazanç (gain_cache.py) önbellekleri bu sınıfı
+# kendi anahtar üretimleriyle kullanır.
+import os
+import tempfile
+
+import numpy as np
+
+
+class NpzCache:
+    """
+    Her girdi tek bir .npz dosyasıdır (<anahtar>.npz). Okunan girdinin
+    değiştirilme zamanı güncellenir; toplam boyut max_bytes'ı aşarsa en eski
+    erişilen girdiler silinir.
+    """
+
+    def __init__(self, root, max_bytes):
+        self.root = root
+        self.max_bytes = max_bytes
+        os.makedirs(root, exist_ok=True)
+
+    def _path(self, key):
+        return os.path.join(self.root, key + ".npz")
+
+    def get(self, key):
+        """Girdi varsa dizi sözlüğünü döndürür (ve LRU zamanını günceller), yoksa None."""
+        path = self._path(key)
+        try:
+            with np.load(path, allow_pickle=False) as data:
+                entry = {name: data[name] for name in data.files}
+        except (FileNotFoundError, OSError, ValueError):
+            return None
+        os.utime(path)
+        return entry
+
+    def put(self, key, arrays):
+        """Diziyi atomik olarak yazar (geçici dosya + yeniden adlandırma) ve gerekirse budar."""
+        fd, tmp = tempfile.mkstemp(dir=self.root, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                np.savez(f, **arrays)
+            os.replace(tmp, self._path(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict()
+        return self._path(key)
+
+    def evict(self):
+        """Toplam boyut sınırın altına inene kadar en eski erişilen girdileri siler."""
+        entries = []
+        for name in os.listdir(self.root):
+            if name.endswith(".npz"):
+                stat = os.stat(os.path.join(self.root, name))
+                entries.append((stat.st_mtime, stat.st_size, name))
+        total = sum(size for _, size, _ in entries)
+        for _, size, name in sorted(entries):
+            if total <= self.max_bytes:
+                break
+            os.remove(os.path.join(self.root, name))
+            total -= size
+
+    def clear(self):
+        for name in os.listdir(self.root):
+            if name.endswith(".npz"):
+                os.remove(os.path.join(self.root, name))
@@ -3,6 +3,8 @@
 import numpy as np
 import math
 
+from network_state import NetworkState
+
 class PhysicsEngine:
     """
     Bu sınıf, 5G ağındaki sinyal yayılımını ve girişim (interference) 
@@ -18,6 +20,12 @@ class PhysicsEngine:
         self.freq_hz = carrier_freq_mhz * 1e6
         # Işık hızı
         self.c = 3e8
+        # Frekansa bağlı sabitler bir kez hesaplanır (her çağrıda tekrar edilmez)
+        self.lambda_wave = self.c / self.freq_hz
+        self.pl_ref = 20 * np.log10(4 * np.pi * 1.0 / self.lambda_wave) # d0 = 1m
+        # Termal gürültü yoğunluğu (W/Hz): k * T
+        self.k_boltzmann = 1.38e-23
+        self.temp_kelvin = 290
 
     def calculate_path_loss(self, distance_m, path_loss_exp=3.5):
         """
@@ -28,11 +36,8 @@ class PhysicsEngine:
         
         # Basitleştirilmiş Log-Normal Gölgeleme Modeli
         # PL(d) = PL(d0) + 10 * n * log10(d/d0)
-        # PL(d0): Serbest uzay kaybı (Friis denklemi)
-        lambda_wave = self.c / self.freq_hz
-        pl_ref = 20 * np.log10(4 * np.pi * 1.0 / lambda_wave) # d0 = 1m
-        
-        loss_db = pl_ref + 10 * path_loss_exp * np.log10(distance_m)
+        # PL(d0): Serbest uzay kaybı (Friis denklemi), __init__ içinde hesaplandı
+        loss_db = self.pl_ref + 10 * path_loss_exp * np.log10(distance_m)
         return loss_db
 
     def calculate_received_power(self, tx_power_watt, distance_m):
@@ -51,7 +56,14 @@ class PhysicsEngine:
         Overlap-Based Interference Model:
         Diğer baz istasyonlarının frekans bantlarının, mevcut baz istasyonuyla
         ne kadar çakıştığını ve bunun yarattığı gürültüyü hesaplar.
+
+        other_bs_list bir NetworkState ise döngü yerine sütunlar üzerinde
+        vektörel hesaplanır; bu durumda user_distance_map {id: mesafe}
+        sözlüğü veya istasyon sırasıyla (N,) mesafe dizisi olabilir.
         """
+        if isinstance(other_bs_list, NetworkState):
+            return self._interference_from_state(current_bs, other_bs_list, user_distance_map)
+
         total_interference_watt = 0.0
         
         current_bw_min = current_bs['center_freq'] - (current_bs['bandwidth'] / 2)
@@ -85,14 +97,33 @@ class PhysicsEngine:
                 
         return total_interference_watt
 
+    def _interference_from_state(self, current_bs, state, user_distance_map):
+        center = state.center_freq.astype(float)
+        bw = state.bandwidth.astype(float)
+        current_freq, current_bw = float(current_bs['center_freq']), float(current_bs['bandwidth'])
+
+        overlap_min = np.maximum(current_freq - current_bw / 2, center - bw / 2)
+        overlap_max = np.minimum(current_freq + current_bw / 2, center + bw / 2)
+        overlap_amount = np.maximum(0.0, overlap_max - overlap_min)
+        interfering = (overlap_amount > 0) & (state.ids != current_bs['id'])
+        if not interfering.any():
+            return 0.0
+
+        if isinstance(user_distance_map, dict):
+            dist_to_user = np.array([user_distance_map.get(i, 500.0) for i in state.ids[interfering].tolist()])
+        else:
+            dist_to_user = np.asarray(user_distance_map, dtype=float)[interfering]
+        overlap_ratio = overlap_amount[interfering] / np.minimum(current_bw, bw[interfering])
+        rx_power_other_dbm = self.received_power_batch(state.tx_power[interfering], dist_to_user)
+        rx_power_other_watt = (10**(rx_power_other_dbm / 10)) / 1000
+        return float(np.sum(rx_power_other_watt * overlap_ratio * 0.8))
+
     def calculate_sinr(self, rx_power_dbm, interference_watt, bandwidth_hz, noise_figure_db=9.0):
         """
         SINR (Signal-to-Interference-plus-Noise Ratio) Hesabı.
         """
         # Termal Gürültü (Thermal Noise)
-        k_boltzmann = 1.38e-23
-        temp_kelvin = 290
-        thermal_noise_watt = k_boltzmann * temp_kelvin * bandwidth_hz
+        thermal_noise_watt = self.k_boltzmann * self.temp_kelvin * bandwidth_hz
         
         # Gürültü Faktörü eklenmiş toplam gürültü
         noise_factor = 10**(noise_figure_db/10)
@@ -123,3 +154,48 @@ class PhysicsEngine:
         total_power_draw = base_load + (tx_power_watt * efficiency_factor)
         energy_kwh = (total_power_draw * active_time_hours) / 1000.0
         return energy_kwh
+
+    # --- VEKTÖREL (BATCH) API ---
+    # Aşağıdaki metotlar skaler metotlarla aynı formülleri NumPy dizileri
+    # üzerinde uygular. Girdiler yayınlanabilir (broadcast) herhangi bir
+    # şekilde olabilir, örn. (zaman adımı x site x UE).
+
+    def path_loss_batch(self, distance_m, path_loss_exp=3.5):
+        """
+        calculate_path_loss'un dizi versiyonu.
+        Sıfır veya negatif mesafeler 1 metreye çekilir.
+        """
+        distance_m = np.asarray(distance_m, dtype=float)
+        distance_m = np.where(distance_m <= 0, 1.0, distance_m)
+        return self.pl_ref + 10 * path_loss_exp * np.log10(distance_m)
+
+    def received_power_batch(self, tx_power_watt, distance_m, path_loss_exp=3.5):
+        """
+        calculate_received_power'ın dizi versiyonu (dBm).
+        tx_power_watt ve distance_m birbirine yayınlanabilir olmalıdır.
+        """
+        tx_power_dbm = 10 * np.log10(np.asarray(tx_power_watt, dtype=float) * 1000)
+        return tx_power_dbm - self.path_loss_batch(distance_m, path_loss_exp)
+
+    def sinr_batch(self, rx_power_dbm, interference_watt, bandwidth_hz, noise_figure_db=9.0):
+        """
+        calculate_sinr'ın dizi versiyonu (dB).
+        Geçersiz (<= 0) SINR değerleri skaler versiyondaki gibi -20 dB olur.
+        """
+        thermal_noise_watt = self.k_boltzmann * self.temp_kelvin * np.asarray(bandwidth_hz, dtype=float)
+        total_noise_watt = thermal_noise_watt * 10**(noise_figure_db/10)
+        rx_power_watt = (10**(np.asarray(rx_power_dbm, dtype=float)/10)) / 1000
+
+        sinr_linear = rx_power_watt / (np.asarray(interference_watt, dtype=float) + total_noise_watt)
+        valid = sinr_linear > 0
+        sinr_db = 10 * np.log10(np.where(valid, sinr_linear, 1.0))
+        return np.where(valid, sinr_db, -20.0)
+
+    def energy_batch(self, tx_power_watt, active_time_hours):
+        """
+        calculate_energy_consumption'ın dizi versiyonu (kWh).
+        """
+        base_load = 150.0
+        efficiency_factor = 2.5
+        total_power_draw = base_load + np.asarray(tx_power_watt, dtype=float) * efficiency_factor
+        return (total_power_draw * np.asarray(active_time_hours, dtype=float)) / 1000.0
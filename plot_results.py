@@ -1,44 +1,373 @@
-import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 
-def plot_comparison():
+import numpy as np
+
+from config import NETWORK_RESULTS_FILE, PLOT_CONFIG, RESULTS_FILE
+from storage import read_table
+
+SCENARIO_COLORS = {'Baseline': 'red', 'Optimized': 'green'}
+
+
+def lttb_indices(x, y, n_out):
+    """
+    Largest-Triangle-Three-Buckets: görsel şekli koruyarak n_out nokta seçer.
+    İlk ve son nokta her zaman korunur. Dönüş: seçilen indeksler (artan sırada)
+    """
+    n = len(y)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    # İlk ve son nokta arasındaki n_out - 2 kova
+    edges = np.linspace(1, n - 1, n_out - 1).astype(np.int64)
+    out = np.empty(n_out, dtype=np.int64)
+    out[0], out[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        lo, hi = edges[i], edges[i + 1]
+        nlo, nhi = (edges[i + 1], edges[i + 2]) if i + 2 < len(edges) else (n - 1, n)
+        avg_x, avg_y = x[nlo:nhi].mean(), y[nlo:nhi].mean()
+        # Önceki seçilen nokta, kova adayı ve sonraki kovanın ortalamasıyla oluşan üçgenin alanı
+        area = np.abs((x[a] - avg_x) * (y[lo:hi] - y[a]) - (x[a] - x[lo:hi]) * (avg_y - y[a]))
+        a = lo + int(np.argmax(area))
+        out[i + 1] = a
+    return out
+
+
+def minmax_indices(y, n_bins):
+    """
+    Seriyi en fazla n_bins eşit kovaya böler ve her kovanın en küçük ve en
+    büyük noktasını seçer (uç değerler kaybolmaz). İlk ve son nokta da
+    korunur. Dönüş: en fazla 2 * n_bins + 2 artan sıralı indeks
+    """
+    n = len(y)
+    if 2 * n_bins >= n:
+        return np.arange(n)
+    y = np.asarray(y)
+    size = -(-n // n_bins)
+    full = n // size * size
+    blocks = y[:full].reshape(-1, size)
+    offsets = np.arange(0, full, size)
+    idx = [offsets + blocks.argmin(axis=1), offsets + blocks.argmax(axis=1), [0, n - 1]]
+    if full < n:
+        tail = y[full:]
+        idx.append([full + tail.argmin(), full + tail.argmax()])
+    return np.unique(np.concatenate(idx))
+
+
+def downsample(x, y, max_points=PLOT_CONFIG['max_points'], method=PLOT_CONFIG['downsample']):
+    """
+    Zaman serisini en fazla max_points noktaya seyreltir.
+    x: datetime64 veya sayısal dizi. NaN değerler atlanır.
+    method: "minmaxlttb" (önce min/max ön seçimi, sonra LTTB), "lttb", "minmax" veya None
+    Dönüş: (x, y) seyreltilmiş diziler
+    """
+    x = np.asarray(x)
+    y = np.asarray(y, dtype=float)
+    finite = np.isfinite(y)
+    if not finite.all():
+        x, y = x[finite], y[finite]
+    if method is None or len(y) <= max_points:
+        return x, y
+    # Alan hesabı için zaman ekseni sayıya çevrilir
+    xs = x.astype('datetime64[ns]').astype(np.int64).astype(float) if np.issubdtype(x.dtype, np.datetime64) else x
+    if method == "lttb" or (method == "minmax" and max_points < 4):
+        idx = lttb_indices(xs, y, max_points)
+    elif method == "minmax":
+        # Kova başına 2 nokta + ilk/son nokta
+        idx = minmax_indices(y, (max_points - 2) // 2)
+    elif method == "minmaxlttb":
+        # Min/max ön seçimi LTTB'nin Python döngüsünü max_points ile sınırlar
+        pre = minmax_indices(y, 2 * max_points)
+        idx = pre[lttb_indices(xs[pre], y[pre], max_points)]
+    else:
+        raise ValueError(f"Bilinmeyen seyreltme yöntemi: {method}")
+    return x[idx], y[idx]
+
+
+def _date_axis(ax):
+    import matplotlib.dates as mdates
+
+    locator = mdates.AutoDateLocator()
+    ax.xaxis.set_major_locator(locator)
+    ax.xaxis.set_major_formatter(mdates.ConciseDateFormatter(locator))
+
+
+def _plot_series(ax, t, y, max_points, method, **kwargs):
+    """Seriyi seyrelterek çizer; kısa serilerde nokta işaretleri korunur."""
+    marker = kwargs.pop('marker', None)
+    if len(y) > PLOT_CONFIG['marker_max_points']:
+        marker = None
+    xs, ys = downsample(t, y, max_points, method)
+    ax.plot(xs, ys, marker=marker, **kwargs)
+
+
+def plot_comparison(output="comparison_graphs.png", max_points=PLOT_CONFIG['max_points'],
+                    method=PLOT_CONFIG['downsample']):
     # Load data
-    try:
-        df = pd.read_csv("simulation_results_comparison.csv")
-    except FileNotFoundError:
-        print("CSV dosyası bulunamadı!")
-        return
+    df = read_table(RESULTS_FILE, columns=['Time', 'SINR_Baseline_dB', 'SINR_Optimized_dB',
+                                           'Energy_Baseline_kWh', 'Energy_Optimized_kWh'])
+    t = df['Time'].to_numpy('datetime64[ns]')
+
+    # Grafik kütüphaneleri yalnızca çizim yapılırken yüklenir
+    import matplotlib.pyplot as plt
+    import seaborn as sns
 
     # Set style
     sns.set(style="whitegrid")
-    
+
     # Create Figure with 2 subplots
     fig, axes = plt.subplots(2, 1, figsize=(10, 10))
-    
+
     # Plot 1: SINR Comparison
-    axes[0].plot(df['Time'], df['SINR_Baseline_dB'], label='Baseline (Sabit 40W)', color='red', linestyle='--', marker='o')
-    axes[0].plot(df['Time'], df['SINR_Optimized_dB'], label='Optimized (LSTM + Algoritma)', color='green', linewidth=2, marker='s')
+    _plot_series(axes[0], t, df['SINR_Baseline_dB'], max_points, method,
+                 label='Baseline (Sabit 40W)', color='red', linestyle='--', marker='o')
+    _plot_series(axes[0], t, df['SINR_Optimized_dB'], max_points, method,
+                 label='Optimized (LSTM + Algoritma)', color='green', linewidth=2, marker='s')
     axes[0].set_title('SINR Karşılaştırması (Sinyal Kalitesi)', fontsize=14)
     axes[0].set_ylabel('SINR (dB)')
     axes[0].legend()
-    # X-axis cleanup (show fewer labels if too many)
-    axes[0].set_xticks(range(0, len(df), 4)) # Show every 4th label
-    axes[0].tick_params(axis='x', rotation=45)
+    _date_axis(axes[0])
 
     # Plot 2: Energy Comparison
-    axes[1].plot(df['Time'], df['Energy_Baseline_kWh'], label='Baseline (Sabit)', color='red', linestyle='--')
-    axes[1].plot(df['Time'], df['Energy_Optimized_kWh'], label='Optimized (Dinamik)', color='blue', linewidth=2)
+    _plot_series(axes[1], t, df['Energy_Baseline_kWh'], max_points, method,
+                 label='Baseline (Sabit)', color='red', linestyle='--')
+    _plot_series(axes[1], t, df['Energy_Optimized_kWh'], max_points, method,
+                 label='Optimized (Dinamik)', color='blue', linewidth=2)
     axes[1].set_title('Enerji Tüketimi Karşılaştırması', fontsize=14)
     axes[1].set_ylabel('Enerji Tüketimi (kWh)')
-    axes[1].set_xlabel('Zaman (Saat)')
+    axes[1].set_xlabel('Zaman')
     axes[1].legend()
-    axes[1].set_xticks(range(0, len(df), 4))
-    axes[1].tick_params(axis='x', rotation=45)
+    _date_axis(axes[1])
 
     plt.tight_layout()
-    plt.savefig("comparison_graphs.png")
-    print("Grafik kaydedildi: comparison_graphs.png")
+    plt.savefig(output)
+    plt.close(fig)
+    print(f"Grafik kaydedildi: {output}")
+
+
+def group_percentiles(codes, values, n_groups, percentiles):
+    """
+    Grup kodlarına (0..n_groups-1, eksik: -1) göre yüzdelikler. Değerler
+    koda göre bir kez dizilir ve her grubun dilimine np.percentile (kısmi
+    sıralama) uygulanır. Dönüş: (n_groups, len(percentiles)), boş gruplar NaN
+    """
+    values = np.asarray(values, dtype=float)
+    mask = (codes >= 0) & np.isfinite(values)
+    if not mask.all():
+        codes, values = codes[mask], values[mask]
+    values = values[np.argsort(codes, kind='stable')]
+    bounds = np.r_[0, np.cumsum(np.bincount(codes, minlength=n_groups))]
+    out = np.full((n_groups, len(percentiles)), np.nan)
+    for g in np.flatnonzero(np.diff(bounds)):
+        out[g] = np.percentile(values[bounds[g]:bounds[g + 1]], percentiles)
+    return out
+
+
+def _group_sum_mean(codes, values, n_groups):
+    values = np.asarray(values, dtype=float)
+    mask = (codes >= 0) & np.isfinite(values)
+    if not mask.all():
+        codes, values = codes[mask], values[mask]
+    total = np.bincount(codes, weights=values, minlength=n_groups)
+    count = np.bincount(codes, minlength=n_groups)
+    return total, np.divide(total, count, out=np.full(n_groups, np.nan), where=count > 0)
+
+
+def network_aggregates(df, freq=PLOT_CONFIG['aggregate_freq'], percentiles=PLOT_CONFIG['percentiles']):
+    """
+    Site bazında ağ sonuçlarından pano görünümleri.
+    df: Time, Site, Scenario, SINR_dB, Energy_kWh sütunları
+    Satırlar tamsayı grup kodlarına çevrilir (dönem, yalnızca tekil zaman
+    damgaları üzerinden hesaplanır); toplamlar bincount ile bulunur, tablo
+    yeniden sıralanmaz. Dönemler başlangıç zamanıyla etiketlenir.
+    Dönüş: sözlük
+        sinr: (dönem, senaryo) indeksli, her yüzdelik için bir sütun
+        energy: dönem indeksli, senaryo başına toplam enerji (kWh)
+        sites: site indeksli, senaryo başına toplam enerji ve ortalama SINR
+    """
+    import pandas as pd
+
+    time_codes, times = pd.factorize(df['Time'], sort=True)
+    period_of_time, periods = pd.factorize(pd.DatetimeIndex(times).to_period(freq).start_time, sort=True)
+    scenario_codes, scenarios = pd.factorize(df['Scenario'], sort=True)
+    site_codes, site_names = pd.factorize(df['Site'], sort=True)
+    scenarios = list(scenarios)
+    n_scenarios = len(scenarios)
+
+    period_codes = np.where(time_codes >= 0, period_of_time[time_codes] * n_scenarios + scenario_codes, -1)
+    n_periods = len(periods) * n_scenarios
+    period_index = pd.MultiIndex.from_product([periods, scenarios], names=['Time', 'Scenario'])
+    sinr = pd.DataFrame(group_percentiles(period_codes, df['SINR_dB'], n_periods, percentiles),
+                        index=period_index, columns=list(percentiles)).dropna(how='all')
+    energy, _ = _group_sum_mean(period_codes, df['Energy_kWh'], n_periods)
+    energy = pd.DataFrame(energy.reshape(-1, n_scenarios), index=pd.Index(periods, name='Time'),
+                          columns=scenarios)
+
+    site_group = site_codes * n_scenarios + scenario_codes
+    n_sites = len(site_names) * n_scenarios
+    site_energy, _ = _group_sum_mean(site_group, df['Energy_kWh'], n_sites)
+    _, site_sinr = _group_sum_mean(site_group, df['SINR_dB'], n_sites)
+    site_index = pd.Index(list(site_names), name='Site')
+    sites = pd.concat({
+        'Energy_kWh': pd.DataFrame(site_energy.reshape(-1, n_scenarios), index=site_index, columns=scenarios),
+        'SINR_dB': pd.DataFrame(site_sinr.reshape(-1, n_scenarios), index=site_index, columns=scenarios),
+    }, axis=1)
+    return {'sinr': sinr, 'energy': energy, 'sites': sites}
+
+
+def plot_network_dashboard(output="network_dashboard.png", freq=PLOT_CONFIG['aggregate_freq'],
+                           percentiles=PLOT_CONFIG['percentiles']):
+    """
+    Tüm ağ için özet pano: dönem bazında SINR yüzdelik bandı ve toplam enerji,
+    site bazında enerji tasarrufu ve SINR değişimi dağılımları. Çizilen
+    nokta sayısı dönem ve histogram kovası sayısıyla sınırlıdır.
+    """
+    df = read_table(NETWORK_RESULTS_FILE, columns=['Time', 'Site', 'Scenario', 'SINR_dB', 'Energy_kWh'])
+    agg = network_aggregates(df, freq, percentiles)
+
+    import matplotlib.pyplot as plt
+    import seaborn as sns
+
+    sns.set(style="whitegrid")
+    fig, axes = plt.subplots(2, 2, figsize=(14, 9))
+    low, mid, high = percentiles
+
+    ax = axes[0, 0]
+    for scenario, band in agg['sinr'].groupby(level='Scenario', observed=True):
+        t = band.index.get_level_values('Time')
+        color = SCENARIO_COLORS.get(scenario)
+        ax.fill_between(t, band[low], band[high], color=color, alpha=0.2)
+        ax.plot(t, band[mid], color=color, label=f'{scenario} (%{low}-%{high} bandı, medyan)')
+    ax.set_title(f'Site SINR Dağılımı ({freq})', fontsize=13)
+    ax.set_ylabel('SINR (dB)')
+    ax.legend()
+    _date_axis(ax)
+
+    ax = axes[0, 1]
+    for scenario in agg['energy'].columns:
+        ax.plot(agg['energy'].index, agg['energy'][scenario], color=SCENARIO_COLORS.get(scenario),
+                label=scenario)
+    ax.set_title(f'Ağ Toplam Enerji Tüketimi ({freq})', fontsize=13)
+    ax.set_ylabel('Enerji (kWh)')
+    ax.legend()
+    _date_axis(ax)
+
+    sites = agg['sites']
+    ax = axes[1, 0]
+    saving = 100 * (1 - sites[('Energy_kWh', 'Optimized')] / sites[('Energy_kWh', 'Baseline')])
+    ax.hist(saving.dropna(), bins=30, color='blue', alpha=0.7)
+    ax.set_title(f'Site Bazında Enerji Tasarrufu ({len(sites)} site)', fontsize=13)
+    ax.set_xlabel('Tasarruf (%)')
+    ax.set_ylabel('Site sayısı')
+
+    ax = axes[1, 1]
+    delta = sites[('SINR_dB', 'Optimized')] - sites[('SINR_dB', 'Baseline')]
+    ax.hist(delta.dropna(), bins=30, color='green', alpha=0.7)
+    ax.set_title('Site Bazında Ortalama SINR Değişimi', fontsize=13)
+    ax.set_xlabel('ΔSINR (dB)')
+    ax.set_ylabel('Site sayısı')
+
+    plt.tight_layout()
+    plt.savefig(output)
+    plt.close(fig)
+    print(f"Grafik kaydedildi: {output}")
+
+
+def _init_plot_worker():
+    import seaborn as sns
+
+    sns.set(style="whitegrid")
+
+
+def _render_site(site, series, path, max_points, method):
+    """Tek site grafiği (işçi süreçte). series: {(senaryo, sütun): (t, y)}"""
+    # pyplot kullanılmaz: Figure nesnesi süreç genelinde durum tutmaz ve arayüz gerektirmez
+    from matplotlib.figure import Figure
+
+    fig = Figure(figsize=(10, 7))
+    axes = fig.subplots(2, 1, sharex=True)
+    for ax, column, ylabel in ((axes[0], 'SINR_dB', 'SINR (dB)'), (axes[1], 'Energy_kWh', 'Enerji (kWh)')):
+        for scenario, color in SCENARIO_COLORS.items():
+            if (scenario, column) in series:
+                ax.plot(*downsample(*series[(scenario, column)], max_points, method), color=color, label=scenario,
+                        linestyle='--' if scenario == 'Baseline' else '-')
+        ax.set_ylabel(ylabel)
+        ax.legend()
+        _date_axis(ax)
+    axes[0].set_title(f'{site}: Baseline / Optimized', fontsize=13)
+    fig.tight_layout()
+    fig.savefig(path)
+    return path
+
+
+def plot_site_figures(out_dir="site_figures", sites=None, workers=PLOT_CONFIG['workers'],
+                      max_points=PLOT_CONFIG['max_points'], method=PLOT_CONFIG['downsample']):
+    """
+    Her site için ayrı SINR/enerji grafiği (out_dir/<site>.png).
+    Tablo bir kez okunur ve site serilerine ayrılır; seyreltme ve çizim
+    işçi süreçlerde site başına paralel yapılır.
+    sites: çizilecek site adları (None: tümü)
+    Dönüş: yazılan dosya sayısı
+    """
+    df = read_table(NETWORK_RESULTS_FILE, columns=['Time', 'Site', 'Scenario', 'SINR_dB', 'Energy_kWh'])
+    if sites is not None:
+        df = df[df['Site'].isin(sites)]
+    os.makedirs(out_dir, exist_ok=True)
+
+    t = df['Time'].to_numpy('datetime64[ns]')
+    columns = {column: df[column].to_numpy() for column in ('SINR_dB', 'Energy_kWh')}
+    tasks = {}
+    for (site, scenario), idx in df.groupby(['Site', 'Scenario'], observed=True).indices.items():
+        series = tasks.setdefault(site, {})
+        for column, values in columns.items():
+            series[(scenario, column)] = (t[idx], values[idx])
+
+    start = time.perf_counter()
+    paths = [os.path.join(out_dir, f"{site}.png") for site in tasks]
+    workers = workers or os.cpu_count()
+    if workers <= 1 or len(tasks) <= 1:
+        _init_plot_worker()
+        for (site, series), path in zip(tasks.items(), paths):
+            _render_site(site, series, path, max_points, method)
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks)), initializer=_init_plot_worker) as pool:
+            list(pool.map(_render_site, tasks.keys(), tasks.values(), paths, repeat(max_points), repeat(method),
+                          chunksize=8))
+    print(f"{len(paths)} site grafiği '{out_dir}' klasörüne kaydedildi ({time.perf_counter() - start:.1f} sn).")
+    return len(paths)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Baseline / Optimized karşılaştırma grafikleri")
+    parser.add_argument("--view", choices=["comparison", "network", "sites"], default="comparison",
+                        help="comparison: Site_1 zaman serisi, network: ağ panosu, sites: site başına grafikler")
+    parser.add_argument("--output", help="Çıktı dosyası (sites için klasör)")
+    parser.add_argument("--max-points", type=int, default=PLOT_CONFIG['max_points'],
+                        help="Seri başına en fazla nokta")
+    parser.add_argument("--downsample", choices=["minmaxlttb", "lttb", "minmax", "none"],
+                        default=PLOT_CONFIG['downsample'] or "none")
+    parser.add_argument("--freq", default=PLOT_CONFIG['aggregate_freq'], help="Ağ panosu toplama dönemi (h, D, W, ...)")
+    parser.add_argument("--sites", nargs="+", help="Yalnızca bu siteler (sites görünümü)")
+    parser.add_argument("--workers", type=int, default=PLOT_CONFIG['workers'], help="İşçi süreç sayısı")
+    args = parser.parse_args(argv)
+    method = None if args.downsample == "none" else args.downsample
+    try:
+        if args.view == "network":
+            plot_network_dashboard(args.output or "network_dashboard.png", args.freq)
+        elif args.view == "sites":
+            plot_site_figures(args.output or "site_figures", args.sites, args.workers, args.max_points, method)
+        else:
+            plot_comparison(args.output or "comparison_graphs.png", args.max_points, method)
+    except FileNotFoundError as e:
+        print(f"HATA: {e}")
+        return 1
+    return 0
 
 if __name__ == "__main__":
-    plot_comparison()
+    sys.exit(main())
@@ -0,0 +1,301 @@
+# resource_allocator.py
+# Optimized senaryosu için yerleşik, dizi tabanlı kaynak atama ve parazit
+# önleme (frekans planlama).
+#
+# Adım 1 - Kaynak modeli: tüm (saat x site) hücreleri için bant genişliği ve
+#          güç tek geçişte hesaplanır.
+# Adım 2 - Kısıtlar: OPTIMIZED_CONFIG sınırları, uyku modu ve histerezis.
+# Adım 3 - Frekans planlayıcı: girişim grafiği üzerinde açgözlü (greedy)
+#          graf boyama ile her siteye bir kanal (merkez frekans) atanır.
+#
+# Kaynak modelleri ve frekans planlayıcıları ortak arayüzlü, değiştirilebilir
+# stratejilerdir (RESOURCE_MODELS, FREQUENCY_PLANNERS). user_algo.py mevcutsa
+# "user_algo" stratejileriyle eski davranış aynen kullanılabilir.
+import hashlib
+
+import numpy as np
+
+from instrumentation import INSTRUMENTATION
+from spatial_index import SpatialIndex
+
+
+def _import_user_algo():
+    try:
+        import user_algo
+    except ImportError:
+        raise ImportError("'user_algo' stratejisi için user_algo.py gereklidir. "
+                          "Alternatif olarak yerleşik stratejiler (\"shannon\", \"single\", \"greedy\") kullanılabilir.")
+    return user_algo
+
+
+# --- ADIM 1: KAYNAK MODELLERİ ---
+# Arayüz: bandwidth(users, snr_db) -> bw (MHz), power(users, bw, optimized_config) -> güç (W)
+# Girdiler aynı şekilli dizilerdir (yalnızca kaydı olan hücreler).
+
+class ShannonResourceModel:
+    """
+    Bant genişliği: kullanıcıların toplam hız ihtiyacını Shannon spektral
+    verimliliğiyle karşılayan bant
+        bw (MHz) = users * rate_per_user (Mb/sn) / log2(1 + SNR)
+    Güç: referans konfigürasyonun (Baseline) güç spektral yoğunluğunda,
+        power (W) = bw * reference_power_watt / reference_bandwidth_mhz
+    Aynı bant genişliğinde Optimized gücü Baseline'ı aşmaz; tavan
+    OPTIMIZED_CONFIG['max_power_watt'] (apply_optimized_constraints) olur.
+    cap_at_reference=True ise güç ayrıca reference_power_watt ile sınırlanır
+    (Optimized hiçbir saatte Baseline gücünü aşmaz; max_power_watt yalnızca
+    referanstan küçükse etkilidir). Referans verilmezse güç
+    [min_bandwidth, max_bandwidth] -> [min_power, max_power] doğrusal
+    eşlemesiyle bulunur.
+    """
+
+    def __init__(self, rate_per_user_mbps=2.5, reference_power_watt=None, reference_bandwidth_mhz=None,
+                 cap_at_reference=False):
+        self.rate_per_user_mbps = rate_per_user_mbps
+        self.reference_power_watt = reference_power_watt
+        self.reference_bandwidth_mhz = reference_bandwidth_mhz
+        self.cap_at_reference = cap_at_reference
+
+    def bandwidth(self, users, snr_db):
+        spectral_eff = np.log2(1 + 10**(np.asarray(snr_db, dtype=float) / 10))
+        return np.asarray(users, dtype=float) * self.rate_per_user_mbps / np.maximum(spectral_eff, 1e-3)
+
+    def power(self, users, bw, optimized_config):
+        cfg = optimized_config
+        if self.reference_power_watt is not None and self.reference_bandwidth_mhz:
+            psd = self.reference_power_watt / self.reference_bandwidth_mhz
+            cap = cfg['max_power_watt']
+            if self.cap_at_reference:
+                cap = min(cap, self.reference_power_watt)
+            return np.minimum(np.asarray(bw, dtype=float) * psd, cap)
+        span = cfg['max_bandwidth_mhz'] - cfg['min_bandwidth_mhz']
+        if span <= 0:
+            return np.full_like(bw, cfg['max_power_watt'], dtype=float)
+        frac = np.clip((bw - cfg['min_bandwidth_mhz']) / span, 0.0, 1.0)
+        return cfg['min_power_watt'] + frac * (cfg['max_power_watt'] - cfg['min_power_watt'])
+
+
+class UserAlgoResourceModel:
+    """user_algo.needed_bw_mhz / user_algo.power_w adaptörü (hücre başına çağrı)."""
+
+    def __init__(self):
+        self.user_algo = _import_user_algo()
+
+    def bandwidth(self, users, snr_db):
+        return np.vectorize(self.user_algo.needed_bw_mhz, otypes=[float])(users, snr_db)
+
+    def power(self, users, bw, optimized_config):
+        return np.vectorize(self.user_algo.power_w, otypes=[float])(users, bw)
+
+
+# --- ADIM 2: KISITLAR ---
+def apply_optimized_constraints(bw, power, users, present, optimized_config, prev_state=None):
+    """
+    OPTIMIZED_CONFIG sınırlarını (T x N) kaynak atamasına uygular:
+    - Bant genişliği ve güç [min, max] aralığına kırpılır.
+    - Kullanıcı sayısı sleep_mode_threshold_users altındaysa istasyon uyku
+      moduna alınır (minimum bant genişliği ve minimum güç).
+    - Histerezis: yeni bant genişliği, tutulan değerden hysteresis_margin_mhz
+      kadar farklı değilse önceki (bant, güç) konfigürasyonu korunur. Uyku
+      moduna giren ve uykudan çıkan hücreler histerezisten muaftır (uyanan
+      hücre uyku konfigürasyonunda kalmaz).
+
+    prev_state: önceki çalışmadan kalan (bw, power, sleeping) (N,) dizileri;
+    yoksa ilk kayıtlı saat doğrudan kabul edilir. Yalnızca (bw, power) içeren
+    eski durumlarda siteler uyanık kabul edilir.
+    Dönüş: (bw, power, state) - state, bir sonraki parçaya aktarılacak (bw, power, sleeping)
+    """
+    cfg = optimized_config
+    bw = np.clip(bw, cfg['min_bandwidth_mhz'], cfg['max_bandwidth_mhz'])
+    power = np.clip(power, cfg['min_power_watt'], cfg['max_power_watt'])
+
+    sleeping = users < cfg['sleep_mode_threshold_users']
+    bw = np.where(sleeping, cfg['min_bandwidth_mhz'], bw)
+    power = np.where(sleeping, cfg['min_power_watt'], power)
+
+    held_sleep = np.zeros(bw.shape[1], dtype=bool)
+    if prev_state is None:
+        held_bw = np.full(bw.shape[1], np.nan)
+        held_power = np.full(bw.shape[1], np.nan)
+    else:
+        held_bw, held_power = (np.array(x, dtype=float) for x in prev_state[:2])
+        if len(prev_state) > 2:
+            held_sleep = np.asarray(prev_state[2], dtype=float) > 0
+
+    # Histerezis zaman ekseninde ardışıktır; döngü yalnızca T üzerinde, siteler vektörel
+    margin = cfg['hysteresis_margin_mhz']
+    for t in range(bw.shape[0]):
+        waking = held_sleep & ~sleeping[t]
+        change = present[t] & (np.isnan(held_bw) | (np.abs(bw[t] - held_bw) >= margin) | sleeping[t] | waking)
+        held_bw = np.where(change, bw[t], held_bw)
+        held_power = np.where(change, power[t], held_power)
+        held_sleep = np.where(present[t], sleeping[t], held_sleep)
+        bw[t] = np.where(present[t], held_bw, bw[t])
+        power[t] = np.where(present[t], held_power, power[t])
+
+    return bw, power, (held_bw, held_power, held_sleep)
+
+
+# --- ADIM 3: FREKANS PLANLAYICILAR ---
+# Arayüz: plan(arrays, bw, power, carrier_freq_mhz, optimized_config) -> (bw, power, freq)
+# bw, power ve dönüş dizileri (T x N); arrays: simulation_runner.build_site_arrays çıktısı
+
+class SingleCarrierPlanner:
+    """Tüm siteler aynı merkez frekansta (frekans yeniden kullanımı 1)."""
+
+    def plan(self, arrays, bw, power, carrier_freq_mhz, optimized_config):
+        return bw, power, np.full(bw.shape, float(carrier_freq_mhz))
+
+
+class GreedyColoringPlanner:
+    """
+    Girişim grafiği üzerinde açgözlü graf boyama.
+
+    Düğümler siteler, kenarlar reuse_distance_m içindeki site çiftleridir
+    (SpatialIndex ile; kenar sayısı site sayısıyla doğrusal büyür). Kenar
+    ağırlığı iki site arasındaki yol kazancıdır (yakın komşular daha ağır).
+    Siteler ağırlıklı derece sırasıyla (girişim bağlantısı en güçlü site önce,
+    Welsh-Powell) dolaşılır; her site, komşularında aynı kanalı kullananların
+    toplam ağırlığı en düşük olan kanala atanır. Kanal sayısı yetmediğinde bile
+    çakışma en zayıf komşulara bırakılır.
+
+    Kanallar taşıyıcı etrafında channel_spacing_mhz aralıklı merkezlerdir;
+    varsayılan aralık max_bandwidth_mhz'dir (komşu kanallar hiç çakışmaz).
+    Yerleşim değişmediği sürece boyama bir kez hesaplanır ve tüm saatlerde
+    kullanılır. path_loss_exp simülasyonun PATH_LOSS_EXPONENT değeriyle
+    verilir (bkz. simulation_runner.assign_optimized_resources).
+    """
+
+    def __init__(self, num_channels=3, reuse_distance_m=600.0, channel_spacing_mhz=None,
+                 path_loss_exp=3.5):
+        self.num_channels = num_channels
+        self.reuse_distance_m = reuse_distance_m
+        self.channel_spacing_mhz = channel_spacing_mhz
+        self.path_loss_exp = path_loss_exp
+        self._colors = {}
+
+    def coloring(self, site_pos):
+        """Site başına kanal indeksi (N,)."""
+        site_pos = np.asarray(site_pos, dtype=float)
+        key = hashlib.sha256(np.ascontiguousarray(site_pos).tobytes()).hexdigest()
+        if key not in self._colors:
+            self._colors[key] = self._color(site_pos)
+        return self._colors[key]
+
+    def _color(self, site_pos):
+        n = len(site_pos)
+        indptr, indices, dist = SpatialIndex(site_pos).query_radius(site_pos, self.reuse_distance_m)
+        rows = np.repeat(np.arange(n), np.diff(indptr))
+        keep = indices != rows
+        # Kenar ağırlığı: göreli yol kazancı d^-n
+        weight = np.zeros(len(indices))
+        weight[keep] = np.maximum(dist[keep], 1.0) ** -self.path_loss_exp
+        degree = np.bincount(rows, weights=weight, minlength=n)
+
+        colors = np.full(n, -1)
+        for v in np.argsort(-degree, kind="stable"):
+            nbr = indices[indptr[v]:indptr[v + 1]]
+            w = weight[indptr[v]:indptr[v + 1]]
+            colored = colors[nbr] >= 0
+            cost = np.bincount(colors[nbr][colored], weights=w[colored], minlength=self.num_channels)
+            colors[v] = int(cost.argmin())
+        return colors
+
+    def channel_centers(self, carrier_freq_mhz, spacing_mhz):
+        k = np.arange(self.num_channels) - (self.num_channels - 1) / 2
+        return carrier_freq_mhz + k * spacing_mhz
+
+    def plan(self, arrays, bw, power, carrier_freq_mhz, optimized_config):
+        spacing = self.channel_spacing_mhz or optimized_config['max_bandwidth_mhz']
+        centers = self.channel_centers(carrier_freq_mhz, spacing)
+        freq = np.broadcast_to(centers[self.coloring(arrays['pos'])], bw.shape).copy()
+        return bw, power, freq
+
+
+class UserAlgoPlanner:
+    """
+    user_algo.parazit_onleyici adaptörü. Fonksiyon saatlik bir anlık görüntü
+    (DataFrame) beklediğinden her zaman adımı için küçük bir tablo oluşturulur.
+    """
+
+    def __init__(self):
+        self.user_algo = _import_user_algo()
+
+    def plan(self, arrays, bw, power, carrier_freq_mhz, optimized_config):
+        import pandas as pd
+
+        users, snr, present = arrays['users'], arrays['snr'], arrays['present']
+        freq = np.full(bw.shape, float(carrier_freq_mhz))
+        site_names = np.asarray(arrays['site_names'], dtype=object)
+        site_index = pd.Index(arrays['site_names'])
+        for t in range(bw.shape[0]):
+            cols = present[t]
+            opt_df = pd.DataFrame({
+                'site_id': site_names[cols],
+                'freq': freq[t, cols],
+                'bw': bw[t, cols],
+                'power': power[t, cols],
+                'users': users[t, cols],
+                'snr': snr[t, cols],
+                '_internal_id': arrays['ids'][cols],
+                '_pos_x': arrays['pos'][cols, 0],
+                '_pos_y': arrays['pos'][cols, 1]
+            })
+            with INSTRUMENTATION.stage("parazit_onleyici"):
+                opt_df_final = self.user_algo.parazit_onleyici(opt_df)
+
+            idx = site_index.get_indexer(opt_df_final['site_id'])
+            freq[t, idx] = opt_df_final['freq'].to_numpy(dtype=float)
+            bw[t, idx] = opt_df_final['bw'].to_numpy(dtype=float)
+            power[t, idx] = opt_df_final['power'].to_numpy(dtype=float)
+        return bw, power, freq
+
+
+# --- STRATEJİ KAYITLARI ---
+RESOURCE_MODELS = {
+    "shannon": ShannonResourceModel,
+    "user_algo": UserAlgoResourceModel,
+}
+
+FREQUENCY_PLANNERS = {
+    "single": SingleCarrierPlanner,
+    "greedy": GreedyColoringPlanner,
+    "user_algo": UserAlgoPlanner,
+}
+
+_INSTANCES = {}
+
+
+def get_strategy(registry, name, **params):
+    """
+    Kayıttan strateji örneği (aynı ad ve parametrelerle tekrar çağrıldığında
+    aynı örnek döner; ör. boyama bir kez hesaplanır).
+    """
+    if name not in registry:
+        raise ValueError(f"Bilinmeyen strateji: {name} (seçenekler: {', '.join(registry)})")
+    key = (id(registry), name, tuple(sorted(params.items())))
+    if key not in _INSTANCES:
+        _INSTANCES[key] = registry[name](**params)
+    return _INSTANCES[key]
+
+
+# --- TOPLU ATAMA ---
+def allocate_resources(arrays, optimized_config, carrier_freq_mhz, resource_model, planner, prev_state=None):
+    """
+    Tüm siteler ve zaman adımları için (T x N) bant genişliği, güç ve merkez
+    frekans. Kaydı olmayan hücreler 0 bant/güç ve taşıyıcı frekansta kalır.
+    prev_state: önceki parçadan kalan histerezis durumu (bkz. apply_optimized_constraints)
+    Dönüş: (bw, power, freq, state)
+    """
+    users, snr, present = arrays['users'], arrays['snr'], arrays['present']
+    T, N = users.shape
+
+    bw = np.zeros((T, N))
+    power = np.zeros((T, N))
+    with INSTRUMENTATION.stage("resource_assignment"):
+        bw[present] = resource_model.bandwidth(users[present], snr[present])
+        power[present] = resource_model.power(users[present], bw[present], optimized_config)
+        bw, power, state = apply_optimized_constraints(bw, power, users, present, optimized_config, prev_state)
+
+    with INSTRUMENTATION.stage("frequency_planning"):
+        bw, power, freq = planner.plan(arrays, bw, power, carrier_freq_mhz, optimized_config)
+    return bw, power, freq, state
@@ -0,0 +1,273 @@
+# sharded_runner.py
+# Uzun simülasyonlar için zaman parçalı (sharded) paralel çalıştırma ve
+# kaldığı yerden devam (checkpoint/resume).
+#
+# 1) Zaman ekseni shard_hours uzunluğunda parçalara bölünür.
+# 2) Optimized senaryosunun histerezis durumu zamanda ardışıktır. Parça
+#    başlangıç durumları önce sıralı bir taramayla (yalnızca kaynak ataması,
+#    girişim hesabı yok) bulunur ve manifest'e kaydedilir.
+# 3) Parçalar işçi süreçlerde kendi başlangıç durumlarıyla paralel simüle
+#    edilir; her parçanın çıktısı biter bitmez <ad>.part-NNNNN olarak diske
+#    yazılır ve manifest güncellenir.
+# 4) Kesilen bir çalışma aynı girdi ve konfigürasyonla yeniden başlatıldığında
+#    tamamlanmış parçalar atlanır.
+# Tüm parçalar bitince parçalar tek tabloda birleştirilir; sonuç tek süreçli
+# simulation_runner.py çıktısıyla aynıdır.
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from config import (ALLOCATOR_CONFIG, BASELINE_CONFIG, CARRIER_FREQ_MHZ, INTERFERENCE_CUTOFF_DBM,
+                    INTERFERENCE_RADIUS_M, KPI_CONFIG, NETWORK_RESULTS_FILE, NETWORK_TIMELINE_FILE,
+                    OPTIMIZED_CONFIG, PATH_LOSS_EXPONENT, RESULTS_FILE, SHARD_CONFIG)
+from storage import list_parts, read_table, remove_parts, remove_single, write_table
+import simulation_runner
+
+# Parça başına yazılan tablolar (simulation_runner.run_comparison_simulation ile aynı)
+OUTPUTS = (RESULTS_FILE, NETWORK_RESULTS_FILE, NETWORK_TIMELINE_FILE)
+# build_site_arrays çıktısında zaman eksenli diziler
+TIME_KEYS = ("timestamps", "users", "snr", "present")
+MANIFEST_FILE = RESULTS_FILE + ".manifest.json"
+
+
+def shard_bounds(timestamps, shard_hours):
+    """
+    Zaman damgalarını shard_hours uzunluğundaki pencerelere böler.
+    Dönüş: [[başlangıç, bitiş], ...] yarı açık indeks aralıkları
+    """
+    ts = pd.DatetimeIndex(timestamps)
+    window = np.asarray((ts - ts[0]) // pd.Timedelta(hours=shard_hours))
+    edges = np.flatnonzero(np.diff(window)) + 1
+    starts = np.concatenate([[0], edges])
+    ends = np.concatenate([edges, [len(ts)]])
+    return [[int(a), int(b)] for a, b in zip(starts, ends)]
+
+
+def slice_arrays(arrays, start, end):
+    """build_site_arrays çıktısının [start, end) zaman dilimi (kopyasız görünüm)."""
+    return {key: (value[start:end] if key in TIME_KEYS else value) for key, value in arrays.items()}
+
+
+def part_name(name, index):
+    return f"{name}.part-{index:05d}"
+
+
+def run_key(arrays, shard_hours, baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG,
+            path_loss_exp=PATH_LOSS_EXPONENT):
+    """Girdi dizileri ve sonucu etkileyen konfigürasyonun özeti; manifest'in geçerliliğini belirler."""
+    h = hashlib.sha256()
+    for key in TIME_KEYS:
+        h.update(np.ascontiguousarray(arrays[key]).tobytes())
+    h.update(np.ascontiguousarray(arrays['pos'], dtype=float).tobytes())
+    h.update(json.dumps({
+        "sites": list(arrays['site_names']),
+        "shard_hours": shard_hours,
+        "baseline": baseline_config,
+        "optimized": optimized_config,
+        "allocator": ALLOCATOR_CONFIG,
+        "kpi": KPI_CONFIG,
+        "path_loss_exp": path_loss_exp,
+        "carrier_freq_mhz": CARRIER_FREQ_MHZ,
+        "radius_m": INTERFERENCE_RADIUS_M,
+        "cutoff_dbm": INTERFERENCE_CUTOFF_DBM,
+    }, sort_keys=True, default=str).encode())
+    return h.hexdigest()
+
+
+class ShardManifest:
+    """
+    Parçalı çalışmanın ilerleme kaydı: çalışma anahtarı, parça aralıkları,
+    parça başlangıcındaki histerezis durumları ve tamamlanan parçalar.
+    Her kayıt geçici dosya + os.replace ile atomik yazılır.
+    """
+
+    def __init__(self, path, key, bounds):
+        self.path = path
+        self.data = {"run_key": key, "bounds": bounds, "states": {}, "completed": []}
+
+    @classmethod
+    def load_or_create(cls, path, key, bounds, fresh=False):
+        """Dönüş: (manifest, devam_mı) - anahtar veya parçalar uyuşmazsa yeni manifest"""
+        manifest = cls(path, key, bounds)
+        if not fresh and os.path.exists(path):
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("run_key") == key and data.get("bounds") == bounds:
+                manifest.data = data
+                return manifest, True
+        return manifest, False
+
+    @property
+    def completed(self):
+        return set(self.data["completed"])
+
+    def has_state(self, index):
+        return index == 0 or str(index) in self.data["states"]
+
+    def state(self, index):
+        """Parça başlangıcındaki histerezis durumu: (bw, power) veya None (ilk parça)."""
+        stored = self.data["states"].get(str(index))
+        if stored is None:
+            return None
+        return tuple(np.array(x, dtype=float) for x in stored)
+
+    def set_state(self, index, state):
+        if state is not None:
+            self.data["states"][str(index)] = [np.asarray(x, dtype=float).tolist() for x in state]
+
+    def mark_completed(self, index):
+        if index not in self.data["completed"]:
+            self.data["completed"].append(index)
+
+    def save(self):
+        directory = os.path.dirname(os.path.abspath(self.path))
+        fd, tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(self.data, f)
+            os.replace(tmp, self.path)
+        finally:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+
+    def remove(self):
+        if os.path.exists(self.path):
+            os.remove(self.path)
+
+
+def run_shard(index, shard_arrays, prev_state, baseline_config=BASELINE_CONFIG,
+              optimized_config=OPTIMIZED_CONFIG, path_loss_exp=PATH_LOSS_EXPONENT):
+    """
+    Tek bir zaman parçasını simüle eder ve çıktılarını parça dosyalarına yazar.
+    İşçi süreçlerde çalışır. Dönüş: (parça indeksi, karşılaştırma satır sayısı)
+    """
+    resources = simulation_runner.scenario_resources(shard_arrays, baseline_config, optimized_config,
+                                                     prev_state, path_loss_exp)
+    results_df = simulation_runner.simulate_target_site(shard_arrays, baseline_config, optimized_config,
+                                                        path_loss_exp, resources=resources)
+    network_df, timeline_df, _ = simulation_runner.simulate_network(shard_arrays, baseline_config,
+                                                                   optimized_config, path_loss_exp,
+                                                                   resources=resources)
+    for name, df in zip(OUTPUTS, (results_df, network_df, timeline_df)):
+        write_table(df, part_name(name, index), csv_export=False)
+    return index, len(results_df)
+
+
+def merge_parts(name):
+    """
+    Parça dosyalarını (zaman sırasıyla) tek tabloda birleştirir. Senaryo
+    sütunu olan tablolar tek süreçli çıktıdaki gibi senaryo sırasına dizilir.
+    """
+    df = pd.concat([read_table(path) for path in list_parts(name)], ignore_index=True)
+    if "Scenario" in df.columns:
+        df = df.sort_values("Scenario", kind="stable", ignore_index=True)
+    return write_table(df, name)
+
+
+def run_sharded_simulation(shard_hours=SHARD_CONFIG['shard_hours'], workers=SHARD_CONFIG['workers'],
+                           merge=SHARD_CONFIG['merge'], fresh=False, arrays=None,
+                           manifest_path=MANIFEST_FILE):
+    """
+    Karşılaştırma ve ağ geneli simülasyonu zaman parçalarıyla çalıştırır.
+    fresh=True ise önceki manifest ve parça dosyaları yok sayılır.
+    merge=False ise parçalar ayrı kalır ve aynı adlı eski tek tablolar silinir.
+    arrays: build_site_arrays çıktısı (verilmezse tahmin verisi okunur)
+    Dönüş: tamamlanan parça sayısı
+    """
+    print(">>> Parçalı (sharded) 5G simülasyonu başlatılıyor...")
+    if arrays is None:
+        arrays = simulation_runner.build_site_arrays(simulation_runner.load_prediction_data())
+    if 'Site_1' not in arrays['site_names']:
+        print("HATA: Site_1 tahmin verisinde bulunamadı.")
+        return 0
+
+    bounds = shard_bounds(arrays['timestamps'], shard_hours)
+    key = run_key(arrays, shard_hours)
+    manifest, resumed = ShardManifest.load_or_create(manifest_path, key, bounds, fresh)
+    if not resumed:
+        for name in OUTPUTS:
+            remove_parts(name)
+        manifest.save()
+    pending = [i for i in range(len(bounds)) if i not in manifest.completed]
+    print(f"Toplam {len(arrays['timestamps'])} zaman adımı, {len(bounds)} parça "
+          f"({shard_hours} saat); {'devam ediliyor, ' if resumed else ''}{len(pending)} parça kaldı.")
+
+    # Sıralı histerezis taraması: kayıtlı en son durumdan başlayarak her
+    # bekleyen parçanın başlangıç durumu bulunur
+    tasks = []
+    if pending:
+        begin = max(i for i in range(pending[0] + 1) if manifest.has_state(i))
+        state = manifest.state(begin)
+        for i in range(begin, pending[-1] + 1):
+            manifest.set_state(i, state)
+            if i in pending:
+                tasks.append((i, state))
+            if i < pending[-1]:
+                _, _, _, state = simulation_runner.assign_optimized_resources(
+                    slice_arrays(arrays, *bounds[i]), OPTIMIZED_CONFIG, state)
+        manifest.save()
+
+    start = time.perf_counter()
+
+    def completed(index, rows):
+        manifest.mark_completed(index)
+        manifest.save()
+        done = len(manifest.completed)
+        print(f">>> Parça {index + 1}/{len(bounds)} tamamlandı ({rows} satır) - "
+              f"{done}/{len(bounds)}, {time.perf_counter() - start:.1f} sn")
+
+    workers = workers or os.cpu_count()
+    if workers <= 1 or len(tasks) <= 1:
+        for index, state in tasks:
+            completed(*run_shard(index, slice_arrays(arrays, *bounds[index]), state))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tasks))) as pool:
+            futures = [pool.submit(run_shard, index, slice_arrays(arrays, *bounds[index]), state)
+                       for index, state in tasks]
+            for future in as_completed(futures):
+                completed(*future.result())
+
+    if merge:
+        for name in OUTPUTS:
+            path = merge_parts(name)
+            print(f">>> Parçalar '{path}' dosyasında birleştirildi.")
+        manifest.remove()
+        for name in OUTPUTS:
+            remove_parts(name)
+    else:
+        # read_table tek tabloyu parçalara tercih eder; önceki çalışmanın tek
+        # tablosu kalırsa okuyucular yeni parçalar yerine onu görür
+        for name in OUTPUTS:
+            remove_single(name)
+        print(f">>> Parçalar '{part_name(RESULTS_FILE, 0)}', ... dosyalarında; "
+              f"read_table('{RESULTS_FILE}') parçaları birleştirerek okur (eski tek tablolar silindi).")
+    return len(bounds)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Zaman parçalı, kaldığı yerden devam edebilen 5G simülasyonu")
+    parser.add_argument("--shard-hours", type=int, default=SHARD_CONFIG['shard_hours'], help="Parça uzunluğu (saat)")
+    parser.add_argument("--workers", type=int, default=SHARD_CONFIG['workers'],
+                        help="İşçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--no-merge", action="store_true", help="Parçaları tek dosyada birleştirme (önceki tek tablolar silinir)")
+    parser.add_argument("--fresh", action="store_true", help="Önceki ilerlemeyi yok say, baştan başla")
+    args = parser.parse_args(argv)
+    try:
+        completed = run_sharded_simulation(args.shard_hours, args.workers,
+                                           merge=not args.no_merge and SHARD_CONFIG['merge'], fresh=args.fresh)
+    except FileNotFoundError as e:
+        print(f"HATA: {e}")
+        return 1
+    return 0 if completed else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
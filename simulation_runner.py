@@ -1,178 +1,589 @@
 # simulation_runner.py
+import argparse
+import sys
 import pandas as pd
 import numpy as np
-import random
-from config import *
+from config import (ALLOCATOR_CONFIG, BASELINE_CONFIG, CARRIER_FREQ_MHZ, FORECAST_CACHE_ENABLED,
+                    GAIN_CACHE_ENABLED, GAIN_LUT_RESOLUTION_M, INTERFERENCE_CUTOFF_DBM,
+                    INTERFERENCE_RADIUS_M, KPI_CONFIG, NETWORK_RESULTS_FILE, NETWORK_TIMELINE_FILE,
+                    OPTIMIZED_CONFIG, PATH_LOSS_EXPONENT, PREDICTIONS_FILE, RESULTS_FILE,
+                    SITE_LAYOUT_FILE, TRAFFIC_DATA_FILE)
 from physics_engine import PhysicsEngine
-import user_algo  # The user's specific algorithms
+from interference_engine import InterferenceEngine
+from storage import read_table, write_table
+from forecast_cache import FORECAST_COLUMNS, cached_predictions
+from spatial_sampling import MAX_CHUNK_ELEMENTS, UELayout, grid_ue_positions, random_ue_positions
+from spatial_index import read_site_layout, neighbor_radius
+from gain_cache import layout_tables
+from instrumentation import INSTRUMENTATION
+from network_kpis import network_summary, network_timeline, site_kpis
+from resource_allocator import (FREQUENCY_PLANNERS, RESOURCE_MODELS, allocate_resources,
+                                apply_optimized_constraints, get_strategy)
+
+# Varsayılan yerleşim (SITE_LAYOUT_FILE bulunamazsa kullanılır)
+# İstasyonların konumları (x, y) - METRE cinsinden (Kullanıcı İsteği)
+SITE_LOCATIONS = {
+    "Site_1": (0, 0),
+    "Site_2": (0, 400),
+    "Site_3": (400, 400), 
+    "Site_4": (400, 0),
+    "Site_5": (200, 200)
+}
+
+# Internal ID mapping
+SITE_ID_MAP = {
+    "Site_1": 1, "Site_2": 2, "Site_3": 3, "Site_4": 4, "Site_5": 5
+}
 
 # --- VERİ YÜKLEME (DATA GENERATOR -> LSTM -> CSV) ---
-def load_prediction_data():
+def load_site_layout(path=SITE_LAYOUT_FILE):
     """
-    LSTM modelinden (veya mock) üretilmiş 'lstm_predictions.csv' dosyasını okur.
-    Beklenen Format: datetime, site_id, pred_users, est_snr_db
+    Site yerleşimini dosyadan okur; dosya yoksa varsayılan 5 siteli yerleşimi
+    döndürür.
+    Dönüş: site_id indeksli DataFrame (internal_id, x_m, y_m), internal_id sıralı
     """
-    print(">>> Tahmin verileri yükleniyor: lstm_predictions.csv")
     try:
-        df = pd.read_csv("lstm_predictions.csv", parse_dates=["datetime"])
+        return read_site_layout(path)
     except FileNotFoundError:
-        print("HATA: 'lstm_predictions.csv' bulunamadı! Lütfen önce lstm eğitimi kodunu çalıştırın.")
-        exit()
-        
-    # İstasyonların konumları (x, y) - METRE cinsinden (Kullanıcı İsteği)
-    locations = {
-        "Site_1": (0, 0),
-        "Site_2": (0, 400),
-        "Site_3": (400, 400), 
-        "Site_4": (400, 0),
-        "Site_5": (200, 200)
-    }
-    
-    # Internal ID mapping
-    id_map = {
-        "Site_1": 1, "Site_2": 2, "Site_3": 3, "Site_4": 4, "Site_5": 5
-    }
+        return pd.DataFrame({
+            'internal_id': pd.Series(SITE_ID_MAP),
+            'x_m': pd.Series({k: v[0] for k, v in SITE_LOCATIONS.items()}),
+            'y_m': pd.Series({k: v[1] for k, v in SITE_LOCATIONS.items()}),
+        }).rename_axis('site_id').sort_values('internal_id')
+
+def attach_site_layout(df, layout=None):
+    """
+    Tahmin tablosuna internal id ve konum (metre) sütunlarını ekler.
+    Yerleşimde bulunmayan sitelerin konumu (0, 0) kabul edilir.
+    """
+    layout = load_site_layout() if layout is None else layout
 
     # Internal ID column
-    df['_internal_id'] = df['site_id'].map(id_map)
+    df['_internal_id'] = df['site_id'].map(layout['internal_id'])
     
     # Konumları ekle
-    df['_pos_x'] = df['site_id'].map(lambda x: locations.get(x, (0,0))[0])
-    df['_pos_y'] = df['site_id'].map(lambda x: locations.get(x, (0,0))[1])
+    df['_pos_x'] = df['site_id'].map(layout['x_m']).fillna(0)
+    df['_pos_y'] = df['site_id'].map(layout['y_m']).fillna(0)
     
     return df
 
-# --- SİMÜLASYON DÖNGÜSÜ ---
+def interference_radius(physics, path_loss_exp=PATH_LOSS_EXPONENT, radius_m=INTERFERENCE_RADIUS_M,
+                        cutoff_dbm=INTERFERENCE_CUTOFF_DBM,
+                        baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG):
+    """
+    Girişim komşuluk yarıçapı (metre). Alınan güç eşiği, senaryolardaki en
+    yüksek verici gücüne göre mesafeye çevrilir. Sınır yoksa None.
+    """
+    max_tx = max(baseline_config['tx_power_watt'], optimized_config['max_power_watt'])
+    return neighbor_radius(physics, path_loss_exp, radius_m, cutoff_dbm, max_tx)
+
+def load_prediction_data():
+    """
+    Tahmin tablosunu yükler. Beklenen Format: datetime, site_id, pred_users, est_snr_db
+
+    lstm_train.py'nin ürettiği tahmin dosyası (PREDICTIONS_FILE, sütunsal
+    biçim veya CSV) varsa her zaman o okunur; böylece eğitimde kullanılan
+    parametreler (--window, --horizon, --alpha) simülasyona yansır. Dosya
+    yoksa, FORECAST_CACHE_ENABLED açık ve trafik verisi mevcutsa tahminler
+    FORECAST_PARAMS ile önbellekten alınır (önbellekte yoksa hesaplanıp
+    yazılır). Hiçbiri yoksa FileNotFoundError.
+    """
+    try:
+        df = read_table(PREDICTIONS_FILE, columns=["datetime", "site_id", "pred_users", "est_snr_db"])
+        print(f">>> Tahmin verileri yüklendi: {PREDICTIONS_FILE}")
+    except FileNotFoundError:
+        df = None
+
+    if df is None and FORECAST_CACHE_ENABLED:
+        try:
+            traffic_df = read_table(TRAFFIC_DATA_FILE, columns=FORECAST_COLUMNS)
+        except FileNotFoundError:
+            traffic_df = None
+        if traffic_df is not None:
+            df, _, _, hit = cached_predictions(traffic_df)
+            print(f">>> Tahmin verileri {'önbellekten okundu' if hit else 'hesaplandı ve önbelleğe yazıldı'}: {TRAFFIC_DATA_FILE}")
+
+    if df is None:
+        raise FileNotFoundError(f"'{PREDICTIONS_FILE}' bulunamadı! Lütfen önce lstm eğitimi kodunu çalıştırın.")
+    df['site_id'] = df['site_id'].astype(str)
+
+    return attach_site_layout(df)
+
+# --- SÜTUNSAL (COLUMNAR) VERİ HAZIRLIĞI ---
+def build_site_arrays(traffic_df):
+    """
+    Tahmin tablosunu bir kez pivotlayarak yoğun (T x N) dizilere çevirir.
+    Her zaman adımı için DataFrame filtrelemek yerine tüm simülasyon bu
+    diziler üzerinde çalışır.
+
+    Dönüş: sözlük
+        timestamps : (T,) sıralı zaman damgaları (datetime64)
+        site_names : N elemanlı site adı listesi (internal id sırasıyla)
+        ids        : (N,) internal id
+        pos        : (N, 2) konumlar (metre)
+        users      : (T, N) tahmini kullanıcı sayısı (eksik kayıt: NaN)
+        snr        : (T, N) tahmini SNR (dB) (eksik kayıt: NaN)
+        present    : (T, N) o saatte kaydı olan siteler
+    """
+    sites = traffic_df.drop_duplicates('site_id').sort_values('_internal_id')
+    site_names = list(sites['site_id'])
+
+    wide = traffic_df.pivot_table(index='datetime', columns='site_id',
+                                  values=['pred_users', 'est_snr_db'], aggfunc='first')
+    wide = wide.sort_index()
+    users = wide['pred_users'].reindex(columns=site_names).to_numpy(dtype=float)
+    snr = wide['est_snr_db'].reindex(columns=site_names).to_numpy(dtype=float)
+
+    return {
+        'timestamps': wide.index.to_numpy(),
+        'site_names': site_names,
+        'ids': sites['_internal_id'].to_numpy(),
+        'pos': sites[['_pos_x', '_pos_y']].to_numpy(dtype=float),
+        'users': users,
+        'snr': snr,
+        'present': ~np.isnan(users),
+    }
+
+def assign_optimized_resources(arrays, optimized_config=OPTIMIZED_CONFIG, prev_state=None,
+                               allocator_config=ALLOCATOR_CONFIG, path_loss_exp=PATH_LOSS_EXPONENT):
+    """
+    OPTIMIZED senaryosu için (T x N) bant genişliği, güç ve merkez frekans
+    dizilerini üretir (bkz. resource_allocator.allocate_resources).
+
+    Adım 1 (Kaynak Atama) tüm mevcut (site, saat) hücreleri üzerinde tek
+    geçişte yapılır ve OPTIMIZED_CONFIG sınırları (uyku modu, histerezis)
+    uygulanır. Adım 2 (Parazit Önleme) frekans planlayıcısıyla yapılır.
+    Stratejiler ALLOCATOR_CONFIG'ten seçilir; "user_algo" stratejileri
+    user_algo.py fonksiyonlarını kullanır. Girişim grafiğini kullanan
+    planlayıcılar (greedy) simülasyonla aynı path_loss_exp değerini alır.
+
+    prev_state: önceki parçadan kalan histerezis durumu (bkz.
+    apply_optimized_constraints).
+    Dönüş: (bw, power, freq, state)
+    """
+    cfg = allocator_config
+    params = cfg.get('strategy_params', {})
+    resource_model = get_strategy(RESOURCE_MODELS, cfg['resource_model'], **params.get(cfg['resource_model'], {}))
+    planner_params = dict(params.get(cfg['frequency_planner'], {}))
+    if cfg['frequency_planner'] == "greedy":
+        planner_params['path_loss_exp'] = path_loss_exp
+    planner = get_strategy(FREQUENCY_PLANNERS, cfg['frequency_planner'], **planner_params)
+    return allocate_resources(arrays, optimized_config, CARRIER_FREQ_MHZ, resource_model, planner, prev_state)
+
+def evaluate_scenario(interference, arrays, tx_power, bandwidth, center_freq, target_idx, gain, target_gain,
+                      neighbors=None):
+    """
+    Bir senaryonun tüm zaman adımları için hedef UE metriklerini toplu hesaplar.
+
+    tx_power, bandwidth, center_freq: (T x N). Kaydı olmayan istasyonlar sıfır
+    güç ve bant genişliği ile girişime katkı yapmaz.
+    gain: (N x 1) istasyon -> UE kazancı, target_gain: hedef istasyonun kazancı.
+    neighbors: verilirse yalnızca bu (sıralı, hedefi içeren) istasyonlar
+    girişime dahil edilir (bkz. target_neighbors).
+    Dönüş: (sinr_db, energy_kwh), her biri (T,)
+    """
+    physics = interference.physics
+    present = arrays['present']
+    if neighbors is not None:
+        present, tx_power, bandwidth, center_freq = (
+            np.asarray(x)[:, neighbors] for x in (present, tx_power, bandwidth, center_freq))
+        gain = gain[neighbors]
+        target_idx = int(np.searchsorted(neighbors, target_idx))
+    tx_power = np.where(present, tx_power, 0.0)
+    bandwidth = np.where(present, bandwidth, 0.0)
+
+    serving = np.full(1, target_idx)
+    with INSTRUMENTATION.stage("interference"):
+        int_watt = interference.interference_for_serving(tx_power, center_freq, bandwidth, gain, serving)[:, 0]
+    # Kaydı olmayan saatlerde hedef gücü 0 W'tır; bu satırlar çağıran tarafta elenir
+    with INSTRUMENTATION.stage("sinr"), np.errstate(divide='ignore'):
+        rx_dbm = 10 * np.log10(tx_power[:, target_idx] * 1000 * target_gain)
+        sinr = physics.sinr_batch(rx_dbm, int_watt, bandwidth[:, target_idx] * 1e6)
+    with INSTRUMENTATION.stage("energy"):
+        energy = physics.energy_batch(tx_power[:, target_idx], 1)
+    return sinr, energy
+
+def scenario_resources(arrays, baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG,
+                       prev_state=None, path_loss_exp=PATH_LOSS_EXPONENT):
+    """
+    Baseline ve Optimized senaryoları için (T x N) güç, bant genişliği ve
+    merkez frekans dizileri.
+    prev_state: Optimized histerezis durumu (zaman parçalarında önceki parçanın
+    sonundaki durum, bkz. sharded_runner.py)
+    Dönüş: {'Baseline': (power, bw, freq), 'Optimized': (power, bw, freq)}
+    """
+    T, N = arrays['users'].shape
+
+    # A) BASELINE SENARYOSU (Sabit)
+    bl_power = np.full((T, N), baseline_config['tx_power_watt'])
+    bl_bw = np.full((T, N), baseline_config['bandwidth_mhz'])
+    bl_freq = np.full((T, N), CARRIER_FREQ_MHZ)
+
+    # B) OPTIMIZED SENARYOSU (User Algorithm)
+    opt_bw, opt_power, opt_freq, _ = assign_optimized_resources(arrays, optimized_config, prev_state,
+                                                                path_loss_exp=path_loss_exp)
+
+    return {
+        'Baseline': (bl_power, bl_bw, bl_freq),
+        'Optimized': (opt_power, opt_bw, opt_freq),
+    }
+
+def target_ue_gain(interference, site_pos, target_idx, offset_m=(150.0, 0.0)):
+    """
+    Hedef siteye offset_m uzaklıktaki tek referans UE için kazanç.
+    Aynı yerleşim ve yayılım parametreleriyle tekrarlanan çağrılar (ör. tarama
+    senaryoları) süreç içi kazanç önbelleğinden okunur.
+    Dönüş: (gain (N x 1), hedef istasyonun kazancı)
+    """
+    # Kullanıcı Konumu (Metre): hedef siteye 150m mesafede (150, 0)
+    user_pos = site_pos[target_idx] + np.asarray(offset_m)
+    gain = layout_tables(interference, site_pos, user_pos[None, :], persist=False)["gain"]
+    return gain, gain[target_idx, 0]
+
+def target_neighbors(site_pos, target_idx, radius_m, offset_m=(150.0, 0.0)):
+    """
+    Referans UE'ye radius_m içindeki istasyonlar (hedef her zaman dahil).
+    Dönüş: sıralı istasyon indeksleri; radius_m None ise None (tüm istasyonlar)
+    """
+    if radius_m is None:
+        return None
+    user_pos = site_pos[target_idx] + np.asarray(offset_m)
+    dist = np.sqrt(((site_pos - user_pos)**2).sum(axis=1))
+    within = dist <= radius_m
+    within[target_idx] = True
+    return np.flatnonzero(within)
+
+def site_reference_tables(interference, site_pos, radius_m=None, offset_m=(150.0, 0.0)):
+    """
+    Her site için offset_m uzaklıktaki bir referans UE (UE u, site u'ya bağlı)
+    kazanç tabloları (bkz. gain_cache.layout_tables).
+    """
+    ue_pos = site_pos + np.asarray(offset_m)
+    return layout_tables(interference, site_pos, ue_pos, radius_m, persist=False)
+
+def evaluate_network(interference, arrays, tx_power, bandwidth, center_freq, ref_tables):
+    """
+    Bir senaryonun tüm siteleri ve tüm zaman adımları için referans UE SINR'ı
+    ve site enerjisi. Her zaman adımında çakışma matrisi bir kez hesaplanır;
+    her sitenin kendi UE'sindeki girişim bu matrisin ilgili satırından okunur
+    (köşegen), böylece maliyet tek hedef siteli hesapla aynı mertebededir.
+    ref_tables: site_reference_tables çıktısı (tam veya komşu tablosu)
+    Dönüş: (sinr_db, energy_kwh), her biri (T x N)
+    """
+    physics = interference.physics
+    present = arrays['present']
+    tx_power = np.where(present, tx_power, 0.0)
+    bandwidth = np.where(present, bandwidth, 0.0)
+    center_freq = np.broadcast_to(center_freq, tx_power.shape)
+    T, N = tx_power.shape
+    sites = np.arange(N)
+
+    if 'gain' in ref_tables:
+        gain = ref_tables['gain']                                   # (N x N): [istasyon, UE]
+        per_step = N * N
+    else:
+        neighbors, neighbor_gain = ref_tables['neighbors'], ref_tables['neighbor_gain']
+        own = neighbors == sites[:, None]
+        if not own.any(axis=1).all():
+            raise ValueError("Girişim yarıçapı referans UE'nin kendi sitesine uzaklığından küçük")
+        own_k = own.argmax(axis=1)
+        per_step = neighbors.size
+
+    int_watt = np.empty((T, N))
+    rx_own = np.empty((T, N))
+    step = max(1, MAX_CHUNK_ELEMENTS // (3 * per_step))
+    for start in range(0, T, step):
+        sl = slice(start, start + step)
+        with INSTRUMENTATION.stage("interference"):
+            if 'gain' in ref_tables:
+                rx = interference.received_power_matrix(tx_power[sl], gain)          # [t, j, u]
+                overlap = interference.overlap_matrix(center_freq[sl], bandwidth[sl])  # [t, s, j]
+                int_watt[sl] = interference.weight * np.einsum('tuj,tju->tu', overlap, rx)
+                rx_own[sl] = rx[:, sites, sites]
+            else:
+                rx = interference.neighbor_received_power(tx_power[sl], neighbors, neighbor_gain)
+                serving_k = np.broadcast_to(own_k, rx.shape[:-1])
+                int_watt[sl] = interference.neighbor_interference(center_freq[sl], bandwidth[sl],
+                                                                  neighbors, rx, serving_k)
+                rx_own[sl] = rx[:, sites, own_k]
+
+    with INSTRUMENTATION.stage("sinr"), np.errstate(divide='ignore'):
+        sinr = physics.sinr_batch(10 * np.log10(rx_own * 1000), int_watt, bandwidth * 1e6)
+    with INSTRUMENTATION.stage("energy"):
+        energy = physics.energy_batch(tx_power, 1)
+    return sinr, energy
+
+# --- SİMÜLASYON ---
+def simulate_network(arrays, baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG,
+                     path_loss_exp=PATH_LOSS_EXPONENT, kpi_config=KPI_CONFIG, resources=None):
+    """
+    Tüm siteler için Baseline ve Optimized KPI'ları (SINR, Shannon kapasitesi,
+    karşılanan trafik / talep, enerji) ve ağ düzeyi toplamlar.
+    resources: scenario_resources çıktısı (verilmezse hesaplanır)
+    Dönüş: (site_df, timeline_df, summary) - summary: {senaryo: network_summary}
+    """
+    physics = INSTRUMENTATION.instrument_physics(PhysicsEngine(CARRIER_FREQ_MHZ))
+    interference = InterferenceEngine(physics, path_loss_exp)
+    radius = interference_radius(physics, path_loss_exp, baseline_config=baseline_config,
+                                 optimized_config=optimized_config)
+    ref_tables = site_reference_tables(interference, arrays['pos'], radius)
+    if resources is None:
+        resources = scenario_resources(arrays, baseline_config, optimized_config, path_loss_exp=path_loss_exp)
+
+    present = arrays['present']
+    T, N = present.shape
+    t_idx, s_idx = np.nonzero(present)
+    site_names = np.asarray(arrays['site_names'], dtype=object)
+    demand_rate = kpi_config['demand_per_user_mbps']
+    percentile = kpi_config['cell_edge_percentile']
+
+    site_tables, timeline_tables, summary = [], [], {}
+    for scenario, (power, bw, freq) in resources.items():
+        sinr, energy = evaluate_network(interference, arrays, power, bw, freq, ref_tables)
+        kpis = site_kpis(sinr, bw, energy, arrays['users'], present, demand_rate)
+        freq = np.broadcast_to(freq, (T, N))
+
+        site_tables.append(pd.DataFrame({
+            "Time": arrays['timestamps'][t_idx],
+            "Site": site_names[s_idx],
+            "Scenario": scenario,
+            "Users": arrays['users'][t_idx, s_idx].astype(int),
+            "SINR_dB": np.round(sinr[t_idx, s_idx], 2),
+            "Capacity_Mbps": np.round(kpis['capacity_mbps'][t_idx, s_idx], 1),
+            "Demand_Mbps": np.round(kpis['demand_mbps'][t_idx, s_idx], 1),
+            "Served_Mbps": np.round(kpis['served_mbps'][t_idx, s_idx], 1),
+            "Energy_kWh": np.round(kpis['energy_kwh'][t_idx, s_idx], 3),
+            "BW_MHz": np.round(bw[t_idx, s_idx], 1),
+            "Power_W": np.round(power[t_idx, s_idx], 1),
+            "Freq_MHz": np.round(freq[t_idx, s_idx], 1)
+        }))
+
+        timeline = network_timeline(kpis, sinr, present, cell_edge_percentile=percentile)
+        timeline_tables.append(pd.DataFrame({
+            "Time": arrays['timestamps'],
+            "Scenario": scenario,
+            "Energy_kWh": np.round(timeline['energy_kwh'], 3),
+            "Served_Mbps": np.round(timeline['served_mbps'], 1),
+            "Demand_Mbps": np.round(timeline['demand_mbps'], 1),
+            "Energy_per_bit_nJ": np.round(timeline['energy_per_bit_nj'], 2),
+            "Cell_Edge_SINR_dB": np.round(timeline['cell_edge_sinr_db'], 2)
+        }))
+        summary[scenario] = network_summary(kpis, sinr, present, cell_edge_percentile=percentile)
+
+    return (pd.concat(site_tables, ignore_index=True),
+            pd.concat(timeline_tables, ignore_index=True), summary)
+
+def simulate_target_site(arrays, baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG,
+                         path_loss_exp=PATH_LOSS_EXPONENT, target_site="Site_1", resources=None):
+    """
+    Hazır (T x N) diziler üzerinde Baseline ve Optimized senaryolarını hedef
+    site için karşılaştırır. Dosya okuma/yazma yapmaz; parametre taramaları
+    (sweep_runner.py) bu fonksiyonu farklı konfigürasyonlarla çağırır.
+    resources: scenario_resources çıktısı (verilmezse hesaplanır)
+    Dönüş: simulation_results_comparison.csv sütunlarına sahip DataFrame
+    """
+    physics = INSTRUMENTATION.instrument_physics(PhysicsEngine(CARRIER_FREQ_MHZ))
+    interference = InterferenceEngine(physics, path_loss_exp)
+
+    target_idx = arrays['site_names'].index(target_site)
+    valid = arrays['present'][:, target_idx]
+
+    gain, target_gain = target_ue_gain(interference, arrays['pos'], target_idx)
+    neighbors = target_neighbors(arrays['pos'], target_idx,
+                                 interference_radius(physics, path_loss_exp, baseline_config=baseline_config,
+                                                     optimized_config=optimized_config))
+
+    # A) BASELINE ve B) OPTIMIZED senaryoları
+    if resources is None:
+        resources = scenario_resources(arrays, baseline_config, optimized_config, path_loss_exp=path_loss_exp)
+    bl_power, bl_bw, bl_freq = resources['Baseline']
+    opt_power, opt_bw, opt_freq = resources['Optimized']
+
+    # C) FİZİKSEL HESAPLAMALAR
+    sinr_bl, energy_bl = evaluate_scenario(interference, arrays, bl_power, bl_bw, bl_freq,
+                                           target_idx, gain, target_gain, neighbors)
+    sinr_opt, energy_opt = evaluate_scenario(interference, arrays, opt_power, opt_bw, opt_freq,
+                                             target_idx, gain, target_gain, neighbors)
+
+    return pd.DataFrame(comparison_columns(arrays, target_idx, valid, (sinr_bl, energy_bl),
+                                           (sinr_opt, energy_opt), (opt_power, opt_bw, opt_freq)))
+
+def comparison_columns(arrays, target_idx, valid, baseline, optimized, opt_resources):
+    """
+    simulation_results_comparison.csv sütunlarını (geçerli saatler için) üretir.
+    baseline/optimized: (sinr_db, energy_kwh), opt_resources: (power, bw, freq)
+    """
+    (sinr_bl, energy_bl), (sinr_opt, energy_opt) = baseline, optimized
+    opt_power, opt_bw, opt_freq = opt_resources
+    return {
+        "Time": arrays['timestamps'][valid],
+        "Site": arrays['site_names'][target_idx],
+        "Users": arrays['users'][valid, target_idx].astype(int),
+        "SINR_Baseline_dB": np.round(sinr_bl[valid], 2),
+        "SINR_Optimized_dB": np.round(sinr_opt[valid], 2),
+        "Energy_Baseline_kWh": np.round(energy_bl[valid], 3),
+        "Energy_Optimized_kWh": np.round(energy_opt[valid], 3),
+        "BW_Optimized_MHz": np.round(opt_bw[valid, target_idx], 1),
+        "Power_Optimized_W": np.round(opt_power[valid, target_idx], 1),
+        "Freq_Optimized_MHz": np.round(opt_freq[valid, target_idx], 1)
+    }
+
 def run_comparison_simulation():
+    """Dönüş: çıkış kodu (0 başarılı, 1 hedef site tahmin verisinde yok)"""
     print(">>> 5G Optimizasyon Simülasyonu Başlatılıyor (Konumlar: Metre)...")
     
     # 1. Veri Hazırlığı
-    traffic_df = load_prediction_data()
-    physics = PhysicsEngine(CARRIER_FREQ_MHZ)
-    
-    results = []
-    
-    # Benzersiz zaman damgaları
-    timestamps = traffic_df['datetime'].unique()
-    timestamps = sorted(timestamps)
-    
-    print(f"Toplam {len(timestamps)} zaman adımı simüle edilecek.")
-    
-    for ts in timestamps:
-        hourly_data = traffic_df[traffic_df['datetime'] == ts].copy()
-        
-        # --- DURUM TANIMLAMA (SNAPSHOT) ---
-        bs_states_baseline = []
-        bs_states_optimized = [] 
-        
-        # A) BASELINE SENARYOSU (Sabit)
-        for _, row in hourly_data.iterrows():
-            bs_states_baseline.append({
-                'id': row['_internal_id'],
-                'site_name': row['site_id'], 
-                'tx_power': BASELINE_CONFIG['tx_power_watt'],
-                'bandwidth': BASELINE_CONFIG['bandwidth_mhz'],
-                'center_freq': CARRIER_FREQ_MHZ, 
-                'users': row['pred_users'],
-                'x': row['_pos_x'],
-                'y': row['_pos_y']
-            })
-            
-        # B) OPTIMIZED SENARYOSU (User Algorithm)
-        # Adım 1: Kaynak Atama
-        opt_data_rows = []
-        for _, row in hourly_data.iterrows():
-            req_bw = user_algo.needed_bw_mhz(row['pred_users'], row['est_snr_db'])
-            req_power = user_algo.power_w(row['pred_users'], req_bw)
-            
-            opt_data_rows.append({
-                'site_id': row['site_id'],
-                'freq': CARRIER_FREQ_MHZ,
-                'bw': req_bw,
-                'power': req_power,
-                'users': row['pred_users'],
-                'snr': row['est_snr_db'],
-                '_internal_id': row['_internal_id'],
-                '_pos_x': row['_pos_x'],
-                '_pos_y': row['_pos_y']
-            })
-            
-        opt_df = pd.DataFrame(opt_data_rows)
-        
-        # Adım 2: Parazit Önleme
-        opt_df_final = user_algo.parazit_onleyici(opt_df)
-        
-        for _, row in opt_df_final.iterrows():
-            bs_states_optimized.append({
-                'id': row['_internal_id'],
-                'site_name': row['site_id'],
-                'tx_power': row['power'],
-                'bandwidth': row['bw'],
-                'center_freq': row['freq'],
-                'users': row['users'],
-                'x': row['_pos_x'],
-                'y': row['_pos_y']
-            })
-
-        # C) FİZİKSEL HESAPLAMALAR
-        # Hedef Site: Site_1 (0,0)
-        try:
-            target_bl = next(x for x in bs_states_baseline if x['site_name'] == 'Site_1')
-            target_opt = next(x for x in bs_states_optimized if x['site_name'] == 'Site_1')
-        except StopIteration:
-            continue
-        
-        # Kullanıcı Konumu (Metre)
-        # Site 1'e 150m mesafede (150, 0) olsun
-        user_pos_x = target_bl['x'] + 150.0
-        user_pos_y = target_bl['y'] + 0.0
-        
-        user_dist_map_bl = {}
-        user_dist_map_opt = {}
-        
-        # Mesafeleri hesapla (Metre)
-        for bs in bs_states_baseline:
-            d = np.sqrt((bs['x'] - user_pos_x)**2 + (bs['y'] - user_pos_y)**2)
-            user_dist_map_bl[bs['id']] = max(1.0, d)
-            
-        for bs in bs_states_optimized:
-             d = np.sqrt((bs['x'] - user_pos_x)**2 + (bs['y'] - user_pos_y)**2)
-             user_dist_map_opt[bs['id']] = max(1.0, d)
-
-        # Hedef istasyona gerçek uzaklık
-        target_dist = user_dist_map_bl[target_bl['id']]
-
-        # 1. Baseline Metrics
-        int_watt_bl = physics.calculate_interference(target_bl, bs_states_baseline, user_dist_map_bl)
-        rx_dbm_bl = physics.calculate_received_power(target_bl['tx_power'], target_dist)
-        sinr_bl = physics.calculate_sinr(rx_dbm_bl, int_watt_bl, target_bl['bandwidth']*1e6)
-        energy_bl = physics.calculate_energy_consumption(target_bl['tx_power'], 1) 
-        
-        # 2. Optimized Metrics
-        int_watt_opt = physics.calculate_interference(target_opt, bs_states_optimized, user_dist_map_opt)
-        rx_dbm_opt = physics.calculate_received_power(target_opt['tx_power'], target_dist)
-        sinr_opt = physics.calculate_sinr(rx_dbm_opt, int_watt_opt, target_opt['bandwidth']*1e6)
-        energy_opt = physics.calculate_energy_consumption(target_opt['tx_power'], 1)
-
-        results.append({
-            "Time": ts,
-            "Site": "Site_1",
-            "Users": target_bl['users'],
-            "SINR_Baseline_dB": round(sinr_bl, 2),
-            "SINR_Optimized_dB": round(sinr_opt, 2),
-            "Energy_Baseline_kWh": round(energy_bl, 3),
-            "Energy_Optimized_kWh": round(energy_opt, 3),
-            "BW_Optimized_MHz": round(target_opt['bandwidth'], 1),
-            "Power_Optimized_W": round(target_opt['tx_power'], 1),
-            "Freq_Optimized_MHz": round(target_opt['center_freq'], 1)
-        })
+    with INSTRUMENTATION.stage("data_load"):
+        traffic_df = load_prediction_data()
+        arrays = build_site_arrays(traffic_df)
+    print(f"Toplam {len(arrays['timestamps'])} zaman adımı simüle edilecek.")
+
+    # Hedef Site: Site_1 (0,0)
+    if 'Site_1' not in arrays['site_names']:
+        print("HATA: Site_1 tahmin verisinde bulunamadı.")
+        return 1
+
+    # Kaynak ataması her iki değerlendirme için bir kez yapılır
+    resources = scenario_resources(arrays)
+    results_df = simulate_target_site(arrays, resources=resources)
+    network_df, timeline_df, summary = simulate_network(arrays, resources=resources)
 
     # Kaydet
-    results_df = pd.DataFrame(results)
-    results_df.to_csv("simulation_results_comparison.csv", index=False)
-    print(">>> Sonuçlar 'simulation_results_comparison.csv' dosyasına kaydedildi.")
+    with INSTRUMENTATION.stage("csv_write"):
+        path = write_table(results_df, RESULTS_FILE)
+        network_path = write_table(network_df, NETWORK_RESULTS_FILE)
+        timeline_path = write_table(timeline_df, NETWORK_TIMELINE_FILE)
+    print(f">>> Sonuçlar '{path}' dosyasına kaydedildi.")
+    print(f">>> Ağ geneli sonuçlar '{network_path}' ve '{timeline_path}' dosyalarına kaydedildi.")
     print("\nÖrnek Sonuçlar:")
     print(results_df.head())
 
+    print("\nAğ Geneli KPI'lar:")
+    print(pd.DataFrame(summary).T.round(3).to_string())
+    return 0
+
+# --- ÇOK KULLANICILI (MULTI-UE) UZAYSAL ÖRNEKLEME ---
+def run_multi_ue_simulation(mode="grid", spacing_m=25.0, num_ues=None,
+                            density_per_km2=2000.0, seed=42, sinr_threshold_db=0.0,
+                            radius_m=INTERFERENCE_RADIUS_M, cutoff_dbm=INTERFERENCE_CUTOFF_DBM):
+    """
+    Tek bir sabit UE yerine site yerleşimi üzerine binlerce UE dağıtır.
+    mode="grid": spacing_m aralıklı düzenli ızgara
+    mode="random": Monte-Carlo/Poisson yerleşim (num_ues veya density_per_km2)
+
+    Her UE en güçlü istasyona bağlanır; her saat ve site için SINR yüzdelikleri
+    (5/50/95) ve senaryo başına kapsama haritası kaydedilir. Mesafe ve kazanç
+    matrisleri bir kez hesaplanıp tüm saatlerde ve iki senaryoda kullanılır.
+
+    radius_m / cutoff_dbm verilirse her UE için yalnızca komşu istasyonlar
+    (uzaysal indeks) hesaba katılır ve budama hatası senaryo başına raporlanır.
+    """
+    print(f">>> Çok kullanıcılı simülasyon başlatılıyor (mod: {mode})...")
+    with INSTRUMENTATION.stage("data_load"):
+        traffic_df = load_prediction_data()
+        arrays = build_site_arrays(traffic_df)
+    physics = INSTRUMENTATION.instrument_physics(PhysicsEngine(CARRIER_FREQ_MHZ))
+    interference = InterferenceEngine(physics, PATH_LOSS_EXPONENT)
+
+    if mode == "grid":
+        ue_pos, grid_shape = grid_ue_positions(arrays['pos'], spacing_m)
+    elif mode == "random":
+        ue_pos = random_ue_positions(arrays['pos'], num_ues, density_per_km2, seed=seed)
+        grid_shape = None
+    else:
+        raise ValueError(f"Bilinmeyen UE yerleşim modu: {mode}")
+
+    radius = interference_radius(physics, PATH_LOSS_EXPONENT, radius_m, cutoff_dbm)
+    layout = UELayout(interference, arrays['pos'], ue_pos, grid_shape, radius_m=radius,
+                      lut_resolution_m=GAIN_LUT_RESOLUTION_M, persist_gain=GAIN_CACHE_ENABLED)
+    T, N = arrays['users'].shape
+    print(f"{layout.num_ues} UE, {N} site, {T} zaman adımı.")
+    if layout.sparse:
+        print(f"Girişim yarıçapı {radius:.0f} m: UE başına en fazla {layout.neighbors.shape[1]} komşu istasyon.")
+
+    present = arrays['present']
+    site_col = np.tile(np.asarray(arrays['site_names'], dtype=object), T)
+    time_col = np.repeat(arrays['timestamps'], N)
+
+    tables = []
+    for scenario, (power, bw, freq) in scenario_resources(arrays).items():
+        power = np.where(present, power, 0.0)
+        bw = np.where(present, bw, 0.0)
+        with INSTRUMENTATION.stage("ue_evaluate"):
+            serving, sinr = layout.evaluate(power, freq, bw)
+        values, ue_count = layout.site_percentiles(serving, sinr)
+        if layout.sparse:
+            err = layout.pruning_error(power, freq, bw, seed=seed)
+            print(f">>> {scenario} budama hatası: budanan çift %{100 * err['pruned_pair_fraction']:.1f}, "
+                  f"SINR hatası ort. {err['sinr_abs_err_db_mean']:.3f} dB / p99 {err['sinr_abs_err_db_p99']:.3f} dB / "
+                  f"maks. {err['sinr_abs_err_db_max']:.3f} dB, hizmet eden uyuşmazlığı %{100 * err['serving_mismatch']:.2f}")
+
+        tables.append(pd.DataFrame({
+            "Time": time_col,
+            "Site": site_col,
+            "Scenario": scenario,
+            "UEs": ue_count.ravel(),
+            "SINR_P5_dB": np.round(values[..., 0].ravel(), 2),
+            "SINR_P50_dB": np.round(values[..., 1].ravel(), 2),
+            "SINR_P95_dB": np.round(values[..., 2].ravel(), 2)
+        }))
+
+        cov = layout.coverage_map(serving, sinr, sinr_threshold_db)
+        cov_df = pd.DataFrame(cov)
+        cov_df['serving_site'] = np.asarray(arrays['site_names'])[cov_df['serving_site']]
+        cov_file = f"coverage_map_{scenario.lower()}.csv"
+        with INSTRUMENTATION.stage("csv_write"):
+            cov_df.round(3).to_csv(cov_file, index=False)
+        print(f">>> {scenario} kapsama haritası '{cov_file}' dosyasına kaydedildi.")
+
+    results_df = pd.concat(tables, ignore_index=True)
+    with INSTRUMENTATION.stage("csv_write"):
+        results_df.to_csv("simulation_results_multi_ue.csv", index=False)
+    print(">>> Sonuçlar 'simulation_results_multi_ue.csv' dosyasına kaydedildi.")
+    return results_df
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="5G Baseline / Optimized karşılaştırmalı simülasyon")
+    parser.add_argument("--multi-ue", choices=["grid", "random"],
+                        help="Tek UE yerine çok kullanıcılı uzaysal örnekleme modu")
+    parser.add_argument("--spacing", type=float, default=25.0, help="Izgara aralığı (metre)")
+    parser.add_argument("--num-ues", type=int, default=None, help="Monte-Carlo UE sayısı")
+    parser.add_argument("--density", type=float, default=2000.0, help="Poisson UE yoğunluğu (UE/km^2)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--radius", type=float, default=INTERFERENCE_RADIUS_M,
+                        help="Girişim komşuluk yarıçapı (metre, çok kullanıcılı mod)")
+    parser.add_argument("--cutoff-dbm", type=float, default=INTERFERENCE_CUTOFF_DBM,
+                        help="Bu alınan gücün altındaki istasyonları girişimden çıkar (çok kullanıcılı mod)")
+    parser.add_argument("--profile", action="store_true",
+                        help="Aşama sürelerini ve PhysicsEngine çağrı sayılarını raporla")
+    parser.add_argument("--cprofile", action="store_true", help="cProfile ile fonksiyon profili (--profile içerir)")
+    parser.add_argument("--tracemalloc", action="store_true", help="tracemalloc ile bellek izleme (--profile içerir)")
+    parser.add_argument("--trace", default="simulation_trace.json", help="JSON iz dosyası (--profile ile)")
+    args = parser.parse_args(argv)
+
+    profiling = args.profile or args.cprofile or args.tracemalloc
+    if profiling:
+        INSTRUMENTATION.enable(cprofile=args.cprofile, trace_memory=args.tracemalloc)
+
+    status = 0
+    try:
+        if args.multi_ue:
+            run_multi_ue_simulation(args.multi_ue, args.spacing, args.num_ues, args.density, args.seed,
+                                    radius_m=args.radius, cutoff_dbm=args.cutoff_dbm)
+        else:
+            status = run_comparison_simulation()
+    except FileNotFoundError as e:
+        print(f"HATA: {e}")
+        return 1
+
+    if profiling:
+        INSTRUMENTATION.disable()
+        print("\n>>> Aşama dökümü:")
+        print(INSTRUMENTATION.report())
+        if INSTRUMENTATION.profile_text:
+            print(INSTRUMENTATION.profile_text)
+        print(f">>> JSON iz dosyası: {INSTRUMENTATION.write_trace(args.trace)}")
+    return status
+
 if __name__ == "__main__":
-    run_comparison_simulation()
+    sys.exit(main())
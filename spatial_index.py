@@ -0,0 +1,220 @@
+# spatial_index.py
+# Site yerleşimi dosyaları ve komşu istasyon sorguları için uzaysal indeks.
+#
+# Şehir ölçeğindeki yerleşimlerde bir UE'ye uzak istasyonların katkısı gürültü
+# tabanının altında kalır. SpatialIndex her UE için yalnızca belirli bir
+# yarıçap içindeki istasyonları döndürür; böylece girişim hesabı (U x N) yerine
+# (U x K) ölçeğinde yapılır (K: UE başına komşu sayısı, site sayısından bağımsız).
+import numpy as np
+
+LAYOUT_COLUMNS = ["site_id", "internal_id", "x_m", "y_m"]
+
+# Izgara anahtarı: hücre (cx, cy) -> cx * _KEY_STRIDE + cy
+_KEY_STRIDE = 2**32
+# Izgara sorgusunda bir parçada işlenen en fazla UE sayısı
+QUERY_CHUNK = 65536
+
+
+# --- YERLEŞİM DOSYALARI ---
+def read_site_layout(path):
+    """
+    Site yerleşimini okur (CSV: site_id, internal_id, x_m, y_m).
+    Dönüş: site_id indeksli, internal_id sırasına göre sıralı DataFrame
+    """
+    import pandas as pd
+
+    layout = pd.read_csv(path, dtype={"site_id": str})
+    missing = [c for c in LAYOUT_COLUMNS if c not in layout.columns]
+    if missing:
+        raise ValueError(f"Yerleşim dosyasında eksik sütunlar: {missing} ({path})")
+    if layout["site_id"].duplicated().any():
+        raise ValueError(f"Yerleşim dosyasında tekrar eden site_id var ({path})")
+    return layout[LAYOUT_COLUMNS].sort_values("internal_id").set_index("site_id")
+
+
+def write_site_layout(layout, path):
+    layout = layout.reset_index() if layout.index.name == "site_id" else layout
+    layout[LAYOUT_COLUMNS].to_csv(path, index=False)
+    return path
+
+
+def grid_layout(num_sites, inter_site_m=400.0, jitter=0.1, seed=0):
+    """
+    Kare ızgara üzerinde hafif kaydırılmış site yerleşimi (data_generator.py ile
+    aynı adlandırma: Site_1, Site_2, ...).
+    """
+    import pandas as pd
+
+    rng = np.random.default_rng(seed)
+    side = int(np.ceil(np.sqrt(num_sites)))
+    gx, gy = np.meshgrid(np.arange(side), np.arange(side))
+    pos = np.column_stack([gx.ravel(), gy.ravel()])[:num_sites] * inter_site_m
+    pos = pos + rng.uniform(-jitter, jitter, pos.shape) * inter_site_m
+    ids = np.arange(1, num_sites + 1)
+    return pd.DataFrame({
+        "site_id": [f"Site_{i}" for i in ids],
+        "internal_id": ids,
+        "x_m": np.round(pos[:, 0], 2),
+        "y_m": np.round(pos[:, 1], 2),
+    }).set_index("site_id")
+
+
+# --- GİRİŞİM YARIÇAPI ---
+def cutoff_radius(physics, tx_power_watt, cutoff_dbm, path_loss_exp=3.5):
+    """
+    tx_power_watt ile yayın yapan bir istasyonun alınan gücünün cutoff_dbm'e
+    düştüğü mesafe (metre). Log-distance modelinin tersidir:
+        Pt(dBm) - PL(d0) - 10 n log10(d) = cutoff  ->  d = 10^((Pt - PL(d0) - cutoff) / 10n)
+    """
+    tx_dbm = 10 * np.log10(tx_power_watt * 1000)
+    return float(10 ** ((tx_dbm - physics.pl_ref - cutoff_dbm) / (10 * path_loss_exp)))
+
+
+def neighbor_radius(physics, path_loss_exp, radius_m=None, cutoff_dbm=None, max_tx_power_watt=None):
+    """
+    Yapılandırılmış yarıçap ve/veya alınan güç eşiğinden etkin komşuluk
+    yarıçapı. İkisi de verilmezse None (tam model, budama yok).
+    """
+    radii = []
+    if radius_m is not None:
+        radii.append(float(radius_m))
+    if cutoff_dbm is not None:
+        radii.append(cutoff_radius(physics, max_tx_power_watt, cutoff_dbm, path_loss_exp))
+    return min(radii) if radii else None
+
+
+# --- UZAYSAL İNDEKS ---
+def _kdtree_class():
+    try:
+        from scipy.spatial import cKDTree
+    except ImportError:
+        return None
+    return cKDTree
+
+
+class SpatialIndex:
+    """
+    İstasyon konumları üzerinde yarıçap sorgusu.
+
+    backend="grid": düzgün ızgara (hash) indeksi; yalnızca NumPy gerektirir.
+        Hücre boyutu varsayılan olarak sorgu yarıçapıdır; her UE için komşu
+        hücrelerdeki istasyonlar aday olarak toplanıp mesafeyle süzülür.
+    backend="kdtree": scipy.spatial.cKDTree (scipy kuruluysa).
+    backend="auto": scipy varsa kdtree, yoksa grid.
+
+    Sorgu sonuçları CSR biçimindedir: (indptr, indices, distance); UE u'nun
+    komşuları indices[indptr[u]:indptr[u+1]] (site indeksine göre sıralı).
+    """
+
+    def __init__(self, points, cell_size_m=None, backend="auto"):
+        self.points = np.asarray(points, dtype=float)
+        self.cell_size_m = cell_size_m
+        if backend == "auto":
+            backend = "kdtree" if _kdtree_class() is not None else "grid"
+        if backend == "kdtree":
+            tree_cls = _kdtree_class()
+            if tree_cls is None:
+                raise ImportError("'kdtree' indeksi için scipy gereklidir (pip install scipy). "
+                                  "Alternatif olarak backend=\"grid\" kullanılabilir.")
+            self._tree = tree_cls(self.points)
+        elif backend != "grid":
+            raise ValueError(f"Bilinmeyen indeks türü: {backend}")
+        self.backend = backend
+        self._grid = None
+
+    def _grid_for(self, cell):
+        if self._grid is None or self._grid[0] != cell:
+            self._origin = self.points.min(axis=0)
+            cells = np.floor((self.points - self._origin) / cell).astype(np.int64)
+            keys = cells[:, 0] * _KEY_STRIDE + cells[:, 1]
+            order = np.argsort(keys, kind="stable")
+            self._grid = (cell, keys[order], order)
+        return self._grid
+
+    def _query_grid(self, queries, radius_m):
+        cell = self.cell_size_m or radius_m
+        _, keys, order = self._grid_for(cell)
+        reach = int(np.ceil(radius_m / cell))
+        offsets = range(-reach, reach + 1)
+
+        rows, cols, dists = [], [], []
+        for start in range(0, len(queries), QUERY_CHUNK):
+            q = queries[start:start + QUERY_CHUNK]
+            qcell = np.floor((q - self._origin) / cell).astype(np.int64)
+            for dx in offsets:
+                for dy in offsets:
+                    qkey = (qcell[:, 0] + dx) * _KEY_STRIDE + (qcell[:, 1] + dy)
+                    lo = np.searchsorted(keys, qkey, side="left")
+                    counts = np.searchsorted(keys, qkey, side="right") - lo
+                    total = counts.sum()
+                    if total == 0:
+                        continue
+                    row = np.repeat(np.arange(len(q)), counts)
+                    first = np.repeat(lo - np.cumsum(counts) + counts, counts)
+                    site = order[first + np.arange(total)]
+                    d = np.sqrt(((self.points[site] - q[row])**2).sum(axis=1))
+                    keep = d <= radius_m
+                    rows.append(row[keep] + start)
+                    cols.append(site[keep])
+                    dists.append(d[keep])
+        if not rows:
+            return np.zeros(0, dtype=np.int64), np.zeros(0, dtype=np.int64), np.zeros(0)
+        return np.concatenate(rows), np.concatenate(cols), np.concatenate(dists)
+
+    def _query_kdtree(self, queries, radius_m):
+        tree_cls = _kdtree_class()
+        pairs = tree_cls(queries).sparse_distance_matrix(self._tree, radius_m, output_type="ndarray")
+        return pairs["i"].astype(np.int64), pairs["j"].astype(np.int64), pairs["v"]
+
+    def query_radius(self, queries, radius_m):
+        """
+        Her sorgu noktası için radius_m içindeki istasyonlar.
+        Dönüş: (indptr (Q+1,), indices, distance) - CSR
+        """
+        queries = np.asarray(queries, dtype=float)
+        if self.backend == "kdtree":
+            rows, cols, dists = self._query_kdtree(queries, radius_m)
+        else:
+            rows, cols, dists = self._query_grid(queries, radius_m)
+        order = np.lexsort((cols, rows))
+        indptr = np.zeros(len(queries) + 1, dtype=np.int64)
+        np.cumsum(np.bincount(rows, minlength=len(queries)), out=indptr[1:])
+        return indptr, cols[order], dists[order]
+
+    def nearest(self, queries, chunk=4096):
+        """Her sorgu noktasına en yakın istasyon. Dönüş: (index, distance)"""
+        queries = np.asarray(queries, dtype=float)
+        if self.backend == "kdtree":
+            dist, idx = self._tree.query(queries)
+            return idx.astype(np.int64), dist
+        idx = np.empty(len(queries), dtype=np.int64)
+        dist = np.empty(len(queries))
+        for start in range(0, len(queries), chunk):
+            q = queries[start:start + chunk]
+            d2 = ((q[:, None, :] - self.points[None, :, :])**2).sum(axis=-1)
+            idx[start:start + chunk] = d2.argmin(axis=1)
+            dist[start:start + chunk] = np.sqrt(d2.min(axis=1))
+        return idx, dist
+
+    def neighbor_table(self, queries, radius_m):
+        """
+        Yarıçap sorgusunun sabit genişlikli (Q x K) tablo hâli; K en kalabalık
+        komşuluktur, boş hücreler -1. Yarıçap içinde hiç istasyon olmayan
+        noktalara en yakın istasyon atanır (her UE'nin bir hizmet edeni olur).
+        Dönüş: (neighbors (Q x K) int, distance (Q x K), boş hücrelerde inf)
+        """
+        queries = np.asarray(queries, dtype=float)
+        indptr, indices, dists = self.query_radius(queries, radius_m)
+        counts = np.diff(indptr)
+        K = max(1, int(counts.max()) if counts.size else 1)
+        neighbors = np.full((len(queries), K), -1, dtype=np.int64)
+        distance = np.full((len(queries), K), np.inf)
+        rows = np.repeat(np.arange(len(queries)), counts)
+        slots = np.arange(len(indices)) - np.repeat(indptr[:-1], counts)
+        neighbors[rows, slots] = indices
+        distance[rows, slots] = dists
+
+        empty = np.flatnonzero(counts == 0)
+        if empty.size:
+            neighbors[empty, 0], distance[empty, 0] = self.nearest(queries[empty])
+        return neighbors, distance
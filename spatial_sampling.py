@@ -0,0 +1,257 @@
+# spatial_sampling.py
+import numpy as np
+
+from gain_cache import layout_tables
+
+# Bir zaman parçasında (T x N x U) ara dizilerin en fazla eleman sayısı
+MAX_CHUNK_ELEMENTS = 20_000_000
+
+
+def _layout_bounds(site_pos, margin_m):
+    site_pos = np.asarray(site_pos, dtype=float)
+    lo = site_pos.min(axis=0) - margin_m
+    hi = site_pos.max(axis=0) + margin_m
+    return lo, hi
+
+
+def grid_ue_positions(site_pos, spacing_m=25.0, margin_m=150.0):
+    """
+    Site yerleşimini (kenarlarda margin_m pay bırakarak) kapsayan düzenli bir
+    ızgara üzerine UE yerleştirir.
+    Dönüş: (ue_pos (U x 2), grid_shape (ny, nx))
+    """
+    lo, hi = _layout_bounds(site_pos, margin_m)
+    xs = np.arange(lo[0], hi[0] + spacing_m / 2, spacing_m)
+    ys = np.arange(lo[1], hi[1] + spacing_m / 2, spacing_m)
+    gx, gy = np.meshgrid(xs, ys)
+    ue_pos = np.column_stack([gx.ravel(), gy.ravel()])
+    return ue_pos, gx.shape
+
+
+def random_ue_positions(site_pos, num_ues=None, density_per_km2=2000.0, margin_m=150.0, seed=None):
+    """
+    Monte-Carlo UE yerleşimi.
+    num_ues verilirse o kadar UE düzgün dağılımla yerleştirilir; verilmezse UE
+    sayısı alan * yoğunluk ortalamalı Poisson dağılımından çekilir (homojen
+    Poisson nokta süreci).
+    """
+    rng = np.random.default_rng(seed)
+    lo, hi = _layout_bounds(site_pos, margin_m)
+    if num_ues is None:
+        area_km2 = np.prod(hi - lo) / 1e6
+        num_ues = rng.poisson(density_per_km2 * area_km2)
+    return rng.uniform(lo, hi, size=(int(num_ues), 2))
+
+
+class UELayout:
+    """
+    Sabit site ve UE konumları için önceden hesaplanmış kazanç matrisleri.
+    Site konumları zamanla değişmediğinden bu matrisler tüm zaman adımları ve
+    senaryolar boyunca yeniden kullanılır; gain_cache.layout_tables ile aynı
+    süreçteki diğer yerleşimlerle (ör. tarama) ve persist_gain=True ise
+    diskteki önceki çalışmalarla da paylaşılır.
+
+    Her UE, her zaman adımında en güçlü sinyali aldığı istasyona bağlanır
+    (strongest server).
+
+    radius_m verilirse her UE için yalnızca bu yarıçap içindeki istasyonlar
+    (SpatialIndex ile) tutulur: distance/gain yerine (U x K) neighbors,
+    neighbor_distance ve neighbor_gain tabloları kullanılır. Budamanın SINR
+    üzerindeki etkisi pruning_error ile ölçülür.
+
+    lut_resolution_m verilirse kazanç, bu adımla nicemlenmiş mesafe tablosundan
+    okunur (bkz. gain_cache.DistanceGainTable).
+    """
+
+    def __init__(self, interference, site_pos, ue_pos, grid_shape=None, radius_m=None,
+                 index_backend="auto", lut_resolution_m=None, persist_gain=False):
+        self.interference = interference
+        self.site_pos = np.asarray(site_pos, dtype=float)
+        self.ue_pos = np.asarray(ue_pos, dtype=float)
+        self.grid_shape = grid_shape
+        self.radius_m = radius_m
+
+        tables = layout_tables(interference, self.site_pos, self.ue_pos, radius_m, lut_resolution_m,
+                               index_backend, persist=persist_gain)
+        if radius_m is None:
+            self.gain = tables["gain"]                                       # (N x U)
+        else:
+            self.neighbors = tables["neighbors"]                             # (U x K)
+            self.neighbor_distance = tables["neighbor_distance"]
+            self.neighbor_gain = tables["neighbor_gain"]                     # boşlarda 0
+
+    @property
+    def distance(self):
+        """(N x U) istasyon -> UE mesafesi (tam model; gerektiğinde hesaplanır)."""
+        diff = self.site_pos[:, None, :] - self.ue_pos[None, :, :]
+        return np.maximum(1.0, np.sqrt((diff**2).sum(axis=-1)))
+
+    @property
+    def num_sites(self):
+        return self.site_pos.shape[0]
+
+    @property
+    def num_ues(self):
+        return self.ue_pos.shape[0]
+
+    @property
+    def sparse(self):
+        return self.radius_m is not None
+
+    def _chunk_len(self):
+        per_step = max(1, self.num_sites * self.num_sites * self.num_ues)
+        return max(1, MAX_CHUNK_ELEMENTS // per_step)
+
+    def evaluate(self, tx_power, center_freq, bandwidth):
+        """
+        Tüm zaman adımları ve UE'ler için hizmet eden istasyon ve SINR.
+        tx_power, center_freq, bandwidth: (T x N). Kapalı istasyonlar için güç 0
+        verilmelidir.
+        Dönüş: (serving (T x U) int, sinr_db (T x U) float32)
+        """
+        if self.sparse:
+            return self._evaluate_neighbors(self.neighbors, self.neighbor_gain,
+                                            tx_power, center_freq, bandwidth)
+        physics = self.interference.physics
+        tx_power = np.asarray(tx_power, dtype=float)
+        T = tx_power.shape[0]
+        serving = np.empty((T, self.num_ues), dtype=np.int32)
+        sinr = np.empty((T, self.num_ues), dtype=np.float32)
+
+        step = self._chunk_len()
+        for start in range(0, T, step):
+            sl = slice(start, start + step)
+            rx_watt = self.interference.received_power_matrix(tx_power[sl], self.gain)
+            best = rx_watt.argmax(axis=1)
+            rx_best = np.take_along_axis(rx_watt, best[:, None, :], axis=1)[:, 0, :]
+
+            int_watt = self.interference.interference_for_serving(
+                tx_power[sl], center_freq[sl], bandwidth[sl], self.gain, best)
+            bw_hz = np.take_along_axis(np.asarray(bandwidth[sl], dtype=float), best, axis=1) * 1e6
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rx_dbm = 10 * np.log10(rx_best * 1000)
+                sinr[sl] = physics.sinr_batch(rx_dbm, int_watt, bw_hz)
+            serving[sl] = best
+        return serving, sinr
+
+    def _evaluate_neighbors(self, neighbors, neighbor_gain, tx_power, center_freq, bandwidth):
+        """evaluate'in komşu tablosu (U x K) üzerinden çalışan seyrek sürümü."""
+        physics = self.interference.physics
+        tx_power = np.asarray(tx_power, dtype=float)
+        T, U = tx_power.shape[0], neighbors.shape[0]
+        serving = np.empty((T, U), dtype=np.int32)
+        sinr = np.empty((T, U), dtype=np.float32)
+        rows = np.arange(U)
+
+        # Parça başına (T x U x K) boyutlu birkaç ara dizi oluşur
+        step = max(1, MAX_CHUNK_ELEMENTS // max(1, neighbors.size * 4))
+        for start in range(0, T, step):
+            sl = slice(start, start + step)
+            rx_watt = self.interference.neighbor_received_power(tx_power[sl], neighbors, neighbor_gain)
+            best_k = rx_watt.argmax(axis=-1)
+            rx_best = np.take_along_axis(rx_watt, best_k[..., None], axis=-1)[..., 0]
+            best = neighbors[rows, best_k]
+
+            int_watt = self.interference.neighbor_interference(
+                center_freq[sl], bandwidth[sl], neighbors, rx_watt, best_k)
+            bw_hz = np.take_along_axis(np.asarray(bandwidth[sl], dtype=float), best, axis=1) * 1e6
+
+            with np.errstate(divide='ignore', invalid='ignore'):
+                rx_dbm = 10 * np.log10(rx_best * 1000)
+                sinr[sl] = physics.sinr_batch(rx_dbm, int_watt, bw_hz)
+            serving[sl] = best
+        return serving, sinr
+
+    def pruning_error(self, tx_power, center_freq, bandwidth, sample_ues=500, max_steps=24, seed=0):
+        """
+        Komşuluk budamasının hatası: örneklenen UE'ler ve zaman adımları için
+        seyrek sonuç, tüm istasyonları içeren referansla karşılaştırılır.
+        Dönüş: sözlük (ortalama/maks. komşu sayısı, budanan çift oranı,
+        SINR mutlak hatası ortalama/p99/maks (dB), hizmet eden istasyon uyuşmazlığı)
+        """
+        if not self.sparse:
+            raise ValueError("pruning_error yalnızca radius_m ile kurulan yerleşimlerde kullanılır")
+        rng = np.random.default_rng(seed)
+        ues = np.sort(rng.choice(self.num_ues, min(sample_ues, self.num_ues), replace=False))
+        T = np.asarray(tx_power).shape[0]
+        steps = np.unique(np.linspace(0, T - 1, min(max_steps, T)).astype(int))
+        args = [np.asarray(x, dtype=float)[steps] for x in (tx_power, center_freq, bandwidth)]
+
+        full_nbr = np.broadcast_to(np.arange(self.num_sites), (len(ues), self.num_sites))
+        diff = self.ue_pos[ues, None, :] - self.site_pos[None, :, :]
+        full_gain = self.interference.gain_matrix(np.maximum(1.0, np.sqrt((diff**2).sum(axis=-1))))
+        ref_serving, ref_sinr = self._evaluate_neighbors(full_nbr, full_gain, *args)
+        serving, sinr = self._evaluate_neighbors(self.neighbors[ues], self.neighbor_gain[ues], *args)
+
+        err = np.abs(sinr.astype(float) - ref_sinr)
+        err = err[np.isfinite(err)]
+        counts = (self.neighbors >= 0).sum(axis=1)
+        return {
+            "radius_m": self.radius_m,
+            "mean_neighbors": float(counts.mean()),
+            "max_neighbors": int(counts.max()),
+            "pruned_pair_fraction": float(1 - counts.mean() / self.num_sites),
+            "sinr_abs_err_db_mean": float(err.mean()) if err.size else 0.0,
+            "sinr_abs_err_db_p99": float(np.percentile(err, 99)) if err.size else 0.0,
+            "sinr_abs_err_db_max": float(err.max()) if err.size else 0.0,
+            "serving_mismatch": float((serving != ref_serving).mean()),
+        }
+
+    def site_percentiles(self, serving, sinr, percentiles=(5, 50, 95)):
+        """
+        Her zaman adımı ve site için, o siteye bağlı UE'lerin SINR yüzdelikleri.
+        Dönüş: (values (T x N x len(percentiles)), ue_count (T x N))
+        Hiç UE bağlanmayan site/saatlerde değerler NaN'dır.
+
+        UE'ler (saat, site) grubuna göre bir kez sıralanır; yüzdelikler her
+        grubun sıralı diliminden np.percentile ile aynı doğrusal aradeğerlemeyle
+        okunur. Maliyet site sayısından bağımsız olarak O(T*U log(T*U)).
+        """
+        T, N = serving.shape[0], self.num_sites
+        group = (np.arange(T)[:, None] * N + serving).ravel()
+        ue_count = np.bincount(group, minlength=T * N).astype(np.int32).reshape(T, N)
+
+        values = np.full((T * N, len(percentiles)), np.nan)
+        sinr = np.asarray(sinr, dtype=float).ravel()
+        valid = ~np.isnan(sinr)
+        group, sinr = group[valid], sinr[valid]
+        order = np.lexsort((sinr, group))
+        group, sinr = group[order], sinr[order]
+        count = np.bincount(group, minlength=T * N)
+        start = np.cumsum(count) - count
+
+        filled = np.flatnonzero(count)
+        c, o = count[filled], start[filled]
+        for k, p in enumerate(percentiles):
+            pos = p / 100 * (c - 1)
+            lo = np.floor(pos).astype(np.int64)
+            hi = np.minimum(lo + 1, c - 1)
+            frac = pos - lo
+            values[filled, k] = sinr[o + lo] + (sinr[o + hi] - sinr[o + lo]) * frac
+        return values.reshape(T, N, len(percentiles)), ue_count
+
+    def coverage_map(self, serving, sinr, sinr_threshold_db=0.0):
+        """
+        UE başına zaman boyunca ortalama SINR, kapsama olasılığı
+        (SINR >= eşik olan saat oranı) ve en sık hizmet eden istasyon
+        (eşitlikte küçük site indeksi).
+        Izgara modunda sonuçlar (ny x nx) şekline getirilebilir (grid_shape).
+        """
+        mean_sinr = sinr.mean(axis=0)
+        coverage_prob = (sinr >= sinr_threshold_db).mean(axis=0)
+
+        # (UE, site) çiftleri yalnızca gerçekleşenler üzerinden sayılır (N x U tablo yok)
+        pairs, counts = np.unique(np.arange(self.num_ues, dtype=np.int64) * self.num_sites + serving,
+                                  return_counts=True)
+        ue, site = np.divmod(pairs, self.num_sites)
+        order = np.lexsort((-counts, ue))  # UE içinde en sık önce; eşitlikte site sırası korunur
+        first = order[np.r_[True, ue[order][1:] != ue[order][:-1]]]
+        dominant = site[first]
+        return {
+            'x': self.ue_pos[:, 0],
+            'y': self.ue_pos[:, 1],
+            'mean_sinr_db': mean_sinr,
+            'coverage_prob': coverage_prob,
+            'serving_site': dominant,
+        }
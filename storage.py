@@ -0,0 +1,334 @@
+# storage.py
+# Aşamalar arası (veri üretimi -> tahmin -> simülasyon -> grafik) veri
+# alışverişi için tipli, sütunsal depolama katmanı.
+#
+# Desteklenen biçimler:
+#   "npy"     : Her sütun ayrı bir .npy dosyası (<ad>.npcol/ dizini). Okuma
+#               bellek eşlemelidir (np.load(mmap_mode="r")), kopya yapılmaz.
+#   "parquet" : pyarrow gerektirir (isteğe bağlı bağımlılık)
+#   "feather" : pyarrow gerektirir (isteğe bağlı bağımlılık)
+#   "csv"     : Dışa aktarım ve eski dosyalarla uyumluluk için
+import glob
+import json
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from config import STORAGE_FORMAT, EXPORT_CSV
+
+FORMAT_EXTENSIONS = {
+    "npy": ".npcol",
+    "parquet": ".parquet",
+    "feather": ".feather",
+    "csv": ".csv",
+}
+
+# Kategorik olarak saklanacak metin sütunları
+CATEGORICAL_COLUMNS = ("site_id", "Site", "Scenario")
+# Zaman sütunları
+TIME_COLUMNS = ("datetime", "Time")
+
+_META_FILE = "meta.json"
+
+
+def _require_pyarrow(fmt):
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        raise ImportError(f"'{fmt}' biçimi için pyarrow gereklidir (pip install pyarrow). "
+                          f"Alternatif olarak config.STORAGE_FORMAT = \"npy\" kullanılabilir.")
+
+
+def _format_of(path):
+    for fmt, ext in FORMAT_EXTENSIONS.items():
+        if path.endswith(ext):
+            return fmt
+    return None
+
+
+def resolve_path(name, fmt=None):
+    """
+    Uzantısız veri adını mevcut bir dosyaya çözer.
+    Arama sırası: istenen biçim, config.STORAGE_FORMAT, diğer sütunsal
+    biçimler, en son CSV. Hiçbiri yoksa FileNotFoundError.
+    """
+    if _format_of(name):
+        if not os.path.exists(name):
+            raise FileNotFoundError(name)
+        return name
+
+    order = [fmt, STORAGE_FORMAT, "npy", "parquet", "feather", "csv"]
+    seen = []
+    for candidate in order:
+        if candidate is None or candidate in seen:
+            continue
+        seen.append(candidate)
+        path = name + FORMAT_EXTENSIONS[candidate]
+        if os.path.exists(path):
+            return path
+    raise FileNotFoundError(f"'{name}' için veri dosyası bulunamadı ({', '.join(FORMAT_EXTENSIONS.values())})")
+
+
+def _glob_parts(name, fmt):
+    return sorted(glob.glob(glob.escape(name) + ".part-*" + FORMAT_EXTENSIONS[fmt]))
+
+
+def list_parts(name, fmt=None):
+    """
+    Parçalı (sharded) veri setinin parça dosyaları: <name>.part-00000.<uzantı>, ...
+    Parçalar tek bir biçimden döner: fmt verilmişse o biçim, verilmemişse
+    resolve_path ile aynı sırada parçası bulunan ilk biçim. Farklı biçimlerde
+    kalmış eski parçalar böylece birbirine karışmaz.
+    """
+    order = [fmt] if fmt is not None else [STORAGE_FORMAT, "npy", "parquet", "feather", "csv"]
+    for candidate in order:
+        parts = _glob_parts(name, candidate)
+        if parts:
+            return parts
+    return []
+
+
+def remove_table(path):
+    """Tek bir tablo dosyasını (veya .npcol dizinini) siler."""
+    if os.path.isdir(path):
+        shutil.rmtree(path)
+    elif os.path.exists(path):
+        os.remove(path)
+
+
+def remove_single(name):
+    """
+    Uzantısız adın tek tablo dosyalarını tüm biçimlerde siler. read_table tek
+    tabloyu parçalara tercih ettiğinden, parçalı yeni bir çıktı yazılırken
+    eski tek tablo kaldırılmalıdır.
+    """
+    for ext in FORMAT_EXTENSIONS.values():
+        remove_table(name + ext)
+
+
+def remove_parts(name):
+    """Parçalı veri setinin tüm biçimlerdeki parça dosyalarını siler."""
+    for fmt in FORMAT_EXTENSIONS:
+        for path in _glob_parts(name, fmt):
+            remove_table(path)
+
+
+def normalize_types(df):
+    """
+    Sütun tiplerini depolama için sıkılaştırır:
+    zaman sütunları datetime64, site/senaryo sütunları category,
+    ondalıklı metrikler float32, tam sayılar int32.
+    """
+    df = df.copy()
+    for col in df.columns:
+        series = df[col]
+        if col in TIME_COLUMNS:
+            df[col] = pd.to_datetime(series)
+        elif col in CATEGORICAL_COLUMNS:
+            df[col] = series.astype("category")
+        elif pd.api.types.is_float_dtype(series):
+            df[col] = series.astype(np.float32)
+        elif pd.api.types.is_integer_dtype(series):
+            if series.empty or (series.min() >= np.iinfo(np.int32).min and series.max() <= np.iinfo(np.int32).max):
+                df[col] = series.astype(np.int32)
+    return df
+
+
+# --- NPY (bellek eşlemeli) biçim ---
+def _write_npcol(df, path):
+    os.makedirs(path, exist_ok=True)
+    meta = {"nrows": len(df), "columns": [], "sorted_by": None}
+    for i, col in enumerate(df.columns):
+        series = df[col]
+        file_name = f"c{i:03d}.npy"
+        entry = {"name": col, "file": file_name}
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            entry["kind"] = "category"
+            entry["categories"] = [str(c) for c in series.cat.categories]
+            values = series.cat.codes.to_numpy(dtype=np.int32)
+        else:
+            entry["kind"] = "datetime" if pd.api.types.is_datetime64_any_dtype(series) else "numeric"
+            values = series.to_numpy()
+        np.save(os.path.join(path, file_name), values, allow_pickle=False)
+        meta["columns"].append(entry)
+
+        if entry["kind"] == "datetime" and meta["sorted_by"] is None and series.is_monotonic_increasing:
+            meta["sorted_by"] = col
+
+    with open(os.path.join(path, _META_FILE), "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+
+
+def _read_npcol_meta(path):
+    with open(os.path.join(path, _META_FILE), encoding="utf-8") as f:
+        return json.load(f)
+
+
+def read_columns(name, columns=None, time_range=None, time_column="datetime"):
+    """
+    "npy" biçimindeki tabloyu sütun adı -> NumPy dizisi sözlüğü olarak okur.
+    Diziler bellek eşlemelidir (kopyasız); kategorik sütunlar int32 kodları
+    olarak döner, kategoriler '<sütun>__categories' anahtarında verilir.
+
+    time_range=(başlangıç, bitiş) verilirse yalnızca [başlangıç, bitiş)
+    aralığındaki satırlar döner. Tablo zamana göre sıralıysa bu bir dilimdir
+    (kopyasız); değilse maske ile seçilir.
+    """
+    path = resolve_path(name, "npy")
+    if _format_of(path) != "npy":
+        raise ValueError(f"read_columns yalnızca 'npy' biçimini destekler: {path}")
+    meta = _read_npcol_meta(path)
+    entries = {e["name"]: e for e in meta["columns"]}
+    wanted = list(entries) if columns is None else list(columns)
+
+    rows = slice(None)
+    if time_range is not None:
+        times = np.load(os.path.join(path, entries[time_column]["file"]), mmap_mode="r")
+        start, end = (np.datetime64(pd.Timestamp(t)) if t is not None else None for t in time_range)
+        if meta["sorted_by"] == time_column:
+            lo = 0 if start is None else np.searchsorted(times, start, side="left")
+            hi = len(times) if end is None else np.searchsorted(times, end, side="left")
+            rows = slice(lo, hi)
+        else:
+            mask = np.ones(len(times), dtype=bool)
+            if start is not None:
+                mask &= times >= start
+            if end is not None:
+                mask &= times < end
+            rows = mask
+
+    out = {}
+    for col in wanted:
+        entry = entries[col]
+        values = np.load(os.path.join(path, entry["file"]), mmap_mode="r")
+        out[col] = values[rows]
+        if entry["kind"] == "category":
+            out[col + "__categories"] = entry["categories"]
+    return out
+
+
+def _read_npcol(path, columns, time_range, time_column):
+    data = read_columns(path, columns, time_range, time_column)
+    frame = {}
+    for col, values in data.items():
+        if col.endswith("__categories"):
+            continue
+        categories = data.get(col + "__categories")
+        if categories is not None:
+            frame[col] = pd.Categorical.from_codes(np.asarray(values), categories=categories)
+        else:
+            frame[col] = values
+    return pd.DataFrame(frame, copy=False)
+
+
+def _filter_time(df, time_range, time_column):
+    if time_range is None:
+        return df
+    start, end = time_range
+    mask = np.ones(len(df), dtype=bool)
+    if start is not None:
+        mask &= df[time_column] >= pd.Timestamp(start)
+    if end is not None:
+        mask &= df[time_column] < pd.Timestamp(end)
+    return df[mask].reset_index(drop=True)
+
+
+def export_csv(df, path):
+    """
+    CSV dışa aktarımı. float32 sütunlar en kısa ondalık gösterimleriyle
+    yazılır (örn. 30.36 yerine 30.360001 yazılmaz).
+    """
+    out = df.copy()
+    for col in out.columns:
+        if out[col].dtype == np.float32:
+            values = out[col].to_numpy()
+            out[col] = np.where(np.isnan(values), "", values.astype(str))
+    out.to_csv(path, index=False)
+
+
+# --- GENEL API ---
+def write_table(df, name, fmt=None, csv_export=None):
+    """
+    DataFrame'i tipleri sıkılaştırarak seçilen biçimde yazar.
+    name uzantısız verilir (örn. "lstm_predictions"); uzantı biçime göre eklenir.
+    csv_export=True ise ayrıca <name>.csv dışa aktarılır.
+    Dönüş: yazılan ana dosyanın yolu
+    """
+    fmt = fmt or STORAGE_FORMAT
+    csv_export = EXPORT_CSV if csv_export is None else csv_export
+    path = name + FORMAT_EXTENSIONS[fmt]
+
+    if fmt == "csv":
+        export_csv(df, path)
+        return path
+
+    typed = normalize_types(df)
+    if fmt == "npy":
+        _write_npcol(typed, path)
+    elif fmt == "parquet":
+        _require_pyarrow(fmt)
+        typed.to_parquet(path, index=False)
+    elif fmt == "feather":
+        _require_pyarrow(fmt)
+        typed.reset_index(drop=True).to_feather(path)
+    else:
+        raise ValueError(f"Bilinmeyen depolama biçimi: {fmt}")
+
+    if csv_export:
+        export_csv(df, name + FORMAT_EXTENSIONS["csv"])
+    return path
+
+
+def read_table(name, columns=None, time_range=None, time_column="datetime", fmt=None):
+    """
+    Tabloyu okur. name uzantısız verilirse mevcut dosya resolve_path ile
+    bulunur (sütunsal biçimler CSV'ye tercih edilir).
+
+    columns: yalnızca okunacak sütunlar (projeksiyon)
+    time_range: (başlangıç, bitiş) yarı açık zaman aralığı; None uçlar sınırsız
+    Tek dosya yoksa ve parçalı veri seti varsa (bkz. list_parts) parçalar
+    sırayla okunup birleştirilir.
+    """
+    try:
+        path = resolve_path(name, fmt)
+    except FileNotFoundError:
+        parts = list_parts(name)
+        if not parts:
+            raise
+        return pd.concat([read_table(p, columns, time_range, time_column) for p in parts],
+                         ignore_index=True)
+    fmt = _format_of(path)
+    if columns is not None and time_range is not None and time_column not in columns:
+        read_cols = list(columns) + [time_column]
+    else:
+        read_cols = columns
+
+    if fmt == "npy":
+        df = _read_npcol(path, read_cols, time_range, time_column)
+        time_range = None  # npy okuyucusu aralığı zaten uyguladı
+    elif fmt == "parquet":
+        _require_pyarrow(fmt)
+        filters = None
+        if time_range is not None:
+            filters = []
+            if time_range[0] is not None:
+                filters.append((time_column, ">=", pd.Timestamp(time_range[0])))
+            if time_range[1] is not None:
+                filters.append((time_column, "<", pd.Timestamp(time_range[1])))
+            filters = filters or None
+        df = pd.read_parquet(path, columns=read_cols, filters=filters)
+        time_range = None
+    elif fmt == "feather":
+        _require_pyarrow(fmt)
+        df = pd.read_feather(path, columns=read_cols)
+    else:
+        header = pd.read_csv(path, nrows=0).columns
+        parse_dates = [c for c in TIME_COLUMNS if c in header and (read_cols is None or c in read_cols)]
+        df = pd.read_csv(path, usecols=read_cols, parse_dates=parse_dates)
+
+    df = _filter_time(df, time_range, time_column)
+    if columns is not None:
+        df = df[list(columns)]
+    return df
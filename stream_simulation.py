@@ -0,0 +1,280 @@
+# stream_simulation.py
+# Artımlı (streaming/online) simülasyon modu.
+# Simülatör saatlik site kayıtlarını bir iteratörden tüketir, yalnızca gerekli
+# durumu (histerezis geçmişi) tutar ve sonuç satırlarını üretildikçe yazar.
+# Simülatörün bellek kullanımı iz (trace) uzunluğundan bağımsızdır. CSV
+# kaynağında bu yalnızca --time-ordered ile geçerlidir (dosya parça parça
+# okunur); aksi halde dosya bir kez tamamen okunup zamana göre sıralanır.
+# lstm_train.py tahminleri zaman sırasında yazar.
+import argparse
+import csv
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from config import BASELINE_CONFIG, OPTIMIZED_CONFIG, PATH_LOSS_EXPONENT, CARRIER_FREQ_MHZ
+from physics_engine import PhysicsEngine
+from interference_engine import InterferenceEngine
+import simulation_runner
+
+RECORD_FIELDS = ("datetime", "site_id", "pred_users", "est_snr_db")
+
+
+# --- KAYNAK ADAPTÖRLERİ (SOURCE ADAPTERS) ---
+def csv_record_source(path="lstm_predictions.csv", chunksize=10000, time_ordered=False):
+    """
+    Tahmin CSV dosyasını kayıt kayıt okur.
+    time_ordered=True ise dosya parça parça (chunksize satır) okunur ve bellek
+    sabit kalır; dosyanın zaman sırasına göre dizili olması gerekir
+    (lstm_train.py çıktısı öyledir). Varsayılan olarak sıra varsayılmaz: dosya
+    bir kez tamamen okunup zamana göre sıralanır (bellek dosya boyutuyla artar).
+    """
+    if time_ordered:
+        for chunk in pd.read_csv(path, parse_dates=["datetime"], chunksize=chunksize):
+            yield from _iter_frame(chunk)
+    else:
+        df = pd.read_csv(path, parse_dates=["datetime"])
+        yield from _iter_frame(df.sort_values(["datetime", "site_id"], kind="stable"))
+
+
+def _iter_frame(df):
+    columns = [df[name].to_numpy() for name in RECORD_FIELDS]
+    for values in zip(*columns):
+        yield dict(zip(RECORD_FIELDS, values))
+
+
+def replay_source(records, seconds_per_hour=0.0):
+    """
+    Yerel canlı tekrar (replay) kaynağı: kayıtları, her yeni zaman damgasında
+    seconds_per_hour kadar bekleyerek canlı bir akış gibi iletir.
+    """
+    last_ts = None
+    for record in records:
+        if last_ts is not None and record["datetime"] != last_ts and seconds_per_hour > 0:
+            time.sleep(seconds_per_hour)
+        last_ts = record["datetime"]
+        yield record
+
+
+def group_by_timestep(records):
+    """
+    Zaman sırasına göre gelen kayıtları (datetime, [kayıtlar]) gruplarına böler.
+    Yalnızca içinde bulunulan saatin kayıtları bellekte tutulur.
+    """
+    current_ts, batch = None, []
+    for record in records:
+        if batch and record["datetime"] != current_ts:
+            if record["datetime"] < current_ts:
+                raise ValueError(f"Kayıtlar zaman sırasında değil: {pd.Timestamp(record['datetime'])} < {pd.Timestamp(current_ts)} "
+                                 "(site sırasına göre dizili girdiler için --time-ordered kullanmayın)")
+            yield current_ts, batch
+            batch = []
+        current_ts = record["datetime"]
+        batch.append(record)
+    if batch:
+        yield current_ts, batch
+
+
+# --- ÇIKTI (SINK) ---
+class CsvResultSink:
+    """
+    Sonuç satırlarını üretildikçe CSV dosyasına ekler (başlık bir kez yazılır).
+
+    live=False (varsayılan): satırlar hedefle aynı klasördeki geçici dosyaya
+    yazılır; dosya yalnızca akış hatasız biterse hedef adına taşınır
+    (os.replace). Hata durumunda geçici dosya silinir ve mevcut çıktı
+    dosyası değişmez.
+    live=True: canlı kaynaklar için satırlar doğrudan hedef dosyaya yazılır
+    ve her flush_every satırda diske aktarılır; sonuçlar akış sürerken
+    okunabilir. Akış hatayla kesilirse o ana kadarki satırlar dosyada kalır.
+    """
+
+    def __init__(self, path="simulation_results_comparison.csv", flush_every=24, live=False):
+        self.path = path
+        self.flush_every = flush_every
+        if live:
+            self._tmp = None
+            self._file = open(path, "w", newline="", encoding="utf-8")
+        else:
+            directory = os.path.dirname(os.path.abspath(path))
+            fd, self._tmp = tempfile.mkstemp(dir=directory, suffix=".tmp")
+            self._file = os.fdopen(fd, "w", newline="", encoding="utf-8")
+        self._writer = None
+        self._count = 0
+
+    def write(self, row):
+        if self._writer is None:
+            self._writer = csv.DictWriter(self._file, fieldnames=list(row), lineterminator="\n")
+            self._writer.writeheader()
+        self._writer.writerow(row)
+        self._count += 1
+        if self._count % self.flush_every == 0:
+            self._file.flush()
+            if self._tmp is None:
+                os.fsync(self._file.fileno())
+
+    def close(self, commit=True):
+        """
+        commit=True: dosyayı hedef adına taşır; False: geçici dosyayı siler.
+        live modunda dosya yerinde kapatılır.
+        """
+        self._file.close()
+        if self._tmp is None:
+            return
+        if commit:
+            os.replace(self._tmp, self.path)
+        elif os.path.exists(self._tmp):
+            os.remove(self._tmp)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close(commit=exc_type is None)
+
+
+# --- SİMÜLATÖR ---
+class StreamingSimulator:
+    """
+    Saatlik kayıtları tek tek işleyen karşılaştırmalı simülatör.
+    Site yerleşimi, kazançlar ve girişim komşuları (toplu simülasyonla aynı
+    küme) bir kez hesaplanır; adımlar arasında taşınan tek durum Optimized
+    senaryonun histerezis durumudur.
+    """
+
+    def __init__(self, baseline_config=BASELINE_CONFIG, optimized_config=OPTIMIZED_CONFIG,
+                 path_loss_exp=PATH_LOSS_EXPONENT, target_site="Site_1"):
+        self.baseline_config = baseline_config
+        self.optimized_config = optimized_config
+        self.path_loss_exp = path_loss_exp
+
+        layout = simulation_runner.load_site_layout()
+        names = list(layout.index)
+        self.site_names = names
+        self.site_index = {name: i for i, name in enumerate(names)}
+        self.ids = layout['internal_id'].to_numpy()
+        self.pos = layout[['x_m', 'y_m']].to_numpy(dtype=float)
+
+        physics = PhysicsEngine(CARRIER_FREQ_MHZ)
+        self.interference = InterferenceEngine(physics, path_loss_exp)
+        self.target_idx = self.site_index[target_site]
+        self.gain, self.target_gain = simulation_runner.target_ue_gain(
+            self.interference, self.pos, self.target_idx)
+        # Girişime dahil edilen komşular (simulate_target_site ile aynı küme)
+        self.neighbors = simulation_runner.target_neighbors(
+            self.pos, self.target_idx,
+            simulation_runner.interference_radius(physics, path_loss_exp, baseline_config=baseline_config,
+                                                  optimized_config=optimized_config))
+
+        self.state = None  # Histerezis durumu (bw, power)
+
+    def _snapshot(self, ts, records):
+        """Bir saatin kayıtlarını (1 x N) dizilere çevirir."""
+        N = len(self.site_names)
+        users = np.full((1, N), np.nan)
+        snr = np.full((1, N), np.nan)
+        for record in records:
+            i = self.site_index.get(record["site_id"])
+            if i is None:
+                continue  # Yerleşimde olmayan site
+            users[0, i] = record["pred_users"]
+            snr[0, i] = record["est_snr_db"]
+        return {
+            'timestamps': np.array([ts]),
+            'site_names': self.site_names,
+            'ids': self.ids,
+            'pos': self.pos,
+            'users': users,
+            'snr': snr,
+            'present': ~np.isnan(users),
+        }
+
+    def step(self, ts, records):
+        """
+        Bir saati simüle eder. Hedef sitenin kaydı yoksa None döner.
+        """
+        arrays = self._snapshot(ts, records)
+        valid = arrays['present'][:, self.target_idx]
+
+        bl = (np.full((1, len(self.site_names)), self.baseline_config['tx_power_watt']),
+              np.full((1, len(self.site_names)), self.baseline_config['bandwidth_mhz']),
+              np.full((1, len(self.site_names)), CARRIER_FREQ_MHZ))
+        opt_bw, opt_power, opt_freq, self.state = simulation_runner.assign_optimized_resources(
+            arrays, self.optimized_config, self.state, path_loss_exp=self.path_loss_exp)
+        opt = (opt_power, opt_bw, opt_freq)
+
+        if not valid[0]:
+            return None
+
+        evaluated = [simulation_runner.evaluate_scenario(self.interference, arrays, *res,
+                                                         self.target_idx, self.gain, self.target_gain,
+                                                         self.neighbors)
+                     for res in (bl, opt)]
+        columns = simulation_runner.comparison_columns(arrays, self.target_idx, valid,
+                                                       evaluated[0], evaluated[1], opt)
+        row = {key: (value[0] if isinstance(value, np.ndarray) else value)
+               for key, value in columns.items()}
+        row["Time"] = pd.Timestamp(row["Time"])
+        return row
+
+    def run(self, records):
+        """Kayıt iteratörünü tüketir ve sonuç satırlarını üretildikçe döndürür."""
+        for ts, batch in group_by_timestep(records):
+            row = self.step(ts, batch)
+            if row is not None:
+                yield row
+
+
+def run_streaming_simulation(source, output="simulation_results_comparison.csv", live=False, flush_every=24):
+    """
+    Kaynak iteratörünü uçtan uca işler; satırları output dosyasına ekler.
+    live=False: akış hatayla kesilirse output dosyası yazılmaz; live=True:
+    satırlar her flush_every satırda output dosyasında görünür
+    (bkz. CsvResultSink).
+    Dönüş: yazılan satır sayısı
+    """
+    simulator = StreamingSimulator()
+    count = 0
+    with CsvResultSink(output, flush_every, live) as sink:
+        for row in simulator.run(source):
+            sink.write(row)
+            count += 1
+    print(f">>> {count} satır '{output}' dosyasına akış modunda yazıldı.")
+    return count
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Artımlı (streaming) 5G simülasyonu")
+    parser.add_argument("--input", default="lstm_predictions.csv")
+    parser.add_argument("--output", default="simulation_results_comparison.csv")
+    parser.add_argument("--chunksize", type=int, default=10000)
+    parser.add_argument("--time-ordered", action="store_true",
+                        help="Girdi zaman sırasında; dosyayı parça parça oku (sabit bellek)")
+    parser.add_argument("--replay-speed", type=float, default=0.0,
+                        help="Canlı tekrar: simüle edilen her saat için bekleme (saniye)")
+    parser.add_argument("--live-output", action="store_true",
+                        help="Satırları doğrudan çıktı dosyasına yaz ve her --flush-every satırda diske aktar "
+                             "(--replay-speed ile varsayılan)")
+    parser.add_argument("--flush-every", type=int, default=None,
+                        help="Diske aktarma aralığı (satır; varsayılan 24, canlı çıktıda 1)")
+    args = parser.parse_args(argv)
+
+    source = csv_record_source(args.input, args.chunksize, args.time_ordered)
+    live = args.live_output or args.replay_speed > 0
+    if args.replay_speed > 0:
+        source = replay_source(source, args.replay_speed)
+    flush_every = args.flush_every or (1 if live else 24)
+    try:
+        run_streaming_simulation(source, args.output, live, flush_every)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"HATA: {e}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+# sweep_runner.py
+# OPTIMIZED_CONFIG ve PATH_LOSS_EXPONENT için paralel parametre taraması.
+# Tahmin verisi bir kez okunur, paylaşımlı belleğe (shared memory) konur ve
+# işçi süreçler bu dizileri kopyalamadan salt okunur olarak kullanır.
+import argparse
+import itertools
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from config import BASELINE_CONFIG, OPTIMIZED_CONFIG, PATH_LOSS_EXPONENT
+import simulation_runner
+
+# İşçi süreçte paylaşımlı bellekten bağlanan diziler
+_WORKER_ARRAYS = None
+_WORKER_SHM = []
+
+
+def expand_grid(grid):
+    """
+    {"parametre": [değerler]} sözlüğünü tüm kombinasyonların listesine açar.
+    Geçerli anahtarlar: OPTIMIZED_CONFIG anahtarları ve "PATH_LOSS_EXPONENT".
+    """
+    valid_keys = set(OPTIMIZED_CONFIG) | {"PATH_LOSS_EXPONENT"}
+    unknown = set(grid) - valid_keys
+    if unknown:
+        raise ValueError(f"Bilinmeyen tarama parametresi: {sorted(unknown)}")
+
+    keys = list(grid)
+    return [dict(zip(keys, values)) for values in itertools.product(*(grid[k] for k in keys))]
+
+
+def compute_kpis(results_df, sinr_target_db=0.0):
+    """
+    Bir senaryonun toplu performans göstergeleri.
+    - energy_saved_pct: Baseline'a göre enerji tasarrufu (%)
+    - sinr_loss_db: Ortalama SINR kaybı (Baseline - Optimized, dB)
+    - pct_hours_below_target: Optimized SINR'ın hedefin altında kaldığı saat oranı (%)
+    """
+    energy_bl = results_df['Energy_Baseline_kWh'].sum()
+    energy_opt = results_df['Energy_Optimized_kWh'].sum()
+    return {
+        'energy_baseline_kwh': round(energy_bl, 3),
+        'energy_optimized_kwh': round(energy_opt, 3),
+        'energy_saved_pct': round(100 * (1 - energy_opt / energy_bl), 2) if energy_bl else np.nan,
+        'sinr_loss_db': round((results_df['SINR_Baseline_dB'] - results_df['SINR_Optimized_dB']).mean(), 3),
+        'pct_hours_below_target': round(100 * (results_df['SINR_Optimized_dB'] < sinr_target_db).mean(), 2),
+    }
+
+
+class SharedArrays:
+    """
+    build_site_arrays çıktısındaki NumPy dizilerini paylaşımlı belleğe kopyalar.
+    spec() işçi süreçlere gönderilecek hafif tanımı (blok adları, şekil, tip)
+    döndürür; büyük veri pickle edilmez.
+    """
+
+    def __init__(self, arrays):
+        self._blocks = []
+        self._spec = {}
+        self._extra = {}
+        for key, value in arrays.items():
+            if not isinstance(value, np.ndarray):
+                self._extra[key] = value
+                continue
+            shm = shared_memory.SharedMemory(create=True, size=max(1, value.nbytes))
+            np.ndarray(value.shape, dtype=value.dtype, buffer=shm.buf)[...] = value
+            self._blocks.append(shm)
+            self._spec[key] = (shm.name, value.shape, value.dtype.str)
+
+    def spec(self):
+        return self._spec, self._extra
+
+    def close(self):
+        for shm in self._blocks:
+            shm.close()
+            shm.unlink()
+        self._blocks = []
+
+
+def _attach_shared(spec, extra):
+    """İşçi süreç başlatıcısı: paylaşımlı bloklara salt okunur bağlanır."""
+    global _WORKER_ARRAYS
+    arrays = dict(extra)
+    for key, (name, shape, dtype) in spec.items():
+        shm = shared_memory.SharedMemory(name=name)
+        arr = np.ndarray(shape, dtype=np.dtype(dtype), buffer=shm.buf)
+        arr.flags.writeable = False
+        arrays[key] = arr
+        _WORKER_SHM.append(shm)
+    _WORKER_ARRAYS = arrays
+
+
+def run_scenario(params, arrays=None, sinr_target_db=0.0):
+    """
+    Tek bir parametre kombinasyonunu çalıştırır ve KPI satırını döndürür.
+    arrays verilmezse işçi sürecin paylaşımlı dizileri kullanılır.
+    """
+    arrays = _WORKER_ARRAYS if arrays is None else arrays
+    params = dict(params)
+    path_loss_exp = params.pop("PATH_LOSS_EXPONENT", PATH_LOSS_EXPONENT)
+    optimized_config = {**OPTIMIZED_CONFIG, **params}
+
+    results_df = simulation_runner.simulate_target_site(
+        arrays, BASELINE_CONFIG, optimized_config, path_loss_exp)
+    row = {**params, 'PATH_LOSS_EXPONENT': path_loss_exp}
+    row.update(compute_kpis(results_df, sinr_target_db))
+    return row
+
+
+def run_sweep(grid, workers=None, sinr_target_db=0.0, output="sweep_results.csv"):
+    """
+    Parametre ızgarasındaki tüm senaryoları ProcessPoolExecutor ile paralel
+    çalıştırır ve KPI tablosunu output dosyasına yazar.
+    """
+    scenarios = expand_grid(grid)
+    workers = workers or os.cpu_count()
+    print(f">>> Parametre taraması: {len(scenarios)} senaryo, {workers} işçi süreç")
+
+    traffic_df = simulation_runner.load_prediction_data()
+    arrays = simulation_runner.build_site_arrays(traffic_df)
+
+    shared = SharedArrays(arrays)
+    try:
+        spec, extra = shared.spec()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach_shared,
+                                 initargs=(spec, extra)) as pool:
+            rows = list(pool.map(run_scenario, scenarios, itertools.repeat(None),
+                                 itertools.repeat(sinr_target_db)))
+    finally:
+        shared.close()
+
+    results_df = pd.DataFrame(rows)
+    results_df.to_csv(output, index=False)
+    print(f">>> Tarama sonuçları '{output}' dosyasına kaydedildi.")
+    return results_df
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="OPTIMIZED_CONFIG parametre taraması")
+    parser.add_argument("grid", help='JSON ızgara veya JSON dosya yolu, örn. '
+                                     '\'{"max_power_watt": [40, 60], "PATH_LOSS_EXPONENT": [3.0, 3.5]}\'')
+    parser.add_argument("--workers", type=int, default=None, help="İşçi süreç sayısı (varsayılan: CPU sayısı)")
+    parser.add_argument("--target-sinr", type=float, default=0.0, help="SINR hedefi (dB)")
+    parser.add_argument("--output", default="sweep_results.csv")
+    args = parser.parse_args(argv)
+
+    try:
+        if os.path.isfile(args.grid):
+            with open(args.grid, encoding="utf-8") as f:
+                grid = json.load(f)
+        else:
+            grid = json.loads(args.grid)
+        results_df = run_sweep(grid, args.workers, args.target_sinr, args.output)
+    except (FileNotFoundError, ValueError) as e:
+        print(f"HATA: {e}")
+        return 1
+    print(results_df.sort_values('energy_saved_pct', ascending=False).head(10))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,5 @@
+# Testler depo kökündeki düz modülleri (event_simulation, config, ...) içe aktarır
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,84 @@
+# event_simulation.py için sentetik senaryolar: uyku/uyanma, uyku beklemesinin
+# iptali, yeniden yapılandırma gecikmesi ve doğrusal parça içi yeniden yapılandırma.
+import numpy as np
+import pandas as pd
+
+from config import EVENT_SIM_CONFIG, OPTIMIZED_CONFIG
+from event_simulation import EventDrivenSimulator
+
+
+def make_arrays(users, interval_s=3600):
+    """Tek siteli, sabit SNR'lı build_site_arrays benzeri diziler."""
+    users = np.asarray(users, dtype=float).reshape(-1, 1)
+    return {
+        'timestamps': pd.Timestamp("2025-01-01") + pd.to_timedelta(np.arange(len(users)) * interval_s, unit="s"),
+        'site_names': ["Site_1"],
+        'users': users,
+        'snr': np.full(users.shape, 20.0),
+        'present': np.ones(users.shape, dtype=bool),
+    }
+
+
+def run(users, interval_s=3600, **overrides):
+    event_config = dict(EVENT_SIM_CONFIG, traffic_profile="step", **overrides)
+    simulator = EventDrivenSimulator(make_arrays(users, interval_s), event_config=event_config,
+                                     sample_interval_s=interval_s, record_events=True)
+    summary = simulator.run().iloc[0]
+    log = simulator.event_log()
+    log["t"] = (log["Time"] - simulator.start).dt.total_seconds()
+    return summary, log
+
+
+def events(log, name):
+    return log.loc[log["Event"] == name, "t"].tolist()
+
+
+def test_sleep_and_wake_with_latencies():
+    # 1 sn çözünürlük: gecikmeler olay zamanlarına yuvarlanmadan görünür
+    summary, log = run([10, 0, 0, 10, 10], resolution_s=1)
+    hold, entry, wake = (EVENT_SIM_CONFIG[k] for k in ("sleep_hold_s", "sleep_entry_latency_s", "wake_latency_s"))
+
+    assert events(log, "sleep") == [3600 + hold]
+    assert events(log, "sleep_done") == [3600 + hold + entry]
+    assert events(log, "wake") == [3 * 3600]
+    assert events(log, "wake_done") == [3 * 3600 + wake]
+    assert summary["Sleep_Entries"] == 1 and summary["Wakeups"] == 1
+    assert summary["Sleep_h"] == round((3 * 3600 - (3600 + hold + entry)) / 3600, 3)
+    assert summary["Transition_h"] == round((entry + wake) / 3600, 3)
+
+
+def test_short_dip_cancels_pending_sleep():
+    # 120 sn'lik örnekler: eşik altında kalma süresi sleep_hold_s'den kısa
+    short, _ = run([10, 2, 10, 10], interval_s=120, sleep_hold_s=300)
+    assert short["Sleep_Entries"] == 0 and short["Sleep_h"] == 0
+
+    # Aynı düşüş sleep_hold_s'den uzun sürerse uykuya geçilir
+    long, log = run([10, 2, 2, 2, 10, 10], interval_s=120, sleep_hold_s=300)
+    assert long["Sleep_Entries"] == 1
+    assert events(log, "sleep") == [120 + 300]
+
+
+def test_reconfig_applied_after_latency():
+    summary, log = run([20, 100, 100], reconfig_latency_s=120)
+    reconfigs = log[log["Event"] == "reconfig"]
+    assert reconfigs["t"].tolist() == [3600 + 120]
+    assert reconfigs["BW_MHz"].iloc[0] > 20
+    assert summary["Reconfigurations"] == 1
+
+
+def test_linear_ramp_reconfigures_inside_segment():
+    margin = OPTIMIZED_CONFIG['hysteresis_margin_mhz']
+    for latency in (0, 120):
+        event_config = dict(EVENT_SIM_CONFIG, traffic_profile="linear", reconfig_latency_s=latency)
+        simulator = EventDrivenSimulator(make_arrays([20, 100, 100]), event_config=event_config,
+                                         record_events=True)
+        simulator.run()
+        log = simulator.event_log()
+        t = (log["Time"] - simulator.start).dt.total_seconds()
+        inside = log[(log["Event"] == "reconfig") & (t > 0) & (t < 3600)]
+
+        # Rampa boyunca bant, hedefin histerezis bandı kadar uzaklaştığı her an güncellenir
+        assert len(inside) >= 4
+        assert inside["BW_MHz"].is_monotonic_increasing
+        assert (inside["BW_MHz"].diff().dropna() >= margin - 1e-9).all()
+        assert t[log["Event"] == "reconfig"].is_unique
@@ -0,0 +1,34 @@
+# resource_allocator.apply_optimized_constraints: histerezisin uyku geçişleriyle etkileşimi.
+import numpy as np
+
+from config import OPTIMIZED_CONFIG
+from resource_allocator import apply_optimized_constraints
+
+# Uyku bandına (10 MHz) histerezis payından (5 MHz) yakın bir uyanma talebi
+USERS = np.array([[100.0], [2.0], [20.0], [20.0]])
+BW = np.array([[50.0], [50.0], [12.0], [13.0]])
+POWER = np.array([[40.0], [40.0], [12.0], [13.0]])
+
+
+def constrain(rows, prev_state=None):
+    return apply_optimized_constraints(BW[rows].copy(), POWER[rows].copy(), USERS[rows],
+                                       np.ones(USERS[rows].shape, dtype=bool), OPTIMIZED_CONFIG, prev_state)
+
+
+def test_sleep_then_wake_bypasses_hysteresis():
+    bw, power, _ = constrain(slice(None))
+    cfg = OPTIMIZED_CONFIG
+    # Uykuya giriş histerezisten bağımsız uygulanır
+    assert bw[1, 0] == cfg['min_bandwidth_mhz'] and power[1, 0] == cfg['min_power_watt']
+    # Uyanan hücre, bant farkı histerezis payından küçük olsa da yeni konfigürasyona geçer
+    assert bw[2, 0] == 12.0 and power[2, 0] == 12.0
+    # Uyanık hücrede histerezis yeniden geçerlidir
+    assert bw[3, 0] == 12.0 and power[3, 0] == 12.0
+
+
+def test_wake_across_state_boundary():
+    full_bw, full_power, _ = constrain(slice(None))
+    head_bw, head_power, state = constrain(slice(0, 2))
+    tail_bw, tail_power, _ = constrain(slice(2, None), state)
+    np.testing.assert_array_equal(np.vstack([head_bw, tail_bw]), full_bw)
+    np.testing.assert_array_equal(np.vstack([head_power, tail_power]), full_power)
@@ -0,0 +1,43 @@
+# spatial_sampling.UELayout: gruplanmış site yüzdelikleri ve kapsama haritası,
+# site başına maskeyle hesaplanan doğrudan sonuçlarla aynı olmalıdır.
+import numpy as np
+
+from config import CARRIER_FREQ_MHZ, PATH_LOSS_EXPONENT
+from interference_engine import InterferenceEngine
+from physics_engine import PhysicsEngine
+from spatial_sampling import UELayout
+
+
+def make_layout(num_sites=6, num_ues=40, seed=0):
+    rng = np.random.default_rng(seed)
+    interference = InterferenceEngine(PhysicsEngine(CARRIER_FREQ_MHZ), PATH_LOSS_EXPONENT)
+    return UELayout(interference, rng.uniform(0, 800, (num_sites, 2)), rng.uniform(0, 800, (num_ues, 2)))
+
+
+def test_site_percentiles_match_per_site_masks():
+    layout = make_layout()
+    rng = np.random.default_rng(1)
+    T, U, N = 12, layout.num_ues, layout.num_sites
+    serving = rng.integers(0, N - 1, (T, U)).astype(np.int32)  # son site hiç hizmet vermez
+    sinr = rng.normal(5, 8, (T, U)).astype(np.float32)
+
+    values, ue_count = layout.site_percentiles(serving, sinr)
+    for t in range(T):
+        for s in range(N):
+            attached = sinr[t, serving[t] == s]
+            assert ue_count[t, s] == attached.size
+            if attached.size:
+                np.testing.assert_allclose(values[t, s], np.percentile(attached, (5, 50, 95)), atol=1e-5)
+            else:
+                assert np.isnan(values[t, s]).all()
+
+
+def test_coverage_map_dominant_site_prefers_lowest_index_on_ties():
+    layout = make_layout(num_sites=4, num_ues=3)
+    serving = np.array([[0, 3, 2],
+                        [1, 3, 1],
+                        [1, 2, 2],
+                        [0, 2, 1]], dtype=np.int32)
+    sinr = np.zeros(serving.shape, dtype=np.float32)
+    cov = layout.coverage_map(serving, sinr)
+    np.testing.assert_array_equal(cov['serving_site'], [0, 2, 1])